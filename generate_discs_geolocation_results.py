@@ -0,0 +1,6 @@
+# internal imports
+from src.engines.discs_geolocation import main
+
+
+if __name__ == "__main__":
+    main()
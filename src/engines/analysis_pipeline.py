@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import argparse
+import pandas as pd
+# internal imports
+from src.engines.voting_engine import run_voting
+from src.engines.routes_extraction import (
+    generate_routes_results_raw,
+    clean_routes_results,
+    generate_routes_frequency_aggregation
+)
+from src.engines.dataset_enrichment import (
+    enrich_traffic_logs,
+    generate_compliance_analysis
+)
+from src.utils.pipeline_runner import (
+    PipelineStage,
+    PipelineRunner
+)
+from src.utils.results_store import (
+    build_results_store,
+    load_results_dataframe
+)
+from src.utils.typed_tables import get_typed_table_filepath
+from src.utils.constants import (
+    RESULTS_MODES,
+    EXPERIMENT_RESULTS_FIRST_IP_DIR,
+    EXPERIMENT_RESULTS_VOTING_DIR,
+    ANALYSIS_FIRST_IP_DIR,
+    ANALYSIS_VOTING_DIR,
+    EEE_COUNTRIES_FILEPATH,
+    TRAFFIC_LOGS_IP_CLASSIFIED_FILEPATH,
+    ANYCAST_PII_TRAFFIC_LOGS_FILEPATH,
+    APKS_METADATA_FILEPATH,
+    IT_ANNOTATION_FILEPATH,
+    TPLS_RESULTS_FILEPATH,
+    PIPELINE_STATE_FILEPATH
+)
+
+EXPERIMENT_RESULTS_DIRS = {
+    RESULTS_MODES[0]: EXPERIMENT_RESULTS_FIRST_IP_DIR,
+    RESULTS_MODES[1]: EXPERIMENT_RESULTS_VOTING_DIR
+}
+ANALYSIS_DIRS = {
+    RESULTS_MODES[0]: ANALYSIS_FIRST_IP_DIR,
+    RESULTS_MODES[1]: ANALYSIS_VOTING_DIR
+}
+# Traffic logs datasets analysed, source file and name of its analysis files
+TRAFFIC_LOGS_DATASETS = {
+    "Traffic_logs_10K_ip_classified": TRAFFIC_LOGS_IP_CLASSIFIED_FILEPATH,
+    "Anycast_PII_Traffic_Logs": ANYCAST_PII_TRAFFIC_LOGS_FILEPATH
+}
+ROUTES_SUBSETS = ["", "_non_suspicious", "_suspicious"]
+
+
+def get_analysis_paths(results_mode: str) -> dict:
+    experiment_results_dir = EXPERIMENT_RESULTS_DIRS[results_mode]
+    analysis_dir = ANALYSIS_DIRS[results_mode]
+    paths = {
+        "experiment_results": experiment_results_dir,
+        # Columnar store of the hunter results, see load_experiment_results
+        "results_store": f"{analysis_dir}/results_store_{results_mode}",
+        # NOTE: JSON Lines, the raw routes are written in chunks
+        "routes_results_raw":
+            f"{analysis_dir}/routes_results_raw_{results_mode}.jsonl"
+    }
+    for subset in ROUTES_SUBSETS:
+        paths[f"routes_results{subset}"] = get_typed_table_filepath(
+            f"{analysis_dir}/routes_results{subset}_{results_mode}")
+        paths[f"routes_frequency{subset}"] = \
+            f"{analysis_dir}/routes_frequency{subset}_{results_mode}.csv"
+    for dataset_name in TRAFFIC_LOGS_DATASETS.keys():
+        paths[f"{dataset_name}_enriched"] = get_typed_table_filepath(
+            f"{analysis_dir}/{dataset_name}_enriched_{results_mode}")
+        paths[f"{dataset_name}_analysis"] = \
+            f"{analysis_dir}/{dataset_name}_{results_mode}.csv"
+    return paths
+
+
+def vote_experiment_results(results_folder: str, output_folder: str):
+    summary = run_voting(results_folder, output_folder)
+    if len(summary["files_failed"]) > 0:
+        raise RuntimeError(
+            f"Voting failed for {len(summary['files_failed'])} files: "
+            f"{sorted(summary['files_failed'].keys())}")
+
+
+def load_experiment_results(results_mode: str,
+                            with_ips_previous_to_target: bool = True
+                            ) -> pd.DataFrame:
+    # One row per hunter result, read from the results store built by the
+    # pipeline instead of parsing the result files. The store is rebuilt
+    # first if any result file changed since the last run
+    paths = get_analysis_paths(results_mode)
+    return load_results_dataframe(
+        paths["experiment_results"], paths["results_store"],
+        with_ips_previous_to_target=with_ips_previous_to_target)
+
+
+def get_analysis_stages(results_mode: str) -> list[PipelineStage]:
+    # voting -> routes raw -> clean/suspicious split -> frequency
+    # aggregation -> traffic logs enrichment -> compliance, and the results
+    # store next to the routes stages
+    paths = get_analysis_paths(results_mode)
+    stages = []
+
+    if results_mode == RESULTS_MODES[1]:
+        stages.append(PipelineStage(
+            name="voting",
+            function=vote_experiment_results,
+            inputs=[EXPERIMENT_RESULTS_FIRST_IP_DIR],
+            outputs=[EXPERIMENT_RESULTS_VOTING_DIR],
+            parameters={
+                "results_folder": EXPERIMENT_RESULTS_FIRST_IP_DIR,
+                "output_folder": EXPERIMENT_RESULTS_VOTING_DIR
+            }
+        ))
+
+    stages.append(PipelineStage(
+        name=f"results_store_{results_mode}",
+        function=build_results_store,
+        inputs=[paths["experiment_results"]],
+        outputs=[paths["results_store"]],
+        parameters={
+            "results_folder": paths["experiment_results"],
+            "store_dir": paths["results_store"]
+        }
+    ))
+
+    stages.append(PipelineStage(
+        name=f"routes_raw_{results_mode}",
+        function=generate_routes_results_raw,
+        inputs=[paths["experiment_results"], EEE_COUNTRIES_FILEPATH],
+        outputs=[paths["routes_results_raw"]],
+        parameters={
+            "results_folder": paths["experiment_results"],
+            "routes_results_filepath": paths["routes_results_raw"],
+            "eee_countries_filepath": EEE_COUNTRIES_FILEPATH
+        }
+    ))
+
+    stages.append(PipelineStage(
+        name=f"routes_clean_{results_mode}",
+        function=clean_routes_results,
+        inputs=[paths["routes_results_raw"]],
+        outputs=[paths[f"routes_results{subset}"]
+                 for subset in ROUTES_SUBSETS],
+        parameters={
+            "routes_results_raw_filepath": paths["routes_results_raw"],
+            "routes_results_filepath": paths["routes_results"],
+            "routes_results_non_suspicious_filepath":
+                paths["routes_results_non_suspicious"],
+            "routes_results_suspicious_filepath":
+                paths["routes_results_suspicious"]
+        }
+    ))
+
+    for subset in ROUTES_SUBSETS:
+        stages.append(PipelineStage(
+            name=f"routes_frequency{subset}_{results_mode}",
+            function=generate_routes_frequency_aggregation,
+            inputs=[paths[f"routes_results{subset}"],
+                    EEE_COUNTRIES_FILEPATH],
+            outputs=[paths[f"routes_frequency{subset}"]],
+            parameters={
+                "routes_results_filepath": paths[f"routes_results{subset}"],
+                "routes_frequency_filepath":
+                    paths[f"routes_frequency{subset}"],
+                "eee_countries_filepath": EEE_COUNTRIES_FILEPATH
+            }
+        ))
+
+    for dataset_name, traffic_logs_filepath in TRAFFIC_LOGS_DATASETS.items():
+        stages.append(PipelineStage(
+            name=f"{dataset_name}_enrichment_{results_mode}",
+            function=enrich_traffic_logs,
+            inputs=[traffic_logs_filepath,
+                    paths["routes_frequency_non_suspicious"],
+                    APKS_METADATA_FILEPATH,
+                    IT_ANNOTATION_FILEPATH,
+                    TPLS_RESULTS_FILEPATH],
+            outputs=[paths[f"{dataset_name}_enriched"]],
+            parameters={
+                "traffic_logs_filepath": traffic_logs_filepath,
+                "routes_frequency_filepath":
+                    paths["routes_frequency_non_suspicious"],
+                "enriched_traffic_logs_filepath":
+                    paths[f"{dataset_name}_enriched"],
+                "apks_metadata_filepath": APKS_METADATA_FILEPATH,
+                "it_annotation_filepath": IT_ANNOTATION_FILEPATH,
+                "tpls_results_filepath": TPLS_RESULTS_FILEPATH
+            }
+        ))
+        stages.append(PipelineStage(
+            name=f"{dataset_name}_compliance_{results_mode}",
+            function=generate_compliance_analysis,
+            inputs=[paths[f"{dataset_name}_enriched"]],
+            outputs=[paths[f"{dataset_name}_analysis"]],
+            parameters={
+                "enriched_traffic_logs_filepath":
+                    paths[f"{dataset_name}_enriched"],
+                "analysis_filepath": paths[f"{dataset_name}_analysis"]
+            }
+        ))
+
+    return stages
+
+
+def run_analysis_pipeline(results_mode: str = RESULTS_MODES[1],
+                          targets: list[str] = None,
+                          force: bool = False,
+                          max_workers: int = None,
+                          state_filepath: str = PIPELINE_STATE_FILEPATH,
+                          verbose: bool = True) -> dict:
+    runner = PipelineRunner(
+        get_analysis_stages(results_mode),
+        state_filepath=state_filepath,
+        max_workers=max_workers
+    )
+    return runner.run(targets=targets, force=force, verbose=verbose)
+
+
+def main(arguments: list[str] = None):
+    parser = argparse.ArgumentParser(
+        description="Run the stages of the analysis whose inputs or "
+                    "parameters changed since their last run")
+    parser.add_argument("--mode", choices=RESULTS_MODES,
+                        default=RESULTS_MODES[1],
+                        help="hunter results analysed")
+    parser.add_argument("--stage", action="append", dest="targets",
+                        help="stage to run with the stages it depends on "
+                             "(default: every stage)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="number of stages run at the same time")
+    parser.add_argument("--force", action="store_true",
+                        help="run the stages even if they are up to date")
+    parsed_arguments = parser.parse_args(arguments)
+
+    summary = run_analysis_pipeline(
+        results_mode=parsed_arguments.mode,
+        targets=parsed_arguments.targets,
+        force=parsed_arguments.force,
+        max_workers=parsed_arguments.workers
+    )
+    for stage_name, error in summary["errors"].items():
+        print(f"FAILED {stage_name}: {error}")
+
+    return summary
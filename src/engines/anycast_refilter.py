@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    as_completed
+)
+from shapely import (
+    from_geojson
+)
+# internal imports
+from src.engines.voting_engine import vote_result_file
+from src.utils.common_functions import (
+    json_file_to_dict,
+    get_list_files_in_path
+)
+from src.utils.airports_memo import get_airports_memo
+from src.utils.json_io import atomic_output_file
+from src.utils.hunter_result_reader import HunterResultReader
+from src.utils.ip_prefix_index import IPPrefixIndex
+from src.utils.constants import (
+    EXPERIMENT_RESULTS_FIRST_IP_DIR,
+    EXPERIMENT_RESULTS_VOTING_DIR
+)
+
+
+def get_indeterminate_location_result() -> dict:
+    return {
+        "country": "Indeterminate",
+        "city": "Indeterminate",
+        "discs_intersect": False,
+        "nearest_airport": False,
+        "centroid": "",
+        "airports_countries": [],
+        "airports_cities": [],
+        "airports_intersection": []
+    }
+
+
+def get_nearest_airport_location_result(location: str) -> dict:
+    point = from_geojson(location)
+    airport = get_airports_memo().nearest_airport_dicts(
+        latitudes=[point.y], longitudes=[point.x])[0]
+    return {
+        "country": airport["country_code"],
+        "city": airport["city_name"],
+        "discs_intersect": False,
+        "nearest_airport": True,
+        "centroid": airport["location"],
+        "airports_countries": [airport["country_code"]],
+        "airports_cities": [airport["city_name"]],
+        "airports_intersection": [airport]
+    }
+
+
+def get_anycast_prefix_index(
+        anycast_classification_filepaths: list[str] = None,
+        prefix_list_filepaths: list[str] = None,
+        store=None) -> IPPrefixIndex:
+    # Anycast IPs of the classification files {ip: is_anycast} and of the
+    # IP metadata store, plus the anycast prefixes of the prefix lists
+    prefix_index = IPPrefixIndex()
+    for file_path in anycast_classification_filepaths or []:
+        prefix_index.add_anycast_classification(json_file_to_dict(file_path))
+    if store is not None:
+        prefix_index.add_ip_metadata_store(store)
+    for file_path in prefix_list_filepaths or []:
+        prefix_index.add_prefix_list(file_path)
+    return prefix_index
+
+
+def refilter_hunter_result(result: dict, anycast_ips: dict) -> bool:
+    # The anycast IPs previous to target are removed, the result is the
+    # nearest airport to the first IP left or Indeterminate without IPs
+    ips_previous_to_target = result["ips_previous_to_target"]
+    valid_ips_previous_to_target = [
+        ip for ip in ips_previous_to_target if not anycast_ips[ip["ip"]]
+    ]
+
+    if len(valid_ips_previous_to_target) == 0:
+        result["ips_previous_to_target"] = []
+        result["location_result"] = get_indeterminate_location_result()
+        return len(ips_previous_to_target) > 0
+    if len(valid_ips_previous_to_target) == len(ips_previous_to_target):
+        return False
+
+    result["ips_previous_to_target"] = valid_ips_previous_to_target
+    result["location_result"] = get_nearest_airport_location_result(
+        valid_ips_previous_to_target[0]["location"])
+    return True
+
+
+def refilter_result_file(source_filepath: str,
+                         output_filepath: str,
+                         prefix_index: IPPrefixIndex,
+                         voting_filepath: str = None) -> dict:
+    airports_memo = get_airports_memo()
+    memo_hits, memo_misses = airports_memo.hits, airports_memo.misses
+    file_summary = {
+        "results": 0,
+        "results_updated": 0
+    }
+    # The IPs of every result not seen before in the file are looked up in
+    # the index at once
+    anycast_ips = {}
+
+    def refilter_and_count(result: dict):
+        file_summary["results"] += 1
+        new_ips = list(dict.fromkeys(
+            ip["ip"] for ip in result["ips_previous_to_target"]
+            if ip["ip"] not in anycast_ips))
+        if len(new_ips) > 0:
+            anycast_ips.update(zip(
+                new_ips, prefix_index.contains(new_ips).tolist()))
+        if refilter_hunter_result(result, anycast_ips):
+            file_summary["results_updated"] += 1
+
+    with atomic_output_file(output_filepath) as output:
+        HunterResultReader(source_filepath).rewrite_hunter_results(
+            output, refilter_and_count)
+
+    # NOTE: the voting results are generated from the file just filtered
+    # in the same task, instead of walking the whole folder again
+    airports_memo_locations = {}
+    if voting_filepath is not None:
+        airports_memo_locations = vote_result_file(
+            output_filepath, voting_filepath)["airports_memo_locations"]
+
+    # NOTE: the locations resolved by the worker are sent back, so the main
+    # process saves a single memo for the next runs
+    airports_memo_locations.update(airports_memo.pop_new_locations())
+    file_summary["airports_memo_hits"] = airports_memo.hits - memo_hits
+    file_summary["airports_memo_misses"] = \
+        airports_memo.misses - memo_misses
+    file_summary["airports_memo_locations"] = airports_memo_locations
+    return file_summary
+
+
+def run_anycast_refilter(prefix_index: IPPrefixIndex,
+                         results_folder: str = EXPERIMENT_RESULTS_FIRST_IP_DIR,
+                         output_folder: str = None,
+                         voting_folder: str = EXPERIMENT_RESULTS_VOTING_DIR,
+                         processes: int = None) -> dict:
+    # The results are rewritten in place without output folder, and voted
+    # again to the voting folder unless it is None
+    output_folder = output_folder or results_folder
+    summary = {
+        "files": 0,
+        "files_processed": 0,
+        "files_failed": {},
+        "results": 0,
+        "results_updated": 0,
+        "airports_memo_hits": 0,
+        "airports_memo_misses": 0
+    }
+
+    # NOTE: the index is flattened once here and sent built to the workers
+    prefix_index.build()
+    airports_memo = get_airports_memo()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {}
+        for filename in sorted(get_list_files_in_path(results_folder)):
+            summary["files"] += 1
+            futures[executor.submit(
+                refilter_result_file,
+                f"{results_folder}/{filename}",
+                f"{output_folder}/{filename}",
+                prefix_index,
+                None if voting_folder is None
+                else f"{voting_folder}/{filename}"
+            )] = filename
+
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                file_summary = future.result()
+            except Exception as exception:
+                summary["files_failed"][filename] = repr(exception)
+                continue
+            summary["files_processed"] += 1
+            summary["results"] += file_summary["results"]
+            summary["results_updated"] += file_summary["results_updated"]
+            summary["airports_memo_hits"] += \
+                file_summary["airports_memo_hits"]
+            summary["airports_memo_misses"] += \
+                file_summary["airports_memo_misses"]
+            airports_memo.update(file_summary["airports_memo_locations"])
+
+    if summary["airports_memo_misses"] > 0:
+        airports_memo.save()
+    return summary
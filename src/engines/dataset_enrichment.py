@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import pandas as pd
+# internal imports
+from src.utils.common_functions import (
+    json_file_to_dict
+)
+from src.utils.typed_tables import (
+    parse_list_column,
+    read_typed_table,
+    write_typed_table
+)
+from src.utils.ip_interning import get_ip_interning_table
+from src.engines.gdpr_compliance import TransferComplianceEngine
+from src.utils.constants import (
+    ANYCAST_IP_CLASSIFICATION_FILEPATH,
+    APKS_METADATA_FILEPATH,
+    IT_ANNOTATION_FILEPATH,
+    TPLS_RESULTS_FILEPATH
+)
+
+ROUTES_ENRICHMENT_COLUMNS = [
+    "origins_transfers_outside_EEE",
+    "destinations_transfers_outside_EEE",
+    "frequency_transfers_outside_EEE"
+]
+# Columns of the analysis datasets holding lists
+ANALYSIS_LIST_COLUMNS = ROUTES_ENRICHMENT_COLUMNS + [
+    "countries_mentioned_by_policy"
+]
+# Default values of the traffic logs columns not populated
+ANALYSIS_DEFAULT_VALUES = {
+    "loadsJNI": False,
+    "stackTrace": "None",
+    "remote_host": "None",
+    "tls": False,
+    "https": False,
+    "error": "None",
+    "TP-performed": False,
+    "TP-library": "None",
+    "FP-intended": False,
+}
+
+
+def populate_dataframe_with_ip_classification(
+        dataframe: pd.DataFrame,
+        ips_classified: dict = None) -> pd.DataFrame:
+    if ips_classified is None:
+        ips_classified = json_file_to_dict(
+            ANYCAST_IP_CLASSIFICATION_FILEPATH, cached=True)
+
+    # Only the rows of classified IPs are updated, the rest keep their value
+    ip_table = get_ip_interning_table()
+    ip_dest_ids = ip_table.intern_column(dataframe["ip_dest"])
+    ips_classified = pd.Series(
+        list(ips_classified.values()),
+        index=ip_table.intern_many(list(ips_classified.keys())),
+        dtype=object)
+    classified_rows = ip_dest_ids.isin(ips_classified.index)
+    dataframe.loc[classified_rows, "ip_anycast"] = \
+        ip_dest_ids[classified_rows].map(ips_classified)
+
+    return dataframe
+
+
+def get_routes_outside_eee_by_target(
+        routes_frequency_df: pd.DataFrame) -> pd.DataFrame:
+    # One row per target with the lists of origins, destinations and counts
+    # of its routes outside EEE, in the order they appear in the file
+    routes_valid_df = routes_frequency_df.loc[
+        (routes_frequency_df["outside_EEE"] == True)
+    ]
+    routes_by_target = routes_valid_df.groupby("target", sort=False)
+    return pd.DataFrame({
+        column: routes_by_target[source_column].apply(
+            lambda values: values.tolist())
+        for column, source_column in zip(
+            ROUTES_ENRICHMENT_COLUMNS,
+            ["origin_country", "result_country", "count"])
+    })
+
+
+def populate_dataset_with_routes_results(
+        dataframe: pd.DataFrame,
+        routes_frequency_filepath: str) -> pd.DataFrame:
+    routes_by_target = get_routes_outside_eee_by_target(
+        pd.read_csv(routes_frequency_filepath, sep=","))
+    # The traffic logs and the routes are joined by the interned IPs ids
+    ip_table = get_ip_interning_table()
+    ip_dest_ids = ip_table.intern_column(dataframe["ip_dest"])
+    routes_by_target.index = ip_table.intern_many(
+        routes_by_target.index.tolist())
+
+    # The targets without routes outside EEE get the default empty lists
+    for column in ROUTES_ENRICHMENT_COLUMNS:
+        dataframe[column] = parse_list_column(
+            ip_dest_ids.map(routes_by_target[column]))
+    dataframe["outside_EEE"] = ip_dest_ids.isin(routes_by_target.index)
+
+    return dataframe
+
+
+def populate_dataset_with_apks_metadata(
+        dataframe: pd.DataFrame,
+        apks_metadata_filepath: str = APKS_METADATA_FILEPATH
+) -> pd.DataFrame:
+    apk_metadata_df = pd.read_csv(apks_metadata_filepath, sep=",")
+
+    return dataframe.merge(
+        apk_metadata_df,
+        on=["apk", "version"],
+        how="left"
+    )
+
+
+def populate_dataset_with_policy_extracted_info(
+        dataframe: pd.DataFrame,
+        it_annotation_filepath: str = IT_ANNOTATION_FILEPATH
+) -> pd.DataFrame:
+    it_annotation_results_df = pd.read_csv(it_annotation_filepath, sep=",")
+
+    it_annotation_results_df.drop_duplicates(["apk", "countries"],
+                                             inplace=True)
+    it_annotation_results_df.rename(
+        columns={
+            "transfer": "it_mentioned_by_policy",
+            "adequacy_decision": "adequacy_decision_by_policy",
+            "countries": "countries_mentioned_by_policy"
+        },
+        inplace=True
+    )
+
+    dataframe = pd.merge(
+        dataframe,
+        it_annotation_results_df[[
+            "apk", "version",
+            "it_mentioned_by_policy", "adequacy_decision_by_policy",
+            "countries_mentioned_by_policy"
+        ]],
+        on=["apk", "version"],
+        how="left"
+    )
+
+    dataframe.fillna(
+        value={
+            "it_mentioned_by_policy": False,
+            "adequacy_decision_by_policy": False
+        },
+        inplace=True
+    )
+    # The apks without policy info get an empty list of countries
+    dataframe["countries_mentioned_by_policy"] = parse_list_column(
+        dataframe["countries_mentioned_by_policy"])
+    return dataframe
+
+
+def populate_dataset_with_libraries_data(
+        dataframe: pd.DataFrame,
+        tpls_results_filepath: str = TPLS_RESULTS_FILEPATH
+) -> pd.DataFrame:
+    tpls_results_df = pd.read_csv(tpls_results_filepath, sep=",")
+    tpls_results_df.fillna(
+        {
+            "TP-performed": False,
+            "TP-library": "None",
+            "FP-intended": False,
+        }, inplace=True
+    )
+
+    dataframe.drop("stackTrace", axis=1, inplace=True)
+
+    dataframe = pd.merge(
+        dataframe,
+        tpls_results_df[[
+            "apk", "stackTrace", "version", "port_source", "host",
+            "port_dest", "ip_dest",
+            "TP-performed", "TP-library", "FP-intended"
+        ]],
+        on=["apk", "version", "port_source", "host", "port_dest", "ip_dest"],
+        how="left"
+    )
+
+    return dataframe
+
+
+def check_apk_it_gdpr_compliance(dataframe: pd.DataFrame) -> pd.DataFrame:
+    # Compliant when every destination outside EEE is mentioned by the policy
+    dataframe["apk_it_gdpr_compliance"] = \
+        TransferComplianceEngine().check_compliance(
+            dataframe["destinations_transfers_outside_EEE"],
+            dataframe["countries_mentioned_by_policy"]
+        )
+    return dataframe
+
+
+# Datasets generation
+def enrich_traffic_logs(
+        traffic_logs_filepath: str,
+        routes_frequency_filepath: str,
+        enriched_traffic_logs_filepath: str,
+        apks_metadata_filepath: str = APKS_METADATA_FILEPATH,
+        it_annotation_filepath: str = IT_ANNOTATION_FILEPATH,
+        tpls_results_filepath: str = TPLS_RESULTS_FILEPATH):
+    dataframe = pd.read_csv(traffic_logs_filepath, sep=",")
+
+    dataframe = populate_dataset_with_apks_metadata(
+        dataframe, apks_metadata_filepath)
+    dataframe = populate_dataset_with_policy_extracted_info(
+        dataframe, it_annotation_filepath)
+    dataframe = populate_dataset_with_routes_results(
+        dataframe, routes_frequency_filepath)
+    dataframe = populate_dataset_with_libraries_data(
+        dataframe, tpls_results_filepath)
+    dataframe.fillna(ANALYSIS_DEFAULT_VALUES, inplace=True)
+
+    write_typed_table(dataframe, enriched_traffic_logs_filepath,
+                      ANALYSIS_LIST_COLUMNS)
+
+
+def generate_compliance_analysis(enriched_traffic_logs_filepath: str,
+                                 analysis_filepath: str):
+    dataframe = read_typed_table(enriched_traffic_logs_filepath,
+                                 ANALYSIS_LIST_COLUMNS)
+    dataframe = check_apk_it_gdpr_compliance(dataframe)
+    dataframe.to_csv(analysis_filepath, sep=",", index=False)
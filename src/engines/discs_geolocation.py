@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import argparse
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    as_completed
+)
+from functools import lru_cache
+import numpy as np
+import shapely
+# internal imports
+from src.engines.anycast_refilter import get_indeterminate_location_result
+from src.engines.location_consensus import INDETERMINATE
+from src.engines.voting_engine import vote_result_file
+from src.utils.airports_index import (
+    AirportsIndex,
+    get_airports_index
+)
+from src.utils.airports_memo import (
+    get_airport_dicts,
+    get_airports_memo
+)
+from src.utils.common_functions import get_list_files_in_path
+from src.utils.geo_distance import (
+    latitudes_longitudes_to_unit_vectors,
+    unit_vectors_to_latitudes_longitudes
+)
+from src.utils.hunter_result_reader import (
+    HunterResultReader,
+    get_result_file_discs
+)
+from src.utils.json_io import atomic_output_file
+from src.utils.constants import (
+    EARTH_RADIUS_KM,
+    SPEED_OF_LIGHT_KM_PER_MS,
+    EXPERIMENT_RESULTS_FIRST_IP_DIR
+)
+
+# Fraction of the speed of light in vacuum travelled by the packets (fiber)
+FIBER_SPEED_FACTOR = 2 / 3
+# Points of the smallest disc of every result checked against the other
+# discs to find their intersection, rings x bearings plus its center
+INTERSECTION_RINGS = 8
+INTERSECTION_BEARINGS = 32
+# Discs located at once, bounds the temporary (discs x airports) and
+# (discs x points) matrices to a few tens of MB
+DISCS_CHUNK_SIZE = 1024
+# Points on the border of a disc are inside it
+COSINE_TOLERANCE = 1e-12
+
+NO_AIRPORT = -1
+
+
+def get_rtts_distances(rtts: np.ndarray,
+                       speed_factor: float = FIBER_SPEED_FACTOR) -> np.ndarray:
+    # Maximum distance in km of the IP replying, half of the round trip
+    return (np.asarray(rtts, dtype=np.float64) / 2 *
+            SPEED_OF_LIGHT_KM_PER_MS * speed_factor)
+
+
+def get_discs_points(latitudes: np.ndarray,
+                     longitudes: np.ndarray,
+                     angular_radii: np.ndarray,
+                     rings: int = INTERSECTION_RINGS,
+                     bearings: int = INTERSECTION_BEARINGS) -> (np.ndarray,
+                                                                np.ndarray):
+    """
+    Return the unit vectors (discs x points x 3) of the center and of the
+    points of every ring of every disc, with the area of the disc each one
+    stands for.
+    """
+    centers = latitudes_longitudes_to_unit_vectors(latitudes, longitudes)
+    latitudes_radians = np.radians(latitudes)
+    longitudes_radians = np.radians(longitudes)
+    # Tangent plane of the center, towards the east and the north
+    east = np.stack([-np.sin(longitudes_radians),
+                     np.cos(longitudes_radians),
+                     np.zeros(len(centers))], axis=-1)
+    north = np.stack([-np.sin(latitudes_radians) * np.cos(longitudes_radians),
+                      -np.sin(latitudes_radians) * np.sin(longitudes_radians),
+                      np.cos(latitudes_radians)], axis=-1)
+    thetas = np.arange(bearings) * 2 * np.pi / bearings
+    directions = (np.cos(thetas)[None, :, None] * east[:, None, :] +
+                  np.sin(thetas)[None, :, None] * north[:, None, :])
+
+    ring_steps = angular_radii / rings
+    deltas = ring_steps[:, None] * np.arange(1, rings + 1)[None, :]
+    rings_points = (
+        np.cos(deltas)[:, :, None, None] * centers[:, None, None, :] +
+        np.sin(deltas)[:, :, None, None] * directions[:, None, :, :]
+    ).reshape(len(centers), rings * bearings, 3)
+    points = np.concatenate([centers[:, None, :], rings_points], axis=1)
+
+    # Annulus around every ring split among its points, cap around the center
+    rings_areas = np.repeat(
+        2 * np.pi * np.sin(deltas) * ring_steps[:, None] / bearings,
+        bearings, axis=1)
+    centers_areas = 2 * np.pi * (1 - np.cos(ring_steps / 2))
+    areas = np.concatenate([centers_areas[:, None], rings_areas], axis=1)
+    return points, areas
+
+
+class DiscsGeolocation:
+    # NOTE: every measurement is a disc around its origin with the distance
+    # travelled in half of its RTT as radius, the IP is in the intersection
+    # of the discs of a result. The points of the smallest disc of every
+    # result inside all the others approximate the intersection and its
+    # centroid, and the candidate airports are the ones inside every disc.
+    # All the discs of many results are checked at once with matrix
+    # products over unit vectors, comparing cosines instead of distances
+    def __init__(self,
+                 airports_index: AirportsIndex = None,
+                 speed_factor: float = FIBER_SPEED_FACTOR,
+                 rings: int = INTERSECTION_RINGS,
+                 bearings: int = INTERSECTION_BEARINGS):
+        self._airports_index = airports_index or get_airports_index()
+        self._airports_vectors = latitudes_longitudes_to_unit_vectors(
+            self._airports_index.latitudes, self._airports_index.longitudes)
+        self._speed_factor = speed_factor
+        self._rings = rings
+        self._bearings = bearings
+
+    # Properties access
+    @property
+    def airports_index(self) -> AirportsIndex:
+        return self._airports_index
+
+    @property
+    def speed_factor(self) -> float:
+        return self._speed_factor
+
+    # Class particular methods
+    def locate(self,
+               groups: np.ndarray,
+               latitudes: np.ndarray,
+               longitudes: np.ndarray,
+               rtts: np.ndarray,
+               groups_count: int) -> (np.ndarray, np.ndarray, np.ndarray,
+                                      np.ndarray, np.ndarray, np.ndarray):
+        """
+        Locate every group from the discs given as (group, latitude,
+        longitude, rtt) arrays. Return if the discs of every group
+        intersect, the latitude and longitude of the centroid of the
+        intersection, the (group, airport) pairs of the airports inside it
+        sorted by group, and the nearest airport to the centroid of the
+        groups without airports inside (NO_AIRPORT for the others).
+        """
+        discs_intersect = np.zeros(groups_count, dtype=bool)
+        centroids = np.zeros((groups_count, 3), dtype=np.float64)
+        airport_groups = [np.zeros(0, dtype=np.int64)]
+        airport_indexes = [np.zeros(0, dtype=np.int64)]
+
+        order = np.argsort(np.asarray(groups, dtype=np.int64), kind="stable")
+        groups = np.asarray(groups, dtype=np.int64)[order]
+        latitudes = np.asarray(latitudes, dtype=np.float64)[order]
+        longitudes = np.asarray(longitudes, dtype=np.float64)[order]
+        angular_radii = np.minimum(get_rtts_distances(
+            np.asarray(rtts, dtype=np.float64)[order],
+            self._speed_factor) / EARTH_RADIUS_KM, np.pi)
+        vectors = latitudes_longitudes_to_unit_vectors(latitudes, longitudes)
+        cosine_radii = np.cos(angular_radii) - COSINE_TOLERANCE
+
+        # NOTE: the chunks hold whole groups, a group with more discs than
+        # the chunk size is located alone
+        located_groups, starts = np.unique(groups, return_index=True)
+        ends = np.r_[starts[1:], len(groups)].astype(np.int64)
+        first = 0
+        while first < len(located_groups):
+            last = max(first + 1, int(np.searchsorted(
+                ends, starts[first] + DISCS_CHUNK_SIZE, side="right")))
+            chunk = slice(starts[first], ends[last - 1])
+            chunk_groups = located_groups[first:last]
+            chunk_intersect, chunk_centroids, chunk_airports = \
+                self.__locate_chunk(
+                    vectors[chunk], cosine_radii[chunk],
+                    latitudes[chunk], longitudes[chunk],
+                    angular_radii[chunk], starts[first:last] - starts[first])
+            discs_intersect[chunk_groups] = chunk_intersect
+            centroids[chunk_groups] = chunk_centroids
+            airport_groups.append(chunk_groups[chunk_airports[0]])
+            airport_indexes.append(chunk_airports[1])
+            first = last
+
+        airport_groups = np.concatenate(airport_groups)
+        airport_indexes = np.concatenate(airport_indexes)
+        centroids_latitudes, centroids_longitudes = \
+            unit_vectors_to_latitudes_longitudes(centroids)
+        centroids_latitudes[~discs_intersect] = np.nan
+        centroids_longitudes[~discs_intersect] = np.nan
+
+        nearest_indexes = np.full(groups_count, NO_AIRPORT, dtype=np.int64)
+        without_airports = discs_intersect.copy()
+        without_airports[airport_groups] = False
+        if without_airports.any():
+            nearest_indexes[without_airports], _ = \
+                self._airports_index.query(
+                    centroids_latitudes[without_airports],
+                    centroids_longitudes[without_airports])
+        return (discs_intersect, centroids_latitudes, centroids_longitudes,
+                airport_groups, airport_indexes, nearest_indexes)
+
+    def __locate_chunk(self,
+                       vectors: np.ndarray,
+                       cosine_radii: np.ndarray,
+                       latitudes: np.ndarray,
+                       longitudes: np.ndarray,
+                       angular_radii: np.ndarray,
+                       starts: np.ndarray) -> (np.ndarray, np.ndarray,
+                                               tuple):
+        discs_groups = np.repeat(np.arange(len(starts)),
+                                 np.diff(np.r_[starts, len(vectors)]))
+        # Smallest disc of every group, the groups keep their positions
+        smallest = np.lexsort((angular_radii, discs_groups))[starts]
+        points, areas = get_discs_points(
+            latitudes[smallest], longitudes[smallest],
+            angular_radii[smallest], self._rings, self._bearings)
+
+        points_inside = np.logical_and.reduceat(
+            np.einsum("dkj,dj->dk", points[discs_groups], vectors) >=
+            cosine_radii[:, None], starts, axis=0)
+        airports_inside = np.logical_and.reduceat(
+            vectors @ self._airports_vectors.T >= cosine_radii[:, None],
+            starts, axis=0)
+
+        # The airports inside stand for the intersections too small to
+        # hold any of the points
+        centroids = np.einsum("gk,gkj->gj", points_inside * areas, points)
+        without_points = ~points_inside.any(axis=1)
+        centroids[without_points] = \
+            airports_inside[without_points] @ self._airports_vectors
+        discs_intersect = ~without_points | airports_inside.any(axis=1)
+        return discs_intersect, centroids, np.nonzero(airports_inside)
+
+
+@lru_cache(maxsize=None)
+def get_discs_geolocation(
+        speed_factor: float = FIBER_SPEED_FACTOR) -> DiscsGeolocation:
+    return DiscsGeolocation(speed_factor=speed_factor)
+
+
+def get_single_value(values: list) -> str:
+    return values[0] if len(set(values)) == 1 else INDETERMINATE
+
+
+def get_discs_location_result(centroid: str,
+                              airports: list[dict],
+                              nearest_airport: bool) -> dict:
+    airports_countries = [airport["country_code"] for airport in airports]
+    airports_cities = [airport["city_name"] for airport in airports]
+    return {
+        "country": get_single_value(airports_countries),
+        "city": get_single_value(airports_cities),
+        "discs_intersect": True,
+        "nearest_airport": nearest_airport,
+        "centroid": centroid,
+        "airports_countries": airports_countries,
+        "airports_cities": airports_cities,
+        "airports_intersection": airports
+    }
+
+
+def get_ips_location_results(ips: list[str],
+                              discs: dict,
+                              geolocation: DiscsGeolocation) -> dict:
+    # Location result of every IP located alone with its own discs,
+    # {ip: location_result}
+    groups = []
+    ips_discs = []
+    for group, ip in enumerate(ips):
+        groups.extend([group] * len(discs[ip]))
+        ips_discs.extend(discs[ip])
+
+    latitudes, longitudes, rtts = np.asarray(ips_discs, dtype=np.float64).T
+    (discs_intersect, centroids_latitudes, centroids_longitudes,
+     airport_groups, airport_indexes, nearest_indexes) = geolocation.locate(
+        np.asarray(groups, dtype=np.int64), latitudes, longitudes, rtts,
+        len(ips))
+
+    centroids = shapely.to_geojson(shapely.points(
+        np.nan_to_num(centroids_longitudes),
+        np.nan_to_num(centroids_latitudes))).tolist()
+    # The airports of all the IPs are serialized at once
+    airports_records = geolocation.airports_index.records
+    airports_indexes = np.unique(np.r_[
+        airport_indexes, nearest_indexes[nearest_indexes != NO_AIRPORT]
+    ]).tolist()
+    airports_dicts = dict(zip(airports_indexes, get_airport_dicts([
+        airports_records[index] for index in airports_indexes
+    ])))
+
+    def get_airports_dicts(indexes: list) -> list[dict]:
+        return [airports_dicts[index] for index in indexes]
+
+    airports_by_group = np.split(airport_indexes, np.searchsorted(
+        airport_groups, np.arange(1, len(ips))))
+    ips_location_results = {}
+    for group, ip in enumerate(ips):
+        if not discs_intersect[group]:
+            location_result = get_indeterminate_location_result()
+        elif len(airports_by_group[group]) > 0:
+            location_result = get_discs_location_result(
+                centroids[group],
+                get_airports_dicts(airports_by_group[group].tolist()),
+                nearest_airport=False)
+        else:
+            location_result = get_discs_location_result(
+                centroids[group],
+                get_airports_dicts([int(nearest_indexes[group])]),
+                nearest_airport=True)
+        ips_location_results[ip] = location_result
+    return ips_location_results
+
+
+def locate_hunter_results(results: list[dict],
+                          discs: dict,
+                          geolocation: DiscsGeolocation) -> int:
+    # Every IP previous to target with discs is located alone, as they are
+    # usually different routers. The IPs whose discs intersect get the
+    # centroid as location, and the location_result of every result is the
+    # one of its first IP, as in the first IP results. Returns how many
+    # results are updated
+    ips = list(dict.fromkeys(
+        ip["ip"] for result in results
+        for ip in result["ips_previous_to_target"] if ip["ip"] in discs))
+    if len(ips) == 0:
+        return 0
+    ips_location_results = get_ips_location_results(ips, discs, geolocation)
+
+    results_located = 0
+    for result in results:
+        ips_previous_to_target = result["ips_previous_to_target"]
+        # NOTE: the IPs without discs, or whose discs do not intersect,
+        # keep the location of the file
+        for ip in ips_previous_to_target:
+            location_result = ips_location_results.get(ip["ip"])
+            if location_result is not None and \
+                    location_result["discs_intersect"]:
+                ip["location"] = location_result["centroid"]
+        if len(ips_previous_to_target) == 0 or \
+                ips_previous_to_target[0]["ip"] not in ips_location_results:
+            continue
+        result["location_result"] = dict(
+            ips_location_results[ips_previous_to_target[0]["ip"]])
+        results_located += 1
+    return results_located
+
+
+def locate_result_file(source_filepath: str,
+                       output_filepath: str,
+                       speed_factor: float = FIBER_SPEED_FACTOR,
+                       voting_filepath: str = None) -> dict:
+    file_summary = {
+        "results": 0,
+        "results_located": 0,
+        "airports_memo_hits": 0,
+        "airports_memo_misses": 0,
+        "airports_memo_locations": {}
+    }
+    geolocation = get_discs_geolocation(speed_factor)
+    reader = HunterResultReader(source_filepath)
+    discs = get_result_file_discs(reader)
+
+    def locate_batch(results: list[dict]):
+        file_summary["results"] += len(results)
+        file_summary["results_located"] += locate_hunter_results(
+            results, discs, geolocation)
+
+    with atomic_output_file(output_filepath) as output:
+        reader.rewrite_hunter_results_in_batches(output, locate_batch)
+
+    # NOTE: the results are voted over the locations of their IPs just
+    # recomputed, and the airports memo locations resolved by the worker
+    # are sent back to the main process
+    if voting_filepath is not None:
+        voting_summary = vote_result_file(output_filepath, voting_filepath)
+        for key in ("airports_memo_hits", "airports_memo_misses",
+                    "airports_memo_locations"):
+            file_summary[key] = voting_summary[key]
+    return file_summary
+
+
+def run_discs_geolocation(output_folder: str,
+                          results_folder: str = EXPERIMENT_RESULTS_FIRST_IP_DIR,
+                          voting_folder: str = None,
+                          speed_factor: float = FIBER_SPEED_FACTOR,
+                          processes: int = None) -> dict:
+    # The results located are saved to the output folder, and voted to the
+    # voting folder when it is given
+    summary = {
+        "files": 0,
+        "files_processed": 0,
+        "files_failed": {},
+        "results": 0,
+        "results_located": 0,
+        "airports_memo_hits": 0,
+        "airports_memo_misses": 0
+    }
+
+    airports_memo = get_airports_memo()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {}
+        for filename in sorted(get_list_files_in_path(results_folder)):
+            summary["files"] += 1
+            futures[executor.submit(
+                locate_result_file,
+                f"{results_folder}/{filename}",
+                f"{output_folder}/{filename}",
+                speed_factor,
+                None if voting_folder is None
+                else f"{voting_folder}/{filename}"
+            )] = filename
+
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                file_summary = future.result()
+            except Exception as exception:
+                summary["files_failed"][filename] = repr(exception)
+                continue
+            summary["files_processed"] += 1
+            summary["results"] += file_summary["results"]
+            summary["results_located"] += file_summary["results_located"]
+            summary["airports_memo_hits"] += \
+                file_summary["airports_memo_hits"]
+            summary["airports_memo_misses"] += \
+                file_summary["airports_memo_misses"]
+            airports_memo.update(file_summary["airports_memo_locations"])
+
+    if summary["airports_memo_misses"] > 0:
+        airports_memo.save()
+    return summary
+
+
+def main(arguments: list[str] = None):
+    parser = argparse.ArgumentParser(
+        description="Recalculate the location of the hunter results "
+                    "intersecting the discs of the RTTs of their "
+                    "measurements")
+    parser.add_argument("--input", default=EXPERIMENT_RESULTS_FIRST_IP_DIR,
+                        help="folder with the hunter results to locate")
+    parser.add_argument("--output", required=True,
+                        help="folder where the located results are saved")
+    parser.add_argument("--voting", default=None,
+                        help="folder where the located results are voted")
+    parser.add_argument("--speed-factor", type=float,
+                        default=FIBER_SPEED_FACTOR,
+                        help="fraction of the speed of light travelled by "
+                             "the packets")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="number of worker processes "
+                             "(default: number of CPUs)")
+    parsed_arguments = parser.parse_args(arguments)
+
+    summary = run_discs_geolocation(
+        output_folder=parsed_arguments.output,
+        results_folder=parsed_arguments.input,
+        voting_folder=parsed_arguments.voting,
+        speed_factor=parsed_arguments.speed_factor,
+        processes=parsed_arguments.processes
+    )
+
+    print(f"Files: {summary['files']} "
+          f"(processed: {summary['files_processed']}, "
+          f"failed: {len(summary['files_failed'])})")
+    print(f"Results: {summary['results']} "
+          f"(located: {summary['results_located']})")
+    if parsed_arguments.voting is not None:
+        print(f"Airports memo: {summary['airports_memo_hits']} hits, "
+              f"{summary['airports_memo_misses']} misses")
+    for filename, error in summary["files_failed"].items():
+        print(f"FAILED {filename}: {error}")
+
+    return summary
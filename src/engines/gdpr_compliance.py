@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+from functools import reduce
+from operator import or_
+import numpy as np
+import pandas as pd
+# internal imports
+from src.utils.common_functions import (
+    json_file_to_dict
+)
+from src.utils.typed_tables import parse_list_column
+from src.utils.constants import (
+    ALL_COUNTRIES_FILEPATH
+)
+
+
+class CountryBitmaskEncoder:
+    # Every country code is a bit of an integer, so a set of countries is a
+    # single integer and the set operations are bitwise operations
+    def __init__(self, country_codes: list[str] = None):
+        if country_codes is None:
+            country_codes = [
+                country["alpha-2"]
+                for country in json_file_to_dict(ALL_COUNTRIES_FILEPATH,
+                                                cached=True)
+            ]
+        self._country_codes = []
+        self._bits = {}
+        for country_code in country_codes:
+            self.__intern(country_code)
+
+    # Properties access
+    @property
+    def country_codes(self) -> list[str]:
+        return self._country_codes
+
+    # Class particular methods
+    def encode(self, countries) -> int:
+        # NOTE: codes missing in the countries file get a new bit, so the
+        # result is the same as comparing the sets
+        mask = 0
+        for country_code in countries:
+            mask |= 1 << self.__intern(country_code)
+        return mask
+
+    def decode(self, mask: int) -> list[str]:
+        countries = []
+        bit = 0
+        while mask:
+            if mask & 1:
+                countries.append(self._country_codes[bit])
+            mask >>= 1
+            bit += 1
+        return countries
+
+    def encode_column(self, column: pd.Series) -> (np.ndarray, list[int]):
+        # Index of the set of every row and the mask of every different set
+        country_sets = parse_list_column(column, as_set=True).map(frozenset)
+        set_indexes, unique_sets = pd.factorize(country_sets)
+        return set_indexes, [
+            self.encode(country_set) for country_set in unique_sets
+        ]
+
+    def __intern(self, country_code: str) -> int:
+        bit = self._bits.get(country_code)
+        if bit is None:
+            bit = len(self._country_codes)
+            self._bits[country_code] = bit
+            self._country_codes.append(country_code)
+        return bit
+
+
+class TransferComplianceEngine:
+    # An international transfer is compliant when every destination country
+    # is mentioned by the privacy policy
+    def __init__(self, encoder: CountryBitmaskEncoder = None):
+        self._encoder = encoder
+
+    # Properties access
+    @property
+    def encoder(self) -> CountryBitmaskEncoder:
+        if self._encoder is None:
+            self._encoder = CountryBitmaskEncoder()
+        return self._encoder
+
+    # Class particular methods
+    def get_violation_masks(self,
+                            destinations: pd.Series,
+                            mentioned_countries: pd.Series) -> np.ndarray:
+        # Mask of the destinations not mentioned by every row, only the
+        # different (destinations, mentioned countries) pairs are evaluated
+        destination_indexes, destination_masks = self.encoder.encode_column(
+            destinations)
+        mentioned_indexes, mentioned_masks = self.encoder.encode_column(
+            mentioned_countries)
+
+        mentioned_count = max(len(mentioned_masks), 1)
+        pair_keys = (destination_indexes.astype(np.int64) * mentioned_count +
+                     mentioned_indexes)
+        unique_pair_keys, pair_indexes = np.unique(
+            pair_keys, return_inverse=True)
+        pair_violation_masks = np.asarray([
+            destination_masks[pair_key // mentioned_count] &
+            ~mentioned_masks[pair_key % mentioned_count]
+            for pair_key in unique_pair_keys.tolist()
+        ], dtype=object)
+
+        if len(pair_violation_masks) == 0:
+            return np.zeros(0, dtype=object)
+        return pair_violation_masks[pair_indexes.reshape(-1)]
+
+    def check_compliance(self,
+                         destinations: pd.Series,
+                         mentioned_countries: pd.Series) -> np.ndarray:
+        violation_masks = self.get_violation_masks(
+            destinations, mentioned_countries)
+        return (violation_masks == 0).astype(bool)
+
+    def get_violating_countries(self,
+                                destinations: pd.Series,
+                                mentioned_countries: pd.Series) -> pd.Series:
+        violation_masks = self.get_violation_masks(
+            destinations, mentioned_countries)
+        decoded_masks = {
+            mask: self.encoder.decode(mask)
+            for mask in set(violation_masks.tolist())
+        }
+        return pd.Series(
+            [decoded_masks[mask] for mask in violation_masks.tolist()],
+            index=destinations.index, dtype=object)
+
+    def get_violations_report(self,
+                              dataframe: pd.DataFrame,
+                              group_column: str,
+                              destinations_column: str,
+                              mentioned_countries_column: str
+                              ) -> pd.DataFrame:
+        # One row per APK/TPL with the countries receiving transfers that are
+        # not mentioned by its privacy policy
+        violation_masks = self.get_violation_masks(
+            dataframe[destinations_column],
+            dataframe[mentioned_countries_column])
+        violations_df = pd.DataFrame({
+            group_column: dataframe[group_column].to_numpy(),
+            "violation_mask": violation_masks
+        })
+        violations_df["non_compliant"] = violations_df["violation_mask"] != 0
+
+        report_df = violations_df.groupby(group_column, sort=True).agg(
+            rows=("violation_mask", "size"),
+            non_compliant_rows=("non_compliant", "sum"),
+            violation_mask=("violation_mask",
+                            lambda masks: reduce(or_, set(masks), 0))
+        ).reset_index()
+        report_df["it_gdpr_compliance"] = report_df["violation_mask"] == 0
+        report_df["violating_countries"] = report_df["violation_mask"].map(
+            lambda mask: sorted(self.encoder.decode(mask)))
+        return report_df.drop(columns="violation_mask")
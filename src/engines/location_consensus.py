@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import json
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    as_completed
+)
+import numpy as np
+import pandas as pd
+# internal imports
+from src.utils.airports_memo import (
+    AirportsMemo,
+    get_airports_memo
+)
+from src.utils.common_functions import (
+    get_list_files_in_path
+)
+from src.utils.hunter_result_reader import (
+    HunterResultReader,
+    get_result_file_rtts
+)
+
+INDETERMINATE = "Indeterminate"
+
+# Rules to choose the location of a result from the votes of its IPs
+MAJORITY_RULE = "majority"
+PLURALITY_RULE = "plurality"
+CONSENSUS_RULES = [MAJORITY_RULE, PLURALITY_RULE]
+
+# Weight of the vote of every IP previous to target
+UNIFORM_WEIGHTING = "uniform"
+DISTANCE_WEIGHTING = "distance"
+RTT_WEIGHTING = "rtt"
+CONSENSUS_WEIGHTINGS = [UNIFORM_WEIGHTING, DISTANCE_WEIGHTING, RTT_WEIGHTING]
+
+NO_CONSENSUS = -1
+
+
+def get_consensus(groups: np.ndarray,
+                  labels: np.ndarray,
+                  weights: np.ndarray,
+                  groups_count: int,
+                  rule: str = MAJORITY_RULE) -> np.ndarray:
+    """
+    Return the label chosen for every group from the weighted votes given as
+    (group, label, weight) arrays, NO_CONSENSUS when there is none.
+    """
+    # NOTE: the votes of every (group, label) pair are added with a single
+    # bincount over the pairs found, instead of counting every label of
+    # every group
+    consensus = np.full(groups_count, NO_CONSENSUS, dtype=np.int64)
+    if len(groups) == 0:
+        return consensus
+    labels_count = int(labels.max()) + 1
+    pairs, pair_indexes = np.unique(
+        groups.astype(np.int64) * labels_count + labels,
+        return_inverse=True)
+    pair_weights = np.bincount(pair_indexes.reshape(-1), weights=weights)
+    pair_groups = pairs // labels_count
+    pair_labels = pairs % labels_count
+
+    if rule == MAJORITY_RULE:
+        # Strictly more than half of the weight of the group
+        totals = np.bincount(groups, weights=weights, minlength=groups_count)
+        winners = pair_weights > totals[pair_groups] / 2
+        consensus[pair_groups[winners]] = pair_labels[winners]
+    elif rule == PLURALITY_RULE:
+        # Highest weight of the group, ties have no consensus
+        order = np.lexsort((-pair_weights, pair_groups))
+        sorted_groups = pair_groups[order]
+        sorted_weights = pair_weights[order]
+        firsts = np.flatnonzero(np.r_[True, sorted_groups[1:] !=
+                                      sorted_groups[:-1]])
+        seconds = firsts + 1
+        tied = np.zeros(len(firsts), dtype=bool)
+        has_second = seconds < len(order)
+        tied[has_second] = (
+            (sorted_groups[seconds[has_second]] ==
+             sorted_groups[firsts[has_second]]) &
+            (sorted_weights[seconds[has_second]] ==
+             sorted_weights[firsts[has_second]]))
+        winners = order[firsts[~tied]]
+        consensus[pair_groups[winners]] = pair_labels[winners]
+    else:
+        raise ValueError(f"Unknown consensus rule: {rule}")
+
+    return consensus
+
+
+def get_location_coordinates(location: str) -> tuple:
+    return tuple(json.loads(location)["coordinates"])
+
+
+class LocationVotes:
+    # NOTE: the votes of a batch of hunter results, every IP previous to
+    # target votes for the country and city of its nearest airport. The
+    # airports are looked up once for the whole batch, so several rules and
+    # weightings are compared without looking them up again. Only results
+    # with more than one different location are voted. The RTT weighting
+    # needs the minimum RTT of every IP, {ip: rtt}, from the measurements
+    # of the file (see get_result_file_rtts)
+    def __init__(self,
+                 results: list[dict],
+                 airports_memo: AirportsMemo = None,
+                 ips_rtts: dict = None):
+        self._airports_memo = airports_memo or get_airports_memo()
+        ips_rtts = ips_rtts or {}
+
+        # Locations are compared as coordinates tuples, parsed once per
+        # different GeoJSON text
+        coordinates_by_location = {}
+        result_indexes = []
+        groups = []
+        coordinates = []
+        rtts = []
+        for result_index, result in enumerate(results):
+            ips_previous_to_target = result["ips_previous_to_target"]
+            if len(ips_previous_to_target) <= 1:
+                continue
+            ips_coordinates = []
+            for ip in ips_previous_to_target:
+                location = ip["location"]
+                if location not in coordinates_by_location:
+                    coordinates_by_location[location] = \
+                        get_location_coordinates(location)
+                ips_coordinates.append(coordinates_by_location[location])
+            if len(set(ips_coordinates)) <= 1:
+                continue
+
+            groups.extend([len(result_indexes)] * len(ips_coordinates))
+            result_indexes.append(result_index)
+            coordinates.extend(ips_coordinates)
+            rtts.extend(ips_rtts.get(ip["ip"], np.nan)
+                        for ip in ips_previous_to_target)
+
+        self._result_indexes = np.asarray(result_indexes, dtype=np.int64)
+        self._groups = np.asarray(groups, dtype=np.int64)
+        self._rtts = np.asarray(rtts, dtype=np.float64)
+        if len(coordinates) > 0:
+            longitudes, latitudes = np.asarray(
+                coordinates, dtype=np.float64).T[:2]
+            self._airport_indexes, self._distances = \
+                self._airports_memo.query(latitudes, longitudes)
+        else:
+            self._airport_indexes = np.zeros(0, dtype=np.int64)
+            self._distances = np.zeros(0, dtype=np.float64)
+
+        airports = self._airports_memo.get_airport_dicts(
+            self._airport_indexes.tolist())
+        self._country_labels, self._countries = pd.factorize(
+            pd.Series([airport["country_code"] for airport in airports],
+                      dtype=object), use_na_sentinel=False)
+        self._city_labels, self._cities = pd.factorize(
+            pd.Series([airport["city_name"] for airport in airports],
+                      dtype=object), use_na_sentinel=False)
+
+    def __len__(self) -> int:
+        return len(self._result_indexes)
+
+    # Properties access
+    @property
+    def result_indexes(self) -> np.ndarray:
+        return self._result_indexes
+
+    @property
+    def airport_indexes(self) -> np.ndarray:
+        return self._airport_indexes
+
+    # Class particular methods
+    def get_weights(self, weighting: str = UNIFORM_WEIGHTING) -> np.ndarray:
+        if weighting == UNIFORM_WEIGHTING:
+            return np.ones(len(self._groups), dtype=np.float64)
+        if weighting == DISTANCE_WEIGHTING:
+            # The IPs nearer to their airport weigh more
+            return 1 / (1 + self._distances)
+        if weighting == RTT_WEIGHTING:
+            # NOTE: the results with any IP without RTT, e.g. that did not
+            # reply to any measurement, are voted with uniform weights
+            weights = 1 / (1 + np.maximum(self._rtts, 0))
+            missing_rtts = np.bincount(
+                self._groups, weights=np.isnan(self._rtts),
+                minlength=len(self)) > 0
+            weights[missing_rtts[self._groups]] = 1
+            return weights
+        raise ValueError(f"Unknown consensus weighting: {weighting}")
+
+    def get_consensus(self,
+                      rule: str = MAJORITY_RULE,
+                      weighting: str = UNIFORM_WEIGHTING) -> (list, list):
+        # Country and city of every result voted
+        weights = self.get_weights(weighting)
+        countries = get_consensus(self._groups, self._country_labels,
+                                  weights, len(self), rule)
+        cities = get_consensus(self._groups, self._city_labels,
+                               weights, len(self), rule)
+        return (self.__decode(countries, self._countries),
+                self.__decode(cities, self._cities))
+
+    def apply(self,
+              results: list[dict],
+              rule: str = MAJORITY_RULE,
+              weighting: str = UNIFORM_WEIGHTING) -> int:
+        # Update the location_result of the results voted, returns how many
+        countries, cities = self.get_consensus(rule, weighting)
+        airports_indexes = list(set(self._airport_indexes.tolist()))
+        airports_dicts = dict(zip(
+            airports_indexes,
+            self._airports_memo.get_airport_dicts(airports_indexes)))
+        airports_by_result = np.split(
+            self._airport_indexes,
+            np.flatnonzero(np.diff(self._groups)) + 1)
+
+        for position, result_index in enumerate(
+                self._result_indexes.tolist()):
+            airports_list = [
+                airports_dicts[airport_index]
+                for airport_index in airports_by_result[position].tolist()
+            ]
+            location_result = results[result_index]["location_result"]
+            location_result["airports_intersection"] = airports_list
+            location_result["airports_countries"] = [
+                airport["country_code"] for airport in airports_list
+            ]
+            location_result["airports_cities"] = [
+                airport["city_name"] for airport in airports_list
+            ]
+            location_result["country"] = countries[position]
+            location_result["city"] = cities[position]
+            if (cities[position] == INDETERMINATE or
+                    countries[position] == INDETERMINATE):
+                location_result["centroid"] = ""
+                location_result["nearest_airport"] = False
+
+        return len(self)
+
+    @staticmethod
+    def __decode(consensus: np.ndarray, values: pd.Index) -> list:
+        return [
+            INDETERMINATE if label == NO_CONSENSUS else values[label]
+            for label in consensus.tolist()
+        ]
+
+
+def get_file_consensus(results_filepath: str,
+                       strategies: list[tuple]) -> pd.DataFrame:
+    # Country and city of the results voted of a file for every
+    # (rule, weighting) strategy, without rewriting it
+    reader = HunterResultReader(results_filepath)
+    results = list(reader.iter_hunter_results())
+    ips_rtts = None
+    if any(weighting == RTT_WEIGHTING for _, weighting in strategies):
+        ips_rtts = get_result_file_rtts(reader)
+    votes = LocationVotes(results, ips_rtts=ips_rtts)
+    consensus_df = pd.DataFrame({
+        "result_index": votes.result_indexes,
+        "origin_id": [
+            results[result_index].get("origin_id")
+            for result_index in votes.result_indexes.tolist()
+        ]
+    })
+    for rule, weighting in strategies:
+        countries, cities = votes.get_consensus(rule, weighting)
+        consensus_df[f"country_{rule}_{weighting}"] = countries
+        consensus_df[f"city_{rule}_{weighting}"] = cities
+    return consensus_df
+
+
+def compare_consensus_strategies(results_folder: str,
+                                 strategies: list[tuple] = None,
+                                 processes: int = None) -> pd.DataFrame:
+    # One row per result voted of the campaign with the country and city
+    # given by every strategy, every rule with every weighting by default
+    if strategies is None:
+        strategies = [
+            (rule, weighting)
+            for rule in CONSENSUS_RULES
+            for weighting in CONSENSUS_WEIGHTINGS
+        ]
+
+    files_consensus = []
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {
+            executor.submit(get_file_consensus,
+                            f"{results_folder}/{filename}",
+                            strategies): filename
+            for filename in sorted(get_list_files_in_path(results_folder))
+        }
+        for future in as_completed(futures):
+            file_consensus_df = future.result()
+            file_consensus_df.insert(0, "result_filename", futures[future])
+            files_consensus.append(file_consensus_df)
+
+    if len(files_consensus) == 0:
+        return pd.DataFrame()
+    return pd.concat(files_consensus, ignore_index=True).sort_values(
+        ["result_filename", "result_index"], ignore_index=True)
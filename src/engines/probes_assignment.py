@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import numpy as np
+import pandas as pd
+import shapely
+from shapely import STRtree
+# internal imports
+from src.models.mesh_model import MeshModel
+from src.utils.json_io import read_json_file
+
+# Policies to choose the probes of every cell of the mesh
+RANDOM_POLICY = "random"
+MOST_STABLE_POLICY = "most_stable"
+CLOSEST_TO_CENTROID_POLICY = "closest_to_centroid"
+ASSIGNMENT_POLICIES = [
+    RANDOM_POLICY, MOST_STABLE_POLICY, CLOSEST_TO_CENTROID_POLICY
+]
+
+CONNECTED_PROBE_STATUS = "Connected"
+
+NO_CELL = -1
+
+# Columns of the probes table, whatever the format of the dump
+PROBES_COLUMNS = ["id", "longitude", "latitude", "country_code", "status",
+                  "total_uptime", "status_since"]
+
+
+def get_probe_row(probe: dict) -> list:
+    # Probe as returned by the RIPE Atlas API, the location is a GeoJSON
+    # point and the status an object with its name
+    coordinates = (probe.get("geometry") or {}).get("coordinates") or \
+        [probe.get("longitude"), probe.get("latitude")]
+    status = probe.get("status")
+    if isinstance(status, dict):
+        status = status.get("name")
+    return [probe["id"], coordinates[0], coordinates[1],
+            probe.get("country_code"), status, probe.get("total_uptime"),
+            probe.get("status_since")]
+
+
+def load_probes(probes_filepath: str,
+                connected_only: bool = True) -> pd.DataFrame:
+    """
+    Load a dump of RIPE Atlas probes, the JSON returned by the probes API
+    (the page or only its results) or a CSV with at least the id, longitude
+    and latitude columns. The probes without location are dropped, and the
+    ones not connected when the dump has their status.
+    """
+    if probes_filepath.endswith(".csv"):
+        probes = pd.read_csv(probes_filepath)
+        for column in PROBES_COLUMNS:
+            if column not in probes.columns:
+                probes[column] = None
+        probes = probes[PROBES_COLUMNS]
+    else:
+        probes_dump = read_json_file(probes_filepath)
+        if isinstance(probes_dump, dict):
+            probes_dump = probes_dump["results"]
+        probes = pd.DataFrame(
+            [get_probe_row(probe) for probe in probes_dump],
+            columns=PROBES_COLUMNS)
+
+    probes["longitude"] = pd.to_numeric(probes["longitude"], errors="coerce")
+    probes["latitude"] = pd.to_numeric(probes["latitude"], errors="coerce")
+    probes["total_uptime"] = pd.to_numeric(
+        probes["total_uptime"], errors="coerce").fillna(0)
+    probes["status_since"] = pd.to_numeric(
+        probes["status_since"], errors="coerce")
+    probes = probes[probes["longitude"].notna() & probes["latitude"].notna()]
+    if connected_only:
+        # Probes without status (e.g. a CSV without the column) are kept
+        probes = probes[probes["status"].isna() |
+                        (probes["status"] == CONNECTED_PROBE_STATUS)]
+    return probes.reset_index(drop=True)
+
+
+class ProbesAssignment:
+    # NOTE: the cell of every probe is computed dividing its coordinates by
+    # the spacing of the grid, the cells of the mesh are found in the sorted
+    # grid indexes of the MeshModel. Only the probes out of the cell found
+    # (the grid is accumulated so it may drift from the division) are looked
+    # up in an STRtree of the cells
+    def __init__(self, mesh_model: MeshModel):
+        self._mesh_model = mesh_model
+        self._cells_tree = None
+        cells_bounds = shapely.bounds(mesh_model.cells).reshape(-1, 4)
+        self._cells_bounds = cells_bounds
+        self._cells_centroids = np.column_stack((
+            (cells_bounds[:, 0] + cells_bounds[:, 2]) / 2,
+            (cells_bounds[:, 1] + cells_bounds[:, 3]) / 2
+        ))
+
+    # Properties access
+    @property
+    def mesh_model(self) -> MeshModel:
+        return self._mesh_model
+
+    @property
+    def cells_centroids(self) -> np.ndarray:
+        return self._cells_centroids
+
+    # Class particular methods
+    def get_cells(self,
+                  longitudes: np.ndarray,
+                  latitudes: np.ndarray) -> np.ndarray:
+        """
+        Return the index in the mesh of the cell of every location, NO_CELL
+        for the locations out of the mesh.
+        """
+        longitudes = np.asarray(longitudes, dtype=np.float64)
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        cells = np.full(len(longitudes), NO_CELL, dtype=np.int64)
+        x_grid = self._mesh_model.x_grid
+        y_grid = self._mesh_model.y_grid
+        if len(longitudes) == 0 or len(self._cells_bounds) == 0:
+            return cells
+
+        spacing = self._mesh_model.spacing
+        columns = np.floor((longitudes - x_grid[0]) / spacing).astype(np.int64)
+        rows = np.floor((latitudes - y_grid[0]) / spacing).astype(np.int64)
+        in_grid = (columns >= 0) & (columns < len(x_grid)) & \
+            (rows >= 0) & (rows < len(y_grid))
+        grid_indexes = rows * len(x_grid) + columns
+
+        cells_grid_indexes = self._mesh_model.cells_grid_indexes
+        positions = np.searchsorted(cells_grid_indexes, grid_indexes)
+        positions = np.minimum(positions, len(cells_grid_indexes) - 1)
+        found = in_grid & (cells_grid_indexes[positions] == grid_indexes)
+        cells[found] = positions[found]
+
+        # Locations on the border of the cell found or out of it
+        cells_bounds = self._cells_bounds[cells]
+        inside = found & \
+            (longitudes >= cells_bounds[:, 0]) & \
+            (longitudes < cells_bounds[:, 2]) & \
+            (latitudes >= cells_bounds[:, 1]) & \
+            (latitudes < cells_bounds[:, 3])
+        fallback = np.flatnonzero(~inside)
+        cells[fallback] = NO_CELL
+        if len(fallback) > 0:
+            cells[fallback] = self.__query_cells(
+                longitudes[fallback], latitudes[fallback])
+        return cells
+
+    def assign(self,
+               probes: pd.DataFrame,
+               policy: str = RANDOM_POLICY,
+               probes_per_section: int = None,
+               seed: int = None) -> pd.DataFrame:
+        """
+        Return up to probes_per_section probes of every cell of the mesh,
+        chosen by the policy, with the index of their cell. The probes out
+        of the mesh are never chosen.
+        """
+        if policy not in ASSIGNMENT_POLICIES:
+            raise ValueError(f"Unknown assignment policy {policy}")
+        if probes_per_section is None:
+            probes_per_section = self._mesh_model.probes_per_section
+
+        cells = self.get_cells(probes["longitude"].to_numpy(),
+                               probes["latitude"].to_numpy())
+        in_mesh = np.flatnonzero(cells != NO_CELL)
+        cells = cells[in_mesh]
+        sort_keys = self.__get_sort_keys(
+            probes.iloc[in_mesh], cells, policy, seed)
+
+        # NOTE: the probes are sorted by cell and inside every cell by the
+        # policy, their rank in the cell is their position minus the one of
+        # the first probe of the cell
+        order = np.lexsort(sort_keys + (cells,))
+        sorted_cells = cells[order]
+        cell_starts = np.flatnonzero(
+            np.diff(sorted_cells, prepend=NO_CELL) != 0)
+        ranks = np.arange(len(order)) - np.repeat(
+            cell_starts, np.diff(np.r_[cell_starts, len(order)]))
+        chosen = order[ranks < probes_per_section]
+
+        assigned_probes = probes.iloc[in_mesh[chosen]].copy()
+        assigned_probes["cell"] = cells[chosen]
+        return assigned_probes.reset_index(drop=True)
+
+    def __get_sort_keys(self,
+                        probes: pd.DataFrame,
+                        cells: np.ndarray,
+                        policy: str,
+                        seed: int) -> tuple:
+        # Keys of np.lexsort, the last one is the primary, ties are broken by
+        # the probe id to keep the choice stable
+        probe_ids = probes["id"].to_numpy()
+        if policy == RANDOM_POLICY:
+            random_keys = np.random.default_rng(seed).random(len(cells))
+            return probe_ids, random_keys
+        if policy == MOST_STABLE_POLICY:
+            # Longest uptime first, then connected since the longest time
+            status_since = probes["status_since"].fillna(
+                np.inf).to_numpy(dtype=np.float64)
+            return (probe_ids, status_since,
+                    -probes["total_uptime"].to_numpy(dtype=np.float64))
+        centroids = self._cells_centroids[cells]
+        distances = np.hypot(
+            probes["longitude"].to_numpy(dtype=np.float64) - centroids[:, 0],
+            probes["latitude"].to_numpy(dtype=np.float64) - centroids[:, 1])
+        return probe_ids, distances
+
+    def __query_cells(self,
+                      longitudes: np.ndarray,
+                      latitudes: np.ndarray) -> np.ndarray:
+        # First cell of the mesh that covers every location, the border of
+        # the cells included
+        if self._cells_tree is None:
+            self._cells_tree = STRtree(self._mesh_model.cells)
+        cells = np.full(len(longitudes), NO_CELL, dtype=np.int64)
+        location_indexes, cell_indexes = self._cells_tree.query(
+            shapely.points(longitudes, latitudes), predicate="intersects")
+        # Pairs sorted by location and cell, the first of every location
+        order = np.lexsort((cell_indexes, location_indexes))
+        location_indexes = location_indexes[order]
+        cell_indexes = cell_indexes[order]
+        first = np.diff(location_indexes, prepend=-1) != 0
+        cells[location_indexes[first]] = cell_indexes[first]
+        return cells
+
+
+def assign_probes(mesh_model: MeshModel,
+                  probes_filepath: str,
+                  policy: str = RANDOM_POLICY,
+                  probes_per_section: int = None,
+                  seed: int = None) -> pd.DataFrame:
+    return ProbesAssignment(mesh_model).assign(
+        load_probes(probes_filepath), policy=policy,
+        probes_per_section=probes_per_section, seed=seed)
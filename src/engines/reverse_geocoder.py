@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+from functools import lru_cache
+import warnings
+import numpy as np
+from shapely import (
+    points,
+    STRtree
+)
+# internal imports
+from src.utils.common_functions import (
+    json_file_to_dict,
+    convert_km_radius_to_degrees
+)
+from src.utils.country_borders import load_country_borders
+from src.utils.constants import (
+    ALL_COUNTRIES_FILEPATH,
+    COUNTRY_BORDERS_GEOJSON_FILEPATH
+)
+
+# Code returned for the locations that are not in any country
+UNKNOWN_COUNTRY_CODE = ""
+# Maximum distance to a border to assign a point outside every polygon
+DEFAULT_MAX_OFFSHORE_KM = 25
+# Borders file names (CNTRY_NAME) that differ from the countries file ones
+COUNTRY_BORDERS_NAMES_ALIASES = {
+    "Bahamas, The": "Bahamas",
+    "The Bahamas": "Bahamas",
+    "Bolivia": "Bolivia (Plurinational State of)",
+    "Brunei": "Brunei Darussalam",
+    "British Virgin Islands": "Virgin Islands (British)",
+    "Burma": "Myanmar",
+    "Cape Verde": "Cabo Verde",
+    "Congo DRC": "Congo, Democratic Republic of the",
+    "Cote d'Ivoire": "Côte d'Ivoire",
+    "Curacao": "Curaçao",
+    "Czech Republic": "Czechia",
+    "East Timor": "Timor-Leste",
+    "Falkland Islands (Islas Malvinas)": "Falkland Islands (Malvinas)",
+    "Gambia, The": "Gambia",
+    "The Gambia": "Gambia",
+    "Iran": "Iran (Islamic Republic of)",
+    "Ivory Coast": "Côte d'Ivoire",
+    "Laos": "Lao People's Democratic Republic",
+    "Macau": "Macao",
+    "Macedonia": "North Macedonia",
+    "Micronesia": "Micronesia (Federated States of)",
+    "Moldova": "Moldova, Republic of",
+    "North Korea": "Korea (Democratic People's Republic of)",
+    "Palestine": "Palestine, State of",
+    "Reunion": "Réunion",
+    "Russia": "Russian Federation",
+    "South Korea": "Korea, Republic of",
+    "St. Helena": "Saint Helena, Ascension and Tristan da Cunha",
+    "St. Kitts and Nevis": "Saint Kitts and Nevis",
+    "St. Lucia": "Saint Lucia",
+    "St. Pierre and Miquelon": "Saint Pierre and Miquelon",
+    "St. Vincent and the Grenadines": "Saint Vincent and the Grenadines",
+    "Swaziland": "Eswatini",
+    "Syria": "Syrian Arab Republic",
+    "Taiwan": "Taiwan, Province of China",
+    "Tanzania": "Tanzania, United Republic of",
+    "United Kingdom": "United Kingdom of Great Britain and Northern Ireland",
+    "United States": "United States of America",
+    "Vatican City": "Holy See",
+    "Venezuela": "Venezuela (Bolivarian Republic of)",
+    "Vietnam": "Viet Nam",
+    "Virgin Islands": "Virgin Islands (U.S.)",
+    "Zaire": "Congo, Democratic Republic of the"
+}
+
+
+def get_border_country_codes(country_names: np.ndarray) -> np.ndarray:
+    # Country code of every border name, warning once about the names
+    # missing in the countries file
+    country_codes_by_name = {
+        country["name"]: country["alpha-2"]
+        for country in json_file_to_dict(ALL_COUNTRIES_FILEPATH, cached=True)
+    }
+    country_codes = []
+    unmapped_names = set()
+    for country_name in map(str, country_names):
+        country_name = COUNTRY_BORDERS_NAMES_ALIASES.get(
+            country_name, country_name)
+        country_code = country_codes_by_name.get(country_name)
+        if country_code is None:
+            unmapped_names.add(country_name)
+            country_code = UNKNOWN_COUNTRY_CODE
+        country_codes.append(country_code)
+    if unmapped_names:
+        warnings.warn(
+            f"Borders without country code, their locations get "
+            f"{UNKNOWN_COUNTRY_CODE!r}: {', '.join(sorted(unmapped_names))}")
+    return np.asarray(country_codes, dtype=object)
+
+
+class ReverseGeocoder:
+    def __init__(self,
+                 geojson_filepath: str = COUNTRY_BORDERS_GEOJSON_FILEPATH,
+                 max_offshore_km: float = DEFAULT_MAX_OFFSHORE_KM):
+        country_names, geometries = load_country_borders(geojson_filepath)
+        self._country_codes = get_border_country_codes(country_names)
+        self._borders_tree = STRtree(geometries)
+        # NOTE: the fallback distance is measured in degrees over the
+        # polygons coordinates, enough for points just off the coast
+        self._max_offshore_degrees = convert_km_radius_to_degrees(
+            max_offshore_km)
+
+    # Class particular methods
+    def query_borders(self,
+                      longitudes: np.ndarray,
+                      latitudes: np.ndarray) -> np.ndarray:
+        # Index of the border containing every point, or the nearest border
+        # in the offshore distance, -1 if none
+        locations = points(
+            np.atleast_1d(np.asarray(longitudes, dtype=np.float64)),
+            np.atleast_1d(np.asarray(latitudes, dtype=np.float64)))
+        borders_indexes = np.full(len(locations), -1, dtype=np.int64)
+
+        locations_indexes, tree_indexes = self._borders_tree.query(
+            locations, predicate="intersects")
+        # Points over a shared border keep the first border of the file
+        order = np.lexsort((tree_indexes, locations_indexes))
+        locations_indexes = locations_indexes[order]
+        tree_indexes = tree_indexes[order]
+        first_matches = np.unique(locations_indexes, return_index=True)[1]
+        borders_indexes[locations_indexes[first_matches]] = \
+            tree_indexes[first_matches]
+
+        offshore_indexes = np.flatnonzero(borders_indexes == -1)
+        if len(offshore_indexes) > 0 and self._max_offshore_degrees > 0:
+            nearest_locations, nearest_borders = \
+                self._borders_tree.query_nearest(
+                    locations[offshore_indexes],
+                    max_distance=self._max_offshore_degrees,
+                    all_matches=False)
+            borders_indexes[offshore_indexes[nearest_locations]] = \
+                nearest_borders
+
+        return borders_indexes
+
+    def country_codes(self,
+                      longitudes: np.ndarray,
+                      latitudes: np.ndarray) -> np.ndarray:
+        borders_indexes = self.query_borders(longitudes, latitudes)
+        country_codes = np.full(
+            len(borders_indexes), UNKNOWN_COUNTRY_CODE, dtype=object)
+        found = borders_indexes != -1
+        country_codes[found] = self._country_codes[borders_indexes[found]]
+        return country_codes
+
+    def country_code(self, longitude: float, latitude: float) -> str:
+        return self.country_codes([longitude], [latitude])[0]
+
+
+@lru_cache(maxsize=None)
+def get_reverse_geocoder(
+        geojson_filepath: str = COUNTRY_BORDERS_GEOJSON_FILEPATH,
+        max_offshore_km: float = DEFAULT_MAX_OFFSHORE_KM
+) -> ReverseGeocoder:
+    return ReverseGeocoder(geojson_filepath, max_offshore_km)
@@ -0,0 +1,461 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+from collections import deque
+from typing import (
+    Iterable,
+    Iterator
+)
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from shapely import (
+    from_geojson,
+    get_x,
+    get_y
+)
+# internal imports
+from src.utils.common_functions import (
+    json_file_to_dict,
+    get_file_sha256,
+    get_list_files_in_path,
+    get_ips_details_metadata_via_cache
+)
+from src.utils.hunter_result_reader import HunterResultReader
+from src.utils.ip_interning import get_ip_interning_table
+from src.utils.change_manifest import (
+    ChangeManifest,
+    get_change_manifest_filepath
+)
+from src.utils.typed_tables import (
+    read_typed_table,
+    write_typed_table,
+    iter_serialized_rows,
+    TypedTableWriter
+)
+from src.utils.constants import (
+    EEE_COUNTRIES_FILEPATH
+)
+
+ROUTES_RESULTS_COLUMNS = [
+    "target", "probe_id", "ips_previous_to_target", "route",
+    "origin_country", "origin_latitude", "origin_longitude",
+    "capital_origin_latitude", "capital_origin_longitude",
+    "result_country", "result_latitude", "result_longitude",
+    "result_filename", "outside_EEE"
+]
+ROUTES_RESULTS_LIST_COLUMNS = ["ips_previous_to_target", "route"]
+# Routes written to the routes results file at a time
+ROUTES_CHUNK_SIZE = 10000
+UNKNOWN_PROBE_IP = "0.0.0.0"
+
+# Capitals of the EEE countries, (latitude, longitude)
+COUNTRIES_CAPITALS_COORDINATES = {
+    "DE": (52.52437, 13.41053),
+    "BE": (50.85045, 4.34878),
+    "HR": (45.81444, 15.97798),
+    "DK": (55.67594, 12.56553),
+    "ES": (40.4165, -3.70256),
+    "FR": (48.85341, 2.3488),
+    "IE": (53.33306, -6.24889),
+    "LV": (56.946, 24.10589),
+    "LU": (49.61167, 6.13),
+    "NL": (52.37403, 4.88969),
+    "BG": (42.69751, 23.32415),
+    "SK": (48.14816, 17.10674),
+    "SI": (46.05108, 14.50513),
+    "EE": (59.43696, 24.75353),
+    "GR": (37.98376, 23.72784),
+    "MT": (35.89968, 14.5148),
+    "PL": (52.22977, 21.01178),
+    "CZ": (50.08804, 14.42076),
+    "AT": (48.20849, 16.37208),
+    "CY": (35.17531, 33.3642),
+    "FI": (60.16952, 24.93545),
+    "HU": (47.49835, 19.04045),
+    "IT": (41.89193, 12.51133),
+    "LT": (54.68916, 25.2798),
+    "PT": (38.71667, -9.13333),
+    "RO": (44.43225, 26.10626),
+    "IS": (64.13548, -21.89541),
+    "LI": (47.166, 9.555373),
+    "NO": (59.91273, 10.74609),
+    "SE": (59.32938, 18.06871)
+}
+
+
+def get_eee_countries_set(
+        eee_countries_filepath: str = EEE_COUNTRIES_FILEPATH) -> set[str]:
+    return set([
+        country["alpha-2"]
+        for country in json_file_to_dict(eee_countries_filepath, cached=True)
+    ])
+
+
+# Routes extraction
+def get_probes_locations(origins: Iterable[dict]) -> dict:
+    # probe_id -> (latitude, longitude) of the first origin of every probe
+    probes_geojsons = {}
+    for origin in origins:
+        probes_geojsons.setdefault(origin["probe_id"], origin["location"])
+    locations = from_geojson(np.asarray(
+        list(probes_geojsons.values()), dtype=object))
+    return dict(zip(
+        probes_geojsons.keys(),
+        zip(get_y(locations).tolist(), get_x(locations).tolist())
+    ))
+
+
+def get_result_country_route(hunter_result: dict) -> dict:
+    probe_id = hunter_result["origin_id"]
+    result_country = hunter_result["location_result"]["country"]
+    probe_country = hunter_result["origin_country_code"]
+
+    return {
+        "origin_id": probe_id,
+        "origin_country": probe_country,
+        "result_country": result_country
+    }
+
+
+def get_country_capital_coords(country_code: str) -> (float, float):
+    return COUNTRIES_CAPITALS_COORDINATES.get(country_code, (0, 0))
+
+
+def get_traceroute_routes(traceroute_measurement: Iterable[dict]) -> dict:
+    traceroute_routes = {}
+    for traceroute in traceroute_measurement:
+        probe_id = traceroute["prb_id"]
+        traceroute_routes[probe_id] = []
+
+        traceroute_result = traceroute["result"]
+        for hop in traceroute_result:
+            try:
+                hop_directions = list(set(
+                    [
+                        direction["from"]
+                        for direction in hop["result"]
+                        if "from" in direction.keys()
+                    ]
+                ))
+            except:
+                hop_directions = []
+            traceroute_routes[probe_id].append(hop_directions)
+
+    return traceroute_routes
+
+
+def extract_routes_results(result_filepath: str,
+                           eee_countries_set: set[str]) -> pd.DataFrame:
+    # Routes of a hunter result file, the origins and traceroutes are
+    # indexed by probe once and the file is read section by section
+    reader = HunterResultReader(result_filepath)
+    result_filename = os.path.basename(result_filepath)
+    target = reader.target()
+    probes_locations = get_probes_locations(reader.iter_origins())
+    routes_traceroute_by_probe_id = get_traceroute_routes(
+        reader.iter_traceroutes())
+
+    routes = []
+    for hunter_result in reader.iter_hunter_results():
+        route = get_result_country_route(hunter_result)
+        probe_id = hunter_result["origin_id"]
+        origin_country = route["origin_country"]
+        origin_latitude, origin_longitude = probes_locations.get(
+            probe_id, (0, 0))
+        capital_origin_latitude, capital_origin_longitude = \
+            get_country_capital_coords(origin_country)
+
+        result_country = route["result_country"]
+        airports_intersection = \
+            hunter_result["location_result"]["airports_intersection"]
+        if len(airports_intersection) == 1:
+            result_location = from_geojson(
+                airports_intersection[0]["location"])
+            result_latitude = result_location.y
+            result_longitude = result_location.x
+        else:
+            result_latitude = 0
+            result_longitude = 0
+
+        outside_eee = ((result_country not in eee_countries_set) and
+                       (result_country != "Indeterminate"))
+
+        if result_country == "Indeterminate":
+            ips_previous_to_target = ["Indeterminate"]
+        else:
+            ips_previous_to_target = [
+                ip["ip"]
+                for ip in hunter_result["ips_previous_to_target"]
+            ]
+
+        probe_route = routes_traceroute_by_probe_id.get(probe_id, [])
+
+        routes.append([
+            target, probe_id, ips_previous_to_target, probe_route,
+            origin_country, origin_latitude, origin_longitude,
+            capital_origin_latitude, capital_origin_longitude,
+            result_country, result_latitude, result_longitude,
+            result_filename, outside_eee
+        ])
+
+    routes_df = pd.DataFrame(routes, columns=ROUTES_RESULTS_COLUMNS)
+    return routes_df.sort_values(
+        by=["target", "origin_country", "result_country"], kind="stable")
+
+
+def iter_routes_results(results_folder: str,
+                        eee_countries_set: set[str],
+                        processes: int = None,
+                        filenames: list[str] = None) -> Iterator[pd.DataFrame]:
+    # Routes of every file, or of the files given, in filename order. Only a
+    # few files are being processed at a time, so the routes waiting to be
+    # written are bounded
+    if filenames is None:
+        filenames = get_list_files_in_path(results_folder)
+    filepaths = [
+        f"{results_folder}/{filename}" for filename in sorted(filenames)
+    ]
+    max_pending = 2 * (processes or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        pending = deque()
+        for filepath in filepaths:
+            pending.append(executor.submit(
+                extract_routes_results, filepath, eee_countries_set))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while len(pending) > 0:
+            yield pending.popleft().result()
+
+
+def iter_previous_routes_results(routes_results_filepath: str,
+                                 sources_rows: dict) -> Iterator[tuple]:
+    # Serialized routes of every source of the previous routes results file
+    # in filename order, as (filename, rows) pairs
+    rows = iter_serialized_rows(routes_results_filepath)
+    for filename in sorted(sources_rows.keys()):
+        yield filename, [next(rows) for _ in range(sources_rows[filename])]
+
+
+def generate_routes_results_raw(
+        results_folder: str,
+        routes_results_filepath: str,
+        eee_countries_filepath: str = EEE_COUNTRIES_FILEPATH,
+        processes: int = None,
+        chunk_size: int = ROUTES_CHUNK_SIZE,
+        incremental: bool = True) -> dict:
+    # NOTE: the routes are written in chunks as the files are processed, so
+    # they are sorted by file and by target, origin and result country
+    # inside every file. The rows of every source file are recorded in a
+    # manifest, so the next runs only extract the routes of the files new
+    # or changed and copy the rows of the rest from the previous output
+    eee_countries_set = get_eee_countries_set(eee_countries_filepath)
+    manifest = ChangeManifest(
+        get_change_manifest_filepath(routes_results_filepath),
+        parameters={
+            "eee_countries": get_file_sha256(eee_countries_filepath),
+            "columns": ROUTES_RESULTS_COLUMNS
+        })
+    changed, unchanged, deleted = manifest.get_changes(results_folder)
+    output_unchanged = incremental and manifest.is_output_unchanged(
+        routes_results_filepath)
+    if not output_unchanged:
+        changed, unchanged = sorted(changed + unchanged), []
+    summary = {
+        "files_processed": len(changed),
+        "files_reused": len(unchanged),
+        "files_deleted": len(deleted)
+    }
+    if output_unchanged and len(changed) == 0 and len(deleted) == 0:
+        if manifest.stats_updated:
+            manifest.save(routes_results_filepath)
+        return summary
+
+    previous_routes = iter_previous_routes_results(
+        routes_results_filepath, {
+            filename: source["outputs"]["rows"]
+            for filename, source in manifest.sources.items()
+        }) if len(unchanged) > 0 else None
+    new_routes = iter_routes_results(
+        results_folder, eee_countries_set, processes, filenames=changed)
+    changed_set = set(changed)
+    rows_by_file = {}
+
+    with TypedTableWriter(routes_results_filepath, ROUTES_RESULTS_COLUMNS,
+                          ROUTES_RESULTS_LIST_COLUMNS) as writer:
+        chunk = []
+
+        def write_chunk():
+            if len(chunk) > 0:
+                writer.write(pd.concat(chunk, ignore_index=True))
+                chunk.clear()
+
+        for filename in sorted(changed + unchanged):
+            if filename not in changed_set:
+                write_chunk()
+                writer.write_serialized_rows(
+                    get_previous_routes(previous_routes, filename))
+                continue
+            routes_df = next(new_routes)
+            rows_by_file[filename] = len(routes_df.index)
+            chunk.append(routes_df)
+            if sum(len(df.index) for df in chunk) >= chunk_size:
+                write_chunk()
+        write_chunk()
+        summary["rows"] = writer.rows
+
+    if len(unchanged) == 0:
+        manifest.clear()
+    for filename in deleted:
+        manifest.remove(filename)
+    for filename, rows in rows_by_file.items():
+        manifest.record(results_folder, filename, {"rows": rows})
+    manifest.save(routes_results_filepath)
+    return summary
+
+
+def get_previous_routes(previous_routes: Iterator, filename: str) -> list:
+    # Skip the routes of the sources changed or deleted before the file
+    for previous_filename, rows in previous_routes:
+        if previous_filename == filename:
+            return rows
+    raise KeyError(f"Routes of {filename} not found in the previous results")
+
+
+# Routes cleaning
+def get_probe_ip_from_route(route: list) -> str:
+    if len(route) != 0 and len(route[0]) != 0:
+        return route[0][0]
+    else:
+        return UNKNOWN_PROBE_IP
+
+
+def add_probe_id_ip_country_location(
+        routes_results_df: pd.DataFrame) -> pd.DataFrame:
+    if "probe_ip" in routes_results_df.columns:
+        routes_results_df["probe_ip"] = UNKNOWN_PROBE_IP
+    else:
+        routes_results_df.insert(2, "probe_ip", UNKNOWN_PROBE_IP)
+
+    if "probe_country_with_ip" in routes_results_df.columns:
+        routes_results_df["probe_country_with_ip"] = "bogon"
+    else:
+        routes_results_df.insert(3, "probe_country_with_ip", "bogon")
+
+    # Get probes ips from traceroute
+    routes_results_df["probe_ip"] = routes_results_df["route"].apply(
+        get_probe_ip_from_route)
+
+    # The countries of every public probe IP are requested at once, the
+    # IPs are compared and joined by their interned ids. As in
+    # get_ip_country_via_cache, a failed lookup raises instead of leaving
+    # the probe as bogon
+    ip_table = get_ip_interning_table()
+    probe_ip_ids = ip_table.intern_column(routes_results_df["probe_ip"])
+    unique_probe_ip_ids = probe_ip_ids.unique()
+    public_probe_ip_ids = unique_probe_ip_ids[
+        ip_table.is_valid(unique_probe_ip_ids) &
+        ~ip_table.is_private(unique_probe_ip_ids) &
+        (unique_probe_ip_ids != ip_table.intern(UNKNOWN_PROBE_IP))
+    ]
+    probe_countries = {
+        ip_table.intern(probe_ip):
+            "bogon" if metadata["bogon"] else metadata["country"]
+        for probe_ip, metadata in get_ips_details_metadata_via_cache(
+            ip_table.addresses(public_probe_ip_ids).tolist()).items()
+    }
+    located_probes = probe_ip_ids.isin(probe_countries.keys())
+    routes_results_df.loc[located_probes, "probe_country_with_ip"] = \
+        probe_ip_ids[located_probes].map(probe_countries)
+
+    return routes_results_df
+
+
+def mark_suspicious_routes_results(
+        routes_results_df: pd.DataFrame) -> pd.DataFrame:
+    routes_results_df["suspicious"] = False
+
+    # Count the probes that made a specific route
+    routes_results_probe_count_df = routes_results_df[
+        ["target", "result_country", "probe_id"]
+    ].groupby(
+        ["target", "result_country"]
+    )["probe_id"].count().reset_index(
+        ["target", "result_country"]
+    ).rename(
+        columns={"probe_id": "probes_count"}
+    )
+
+    if "probes_count" in routes_results_df.columns:
+        routes_results_df.drop("probes_count", axis=1, inplace=True)
+
+    routes_results_df = pd.merge(
+        routes_results_df,
+        routes_results_probe_count_df,
+        on=["target", "result_country"],
+        how="left",
+    )
+
+    # Validation criteria
+    routes_results_df.loc[
+        (routes_results_df["probes_count"] < 2) &
+        (routes_results_df["result_country"] != "Indeterminate"),
+        "suspicious"
+    ] = True
+
+    routes_results_df.loc[
+        (routes_results_df["probe_country_with_ip"] !=
+         routes_results_df["origin_country"]) &
+        (routes_results_df["probe_country_with_ip"] != "bogon"),
+        "suspicious"
+    ] = True
+
+    return routes_results_df
+
+
+def clean_routes_results(routes_results_raw_filepath: str,
+                         routes_results_filepath: str,
+                         routes_results_non_suspicious_filepath: str,
+                         routes_results_suspicious_filepath: str):
+    routes_results_df = read_typed_table(
+        routes_results_raw_filepath, ROUTES_RESULTS_LIST_COLUMNS)
+    routes_results_df = add_probe_id_ip_country_location(routes_results_df)
+    routes_results_df = mark_suspicious_routes_results(routes_results_df)
+
+    write_typed_table(routes_results_df, routes_results_filepath,
+                      ROUTES_RESULTS_LIST_COLUMNS)
+    write_typed_table(
+        routes_results_df.loc[routes_results_df["suspicious"] != True],
+        routes_results_non_suspicious_filepath, ROUTES_RESULTS_LIST_COLUMNS)
+    write_typed_table(
+        routes_results_df.loc[routes_results_df["suspicious"] == True],
+        routes_results_suspicious_filepath, ROUTES_RESULTS_LIST_COLUMNS)
+
+
+# Routes aggregation
+def generate_routes_frequency_aggregation(
+        routes_results_filepath: str,
+        routes_frequency_filepath: str,
+        eee_countries_filepath: str = EEE_COUNTRIES_FILEPATH):
+    eee_countries_set = get_eee_countries_set(eee_countries_filepath)
+    # Aggregate routes counting the repetitions
+    routes_frequency_df = read_typed_table(routes_results_filepath)
+
+    routes_frequency_df = routes_frequency_df.value_counts(
+        subset=["target", "origin_country", "result_country"]
+    ).rename_axis(
+        ["target", "origin_country", "result_country"]
+    ).reset_index(
+        name="count"
+    )
+
+    routes_frequency_df["outside_EEE"] = False
+    routes_frequency_df.loc[
+        (routes_frequency_df["result_country"] != "Indeterminate") &
+        (~routes_frequency_df["result_country"].isin(eee_countries_set)),
+        ["outside_EEE"]
+    ] = True
+    routes_frequency_df.to_csv(routes_frequency_filepath, sep=",",
+                               index=False)
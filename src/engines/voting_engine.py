@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import argparse
+from concurrent.futures import (
+    ProcessPoolExecutor,
+    as_completed
+)
+# internal imports
+from src.engines.location_consensus import (
+    LocationVotes,
+    MAJORITY_RULE,
+    UNIFORM_WEIGHTING,
+    RTT_WEIGHTING,
+    CONSENSUS_RULES,
+    CONSENSUS_WEIGHTINGS
+)
+from src.utils.json_io import atomic_output_file
+from src.utils.change_manifest import (
+    ChangeManifest,
+    get_change_manifest_filepath
+)
+from src.utils.hunter_result_reader import (
+    HunterResultReader,
+    get_result_file_rtts
+)
+from src.utils.airports_memo import get_airports_memo
+from src.utils.common_functions import get_file_sha256
+from src.utils.constants import (
+    AIRPORTS_FILEPATH,
+    EXPERIMENT_RESULTS_FIRST_IP_DIR,
+    EXPERIMENT_RESULTS_VOTING_DIR
+)
+
+
+def vote_hunter_result(result: dict,
+                       rule: str = MAJORITY_RULE,
+                       weighting: str = UNIFORM_WEIGHTING,
+                       ips_rtts: dict = None) -> bool:
+    return vote_hunter_results([result], rule, weighting, ips_rtts) > 0
+
+
+def vote_hunter_results(results: list[dict],
+                        rule: str = MAJORITY_RULE,
+                        weighting: str = UNIFORM_WEIGHTING,
+                        ips_rtts: dict = None) -> int:
+    # Results with more than one location of the IPs previous to target get
+    # the location voted by the airports nearest to them, returns how many
+    return LocationVotes(results, ips_rtts=ips_rtts).apply(
+        results, rule, weighting)
+
+
+def vote_result_file(source_filepath: str,
+                     output_filepath: str,
+                     rule: str = MAJORITY_RULE,
+                     weighting: str = UNIFORM_WEIGHTING) -> dict:
+    airports_memo = get_airports_memo()
+    memo_hits, memo_misses = airports_memo.hits, airports_memo.misses
+    file_summary = {
+        "results": 0,
+        "results_updated": 0
+    }
+    reader = HunterResultReader(source_filepath)
+    # The RTTs of the IPs are read from the measurements of the file
+    ips_rtts = get_result_file_rtts(reader) \
+        if weighting == RTT_WEIGHTING else None
+
+    def vote_and_count(results: list[dict]):
+        file_summary["results"] += len(results)
+        file_summary["results_updated"] += vote_hunter_results(
+            results, rule, weighting, ips_rtts)
+
+    # Results are voted in batches while the file is rewritten
+    with atomic_output_file(output_filepath) as output:
+        reader.rewrite_hunter_results_in_batches(output, vote_and_count)
+
+    # NOTE: the locations resolved by the worker are sent back, so the main
+    # process saves a single memo for the next runs
+    file_summary["airports_memo_hits"] = airports_memo.hits - memo_hits
+    file_summary["airports_memo_misses"] = \
+        airports_memo.misses - memo_misses
+    file_summary["airports_memo_locations"] = \
+        airports_memo.pop_new_locations()
+    return file_summary
+
+
+def run_voting(results_folder: str = EXPERIMENT_RESULTS_FIRST_IP_DIR,
+               output_folder: str = EXPERIMENT_RESULTS_VOTING_DIR,
+               processes: int = None,
+               force: bool = False,
+               rule: str = MAJORITY_RULE,
+               weighting: str = UNIFORM_WEIGHTING) -> dict:
+    summary = {
+        "files": 0,
+        "files_processed": 0,
+        "files_skipped": 0,
+        "files_deleted": 0,
+        "files_failed": {},
+        "results": 0,
+        "results_updated": 0,
+        "airports_memo_hits": 0,
+        "airports_memo_misses": 0
+    }
+
+    # Only the sources new or changed since they were voted, or whose output
+    # is missing, are voted again. The outputs of deleted sources are removed.
+    # Everything is voted again when the airports voted change
+    manifest = ChangeManifest(
+        get_change_manifest_filepath(output_folder),
+        parameters={
+            "rule": rule,
+            "weighting": weighting,
+            "airports": get_file_sha256(AIRPORTS_FILEPATH)
+        })
+    changed, unchanged, deleted = manifest.get_changes(results_folder)
+    if force:
+        changed, unchanged = sorted(changed + unchanged), []
+    summary["files"] = len(changed) + len(unchanged)
+
+    files_to_process = []
+    for filename in sorted(changed + unchanged):
+        output_filepath = f"{output_folder}/{filename}"
+        if filename in unchanged and os.path.exists(output_filepath):
+            summary["files_skipped"] += 1
+            continue
+        files_to_process.append(
+            (filename, f"{results_folder}/{filename}", output_filepath))
+
+    for filename in deleted:
+        output_filepath = f"{output_folder}/{filename}"
+        if os.path.exists(output_filepath):
+            os.remove(output_filepath)
+        manifest.remove(filename)
+        summary["files_deleted"] += 1
+
+    if len(files_to_process) == 0:
+        if len(deleted) > 0 or manifest.stats_updated:
+            manifest.save()
+        return summary
+
+    airports_memo = get_airports_memo()
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {
+            executor.submit(vote_result_file, source_filepath,
+                            output_filepath, rule, weighting): filename
+            for filename, source_filepath, output_filepath
+            in files_to_process
+        }
+        for future in as_completed(futures):
+            filename = futures[future]
+            try:
+                file_summary = future.result()
+            except Exception as exception:
+                summary["files_failed"][filename] = repr(exception)
+                continue
+            summary["files_processed"] += 1
+            summary["results"] += file_summary["results"]
+            summary["results_updated"] += file_summary["results_updated"]
+            summary["airports_memo_hits"] += \
+                file_summary["airports_memo_hits"]
+            summary["airports_memo_misses"] += \
+                file_summary["airports_memo_misses"]
+            airports_memo.update(file_summary["airports_memo_locations"])
+            manifest.record(results_folder, filename, {"files": [filename]})
+
+    manifest.save()
+    if summary["airports_memo_misses"] > 0:
+        airports_memo.save()
+    return summary
+
+
+def main(arguments: list[str] = None):
+    parser = argparse.ArgumentParser(
+        description="Recalculate the location of the hunter results voting "
+                    "the airports of the IPs previous to the target")
+    parser.add_argument("--input", default=EXPERIMENT_RESULTS_FIRST_IP_DIR,
+                        help="folder with the hunter results to vote")
+    parser.add_argument("--output", default=EXPERIMENT_RESULTS_VOTING_DIR,
+                        help="folder where the voted results are saved")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="number of worker processes "
+                             "(default: number of CPUs)")
+    parser.add_argument("--force", action="store_true",
+                        help="process files with an up to date output")
+    parser.add_argument("--rule", choices=CONSENSUS_RULES,
+                        default=MAJORITY_RULE,
+                        help="rule to choose the country and city voted")
+    parser.add_argument("--weighting", choices=CONSENSUS_WEIGHTINGS,
+                        default=UNIFORM_WEIGHTING,
+                        help="weight of the vote of every IP")
+    parsed_arguments = parser.parse_args(arguments)
+
+    summary = run_voting(
+        results_folder=parsed_arguments.input,
+        output_folder=parsed_arguments.output,
+        processes=parsed_arguments.processes,
+        force=parsed_arguments.force,
+        rule=parsed_arguments.rule,
+        weighting=parsed_arguments.weighting
+    )
+
+    print(f"Files: {summary['files']} "
+          f"(processed: {summary['files_processed']}, "
+          f"skipped: {summary['files_skipped']}, "
+          f"deleted: {summary['files_deleted']}, "
+          f"failed: {len(summary['files_failed'])})")
+    print(f"Results: {summary['results']} "
+          f"(updated: {summary['results_updated']})")
+    print(f"Airports memo: {summary['airports_memo_hits']} hits, "
+          f"{summary['airports_memo_misses']} misses")
+    for filename, error in summary["files_failed"].items():
+        print(f"FAILED {filename}: {error}")
+
+    return summary
@@ -4,8 +4,6 @@
 # external imports
 import pandas as pd
 import plotly.graph_objects as go
-import requests
-import json
 from shapely import (
     Point,
     from_geojson
@@ -14,11 +12,12 @@ from shapely import (
 # internal imports
 from src.models.mesh_model import MeshModel
 from src.utils.common_functions import (
-    json_file_to_dict
+    get_ip_details_metadata_via_cache
 )
+from src.utils.hunter_result_reader import HunterResultReader
+from src.utils.typed_tables import read_typed_table
 from src.utils.constants import (
     EEE_MESH_3_FILEPATH,
-    IP_URL,
     RESULTS_MODES,
     REPLICATION_PACKAGE_DIR
 )
@@ -109,19 +108,18 @@ def visualize_hunter_result(filepath: str):
     # add_mesh_geo_trace(fig)
 
     # Hunter results trace
-    hunter_info = json_file_to_dict(filepath)
-    for result in hunter_info["hunter_results"]:
+    hunter_result_reader = HunterResultReader(filepath)
+    origins_locations = {
+        origin["probe_id"]: from_geojson(origin["location"])
+        for origin in hunter_result_reader.iter_origins()
+    }
+    for result in hunter_result_reader.iter_hunter_results():
         if result["location_result"]["country"] == "Indeterminate":
             continue
         destination_location = from_geojson(
             result["location_result"]["airports_intersection"][0]["location"])
 
-        origin_id = result["origin_id"]
-        origin_location = [
-            from_geojson(origin["location"])
-            for origin in hunter_info["measurements"]["origin"]
-            if origin["probe_id"] == origin_id
-        ][0]
+        origin_location = origins_locations[result["origin_id"]]
 
         add_hunter_result_geo_trace(
             fig=fig,
@@ -143,7 +141,7 @@ def visualize_hunter_routes_results(
 ):
     fig = go.Figure()
 
-    routes_results_df = pd.read_csv(filepath, sep=",")
+    routes_results_df = read_typed_table(filepath)
     # Filters application
     if only_out_of_EEE:
         routes_results_df = routes_results_df.loc[
@@ -249,17 +247,13 @@ def visualize_hunter_routes_results(
 
 
 def get_ip_location_via_cache(ip_address: str):
-    url = f"{IP_URL}/{ip_address}"
-    details = json.loads(requests.get(url=url).json()["details"])
-    anycast = False
-    if "bogon" in details.keys():
+    ip_metadata = get_ip_details_metadata_via_cache(ip_address)
+    if ip_metadata["bogon"]:
         print("IS BOGON")
         return 0, 0, False
 
-    if "anycast" in details.keys():
-        anycast = details["anycast"]
-
-    return details["longitude"], details["latitude"], anycast
+    return (ip_metadata["longitude"], ip_metadata["latitude"],
+            bool(ip_metadata["anycast"]))
 
 
 def visualize_complete_route(route_locations: list):
@@ -7,20 +7,34 @@ from shapely import (
     to_geojson
 )
 # internal imports
+from src.models.locations_geojson import set_locations_geojson
 
 
 class AirportModel:
+    # NOTE: the location is kept as two floats, the shapely point and its
+    # GeoJSON text are only built when they are asked for and then reused
+    __slots__ = ("_iata_code", "_size", "_name", "_longitude", "_latitude",
+                 "_location", "_location_geojson", "_country_code",
+                 "_city_name")
+
     def __init__(self,
                  iata_code: str,
                  size: str,
                  name: str,
-                 location: Point,
-                 country_code: str,
-                 city_name: str):
+                 location: Point = None,
+                 country_code: str = None,
+                 city_name: str = None,
+                 longitude: float = None,
+                 latitude: float = None):
         self._iata_code = iata_code
         self._size = size
         self._name = name
         self._location = location
+        self._location_geojson = None
+        if location is not None:
+            longitude, latitude = location.x, location.y
+        self._longitude = None if longitude is None else float(longitude)
+        self._latitude = None if latitude is None else float(latitude)
         self._country_code = country_code
         self._city_name = city_name
 
@@ -29,6 +43,14 @@ class AirportModel:
     def iata_code(self):
         return self._iata_code
 
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def name(self):
+        return self._name
+
     @property
     def country_code(self):
         return self._country_code
@@ -37,10 +59,26 @@ class AirportModel:
     def city_name(self):
         return self._city_name
 
+    @property
+    def longitude(self) -> float:
+        return self._longitude
+
+    @property
+    def latitude(self) -> float:
+        return self._latitude
+
     @property
     def location(self):
+        if self._location is None:
+            self._location = Point(self._longitude, self._latitude)
         return self._location
 
+    @property
+    def location_geojson(self) -> str:
+        if self._location_geojson is None:
+            self._location_geojson = to_geojson(self.location)
+        return self._location_geojson
+
     # Class particular methods
 
     # Model common methods
@@ -49,7 +87,25 @@ class AirportModel:
             "iata_code": self._iata_code,
             "size": self._size,
             "name": self._name,
-            "location": to_geojson(self._location),
+            "location": self.location_geojson,
             "country_code": self._country_code,
             "city_name": self._city_name,
         }
+
+    @staticmethod
+    def to_dicts(airport_models: list) -> dict:
+        # Columns of the dicts of the models, the GeoJSON of the locations
+        # not serialized yet are built at once
+        set_locations_geojson(airport_models)
+        return {
+            "iata_code": [airport.iata_code for airport in airport_models],
+            "size": [airport.size for airport in airport_models],
+            "name": [airport.name for airport in airport_models],
+            "location": [
+                airport.location_geojson for airport in airport_models
+            ],
+            "country_code": [
+                airport.country_code for airport in airport_models
+            ],
+            "city_name": [airport.city_name for airport in airport_models],
+        }
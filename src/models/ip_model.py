@@ -2,6 +2,7 @@
 # -*- coding: utf-8 -*-
 
 # external imports
+import json
 from shapely import (
     to_geojson,
     from_geojson,
@@ -11,9 +12,23 @@ from shapely import (
 
 
 class IPModel:
-    def __init__(self, ip: str, location: Point = Point()):
+    # NOTE: the location is kept as two floats, the shapely point and its
+    # GeoJSON text are only built when they are asked for and then reused
+    __slots__ = ("_ip", "_longitude", "_latitude", "_location",
+                 "_location_geojson")
+
+    def __init__(self,
+                 ip: str,
+                 location: Point = None,
+                 longitude: float = None,
+                 latitude: float = None):
         self._ip = ip
-        self._location = location
+        self._longitude = longitude
+        self._latitude = latitude
+        self._location = None
+        self._location_geojson = None
+        if location is not None:
+            self.location = location
 
     @property
     def ip(self) -> str:
@@ -23,24 +38,62 @@ class IPModel:
     def ip(self, value):
         self._ip = value
 
+    @property
+    def longitude(self) -> float:
+        if self._longitude is None:
+            self.__parse_location_geojson()
+        return self._longitude
+
+    @property
+    def latitude(self) -> float:
+        if self._latitude is None:
+            self.__parse_location_geojson()
+        return self._latitude
+
     @property
     def location(self) -> Point:
+        if self._location is None:
+            if self._longitude is not None:
+                self._location = Point(self._longitude, self._latitude)
+            elif self._location_geojson:
+                self._location = from_geojson(self._location_geojson)
         return self._location
 
     @location.setter
     def location(self, value):
         self._location = value
+        self._location_geojson = None
+        if value is None or value.is_empty:
+            self._longitude = None
+            self._latitude = None
+        else:
+            self._longitude = value.x
+            self._latitude = value.y
+
+    @property
+    def location_geojson(self) -> str:
+        if self._location_geojson is None:
+            location = self.location
+            self._location_geojson = "" if location is None \
+                else to_geojson(location)
+        return self._location_geojson
 
     def to_dict(self):
-        if self._location is not None:
-            location = to_geojson(self._location)
-        else:
-            location = ""
         return {
             "ip": self._ip,
-            "location": location
+            "location": self.location_geojson
         }
 
     def from_dict(self, data: dict):
         self._ip = data["ip"]
-        self._location = from_geojson(data["location"])
+        self._location = None
+        self._longitude = None
+        self._latitude = None
+        self._location_geojson = data["location"]
+
+    def __parse_location_geojson(self):
+        if not self._location_geojson:
+            return
+        coordinates = json.loads(self._location_geojson)["coordinates"]
+        if len(coordinates) >= 2:
+            self._longitude, self._latitude = coordinates[:2]
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import numpy as np
+import shapely
+from shapely import to_geojson
+# internal imports
+
+
+def set_locations_geojson(models: list):
+    # Serialize the GeoJSON of every model with coordinates and without it
+    # with a single vectorized shapely call. The models keep their location
+    # as _longitude, _latitude and its GeoJSON text as _location_geojson
+    pending_models = [
+        model for model in models
+        if model._location_geojson is None and model._longitude is not None
+    ]
+    if len(pending_models) == 0:
+        return
+    locations_geojson = to_geojson(shapely.points(
+        np.asarray([model._longitude for model in pending_models],
+                   dtype=np.float64),
+        np.asarray([model._latitude for model in pending_models],
+                   dtype=np.float64)))
+    for model, location_geojson in zip(pending_models,
+                                       locations_geojson.tolist()):
+        model._location_geojson = location_geojson
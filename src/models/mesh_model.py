@@ -2,26 +2,24 @@
 # -*- coding: utf-8 -*-
 
 # external imports
+import numpy as np
 from shapely import (
     box,
     Polygon,
     MultiPolygon,
-    GeometryCollection
+    STRtree
 )
-from shapely.geometry import shape
 # internal imports
 from src.utils.common_functions import (
     json_file_to_dict,
     get_country_name
 )
-from src.utils.constants import (
-    COUNTRY_BORDERS_GEOJSON_FILEPATH
-)
+from src.utils.country_borders import get_countries_borders
 
 
 class MeshModel:
     def __init__(self, mesh_filepath: str):
-        mesh_definition = json_file_to_dict(mesh_filepath)
+        mesh_definition = json_file_to_dict(mesh_filepath, cached=True)
         self._probes_per_section = int(mesh_definition["probes_per_section"])
         self._spacing = mesh_definition["spacing"]
 
@@ -43,6 +41,10 @@ class MeshModel:
             self._country_names = []
 
         self._mesh = MultiPolygon()
+        self._x_grid = np.zeros(0, dtype=np.float64)
+        self._y_grid = np.zeros(0, dtype=np.float64)
+        self._cells = np.zeros(0, dtype=object)
+        self._cells_grid_indexes = np.zeros(0, dtype=np.int64)
         self.__generate_mesh_to_get_probes()
 
     # Properties access
@@ -58,6 +60,30 @@ class MeshModel:
     def country_codes(self):
         return self._country_codes
 
+    @property
+    def spacing(self) -> float:
+        return self._spacing
+
+    @property
+    def x_grid(self) -> np.ndarray:
+        # Longitude of the west side of every column of the grid
+        return self._x_grid
+
+    @property
+    def y_grid(self) -> np.ndarray:
+        # Latitude of the south side of every row of the grid
+        return self._y_grid
+
+    @property
+    def cells(self) -> np.ndarray:
+        # Polygons of the mesh, in the same order
+        return self._cells
+
+    @property
+    def cells_grid_indexes(self) -> np.ndarray:
+        # Index of every cell in the grid, row * columns + column, sorted
+        return self._cells_grid_indexes
+
     # Class private methods
     def __generate_limit_area_polygon(self, limit_area_definition: dict):
         self._limit_area = box(
@@ -78,48 +104,42 @@ class MeshModel:
     def __generate_mesh_to_get_probes(self):
         country_borders = self.__get_countries_borders()
         limited_area_polygons = self.__get_mesh_polygons_in_limited_area()
-        intersecting_polygons = []
-        for polygon in limited_area_polygons:
-            if polygon.intersects(country_borders):
-                intersecting_polygons.append(polygon)
-
-        self._mesh = MultiPolygon(intersecting_polygons)
-
-    def __get_countries_borders(self):
-        countries_borders_dict = json_file_to_dict(
-            COUNTRY_BORDERS_GEOJSON_FILEPATH)
-        features = countries_borders_dict["features"]
-        # NOTE: buffer(0) is a trick for fixing scenarios where polygons have
-        # overlapping coordinates
+        # NOTE: the STRtree bulk query returns every (cell, border) pair that
+        # intersects, the cells kept are the ones in any pair and in the same
+        # order they were generated
+        borders_tree = STRtree(country_borders)
+        intersecting_indexes = np.unique(borders_tree.query(
+            limited_area_polygons, predicate="intersects")[0])
+
+        self._cells = limited_area_polygons[intersecting_indexes]
+        self._cells_grid_indexes = intersecting_indexes.astype(np.int64)
+        self._mesh = MultiPolygon(self._cells.tolist())
+
+    def __get_countries_borders(self) -> tuple:
         if self._country_codes:
-            return GeometryCollection(
-                [shape(feature["geometry"]).buffer(0)
-                 for feature in features
-                 if feature["properties"]["CNTRY_NAME"] in self._country_names]
-            )
+            return get_countries_borders(tuple(self._country_names))
         else:
-            return GeometryCollection(
-                [shape(feature["geometry"]).buffer(0)
-                    for feature in features]
-            )
+            return get_countries_borders()
 
-    def __get_mesh_polygons_in_limited_area(self) -> list:
-        polygons = []
+    def __get_mesh_polygons_in_limited_area(self) -> np.ndarray:
         x_coords, y_coords = self._limit_area.exterior.coords.xy
-        x_min = min(x_coords)
-        x_max = max(x_coords)
-        y = min(y_coords)
-        y_max = max(y_coords)
-        i = -1
-        while not y > y_max:
-            x = x_min
-            while not x > x_max:
-                # components for polygon grid
-                polygon = box(x, y, x + self._spacing, y + self._spacing)
-                polygons.append(polygon)
-                # Update x coordinate
-                i = i + 1
-                x = x + self._spacing
-            # Update y coordinate
-            y = y + self._spacing
-        return polygons
+        self._x_grid = self.__get_grid_coordinates(
+            min(x_coords), max(x_coords))
+        self._y_grid = self.__get_grid_coordinates(
+            min(y_coords), max(y_coords))
+        # Cells ordered by rows (y) and inside every row by columns (x)
+        x_cells, y_cells = np.meshgrid(self._x_grid, self._y_grid)
+        x_cells = x_cells.ravel()
+        y_cells = y_cells.ravel()
+        return box(x_cells, y_cells,
+                   x_cells + self._spacing, y_cells + self._spacing)
+
+    def __get_grid_coordinates(self, start: float, end: float) -> np.ndarray:
+        # NOTE: the coordinates are accumulated adding the spacing, instead
+        # of multiplying, to keep exactly the same floating point values
+        coordinates = []
+        coordinate = start
+        while not coordinate > end:
+            coordinates.append(coordinate)
+            coordinate = coordinate + self._spacing
+        return np.asarray(coordinates, dtype=np.float64)
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+from shapely import (
+    Point
+)
+# internal imports
+from src.utils.constants import (
+    AIRPORTS_FILEPATH
+)
+from src.utils.geo_distance import (
+    latitudes_longitudes_to_unit_vectors,
+    cosines_to_distances
+)
+
+# Number of query points resolved per matrix product, bounds the temporary
+# (points x airports) similarity matrix to a few tens of MB
+QUERY_CHUNK_SIZE = 1024
+
+
+class AirportsIndex:
+    # NOTE: on the unit sphere the nearest airport by great-circle distance
+    # is the one with the highest dot product between unit vectors, so the
+    # whole lookup becomes a chunked matrix product plus argmax. For the
+    # ~3,000 airports of the resources file this is exact and faster than
+    # walking a tree from Python.
+    def __init__(self, airports_filepath: str = AIRPORTS_FILEPATH):
+        airports_df = pd.read_csv(airports_filepath, sep="\t")
+        airports_df.drop(["pop",
+                          "heuristic",
+                          "1", "2", "3"], axis=1, inplace=True)
+
+        coordinates = airports_df["lat long"].str.split(" ", expand=True)
+        self._latitudes = coordinates[0].astype(np.float64).to_numpy()
+        self._longitudes = coordinates[1].astype(np.float64).to_numpy()
+        self._unit_vectors = latitudes_longitudes_to_unit_vectors(
+            self._latitudes, self._longitudes)
+        self._records = airports_df.to_dict("records")
+
+    # Properties access
+    @property
+    def latitudes(self) -> np.ndarray:
+        return self._latitudes
+
+    @property
+    def longitudes(self) -> np.ndarray:
+        return self._longitudes
+
+    @property
+    def records(self) -> list[dict]:
+        return self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    # Class particular methods
+    def query(self,
+              latitudes: np.ndarray,
+              longitudes: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Return the index of the nearest airport and its distance in km for
+        every (latitude, longitude) pair.
+        """
+        points = latitudes_longitudes_to_unit_vectors(
+            np.atleast_1d(latitudes), np.atleast_1d(longitudes))
+        indexes = np.empty(len(points), dtype=np.int64)
+        cosines = np.empty(len(points), dtype=np.float64)
+        for start in range(0, len(points), QUERY_CHUNK_SIZE):
+            chunk = slice(start, start + QUERY_CHUNK_SIZE)
+            similarity = points[chunk] @ self._unit_vectors.T
+            # argmax keeps the first maximum, as the first row with the
+            # minimum distance was taken before
+            indexes[chunk] = np.argmax(similarity, axis=1)
+            cosines[chunk] = similarity[
+                np.arange(len(similarity)), indexes[chunk]]
+
+        return indexes, cosines_to_distances(cosines)
+
+    def nearest_many(self,
+                     latitudes: np.ndarray,
+                     longitudes: np.ndarray) -> list[dict]:
+        indexes, distances = self.query(latitudes, longitudes)
+        return [
+            {**self._records[index], "distance": float(distance)}
+            for index, distance in zip(indexes.tolist(), distances.tolist())
+        ]
+
+    def nearest(self, point: Point) -> dict:
+        return self.nearest_many(
+            latitudes=[point.y], longitudes=[point.x])[0]
+
+
+@lru_cache(maxsize=None)
+def get_airports_index(
+        airports_filepath: str = AIRPORTS_FILEPATH) -> AirportsIndex:
+    return AirportsIndex(airports_filepath)
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+# internal imports
+from src.models.airport_model import AirportModel
+from src.utils.airports_index import get_airports_index
+from src.utils.common_functions import (
+    create_directory_structure,
+    get_file_sha256
+)
+from src.utils.constants import (
+    AIRPORTS_FILEPATH,
+    AIRPORTS_MEMO_CACHE_DIR
+)
+
+# Locations memoized, the least recently used ones are dropped beyond it
+AIRPORTS_MEMO_SIZE = 1 << 20
+# Decimals of the coordinates of the keys, ~0.1 m
+COORDINATES_DECIMALS = 6
+
+
+def get_airports_memo_filepath(airports_filepath: str) -> str:
+    return (f"{AIRPORTS_MEMO_CACHE_DIR}/"
+            f"{get_file_sha256(airports_filepath)}.npz")
+
+
+def get_airport_model(airport_raw: dict) -> AirportModel:
+    latitude, longitude = airport_raw["lat long"].split(" ")[:2]
+    return AirportModel(
+        iata_code=airport_raw["#IATA"],
+        size=airport_raw["size"],
+        name=airport_raw["name"],
+        country_code=airport_raw["country_code"],
+        city_name=airport_raw["city"],
+        longitude=longitude,
+        latitude=latitude
+    )
+
+
+def get_airport_dict(airport_raw: dict) -> dict:
+    return get_airport_model(airport_raw).to_dict()
+
+
+def get_airport_dicts(airports_raw: list[dict]) -> list[dict]:
+    # Same dicts as get_airport_dict, the GeoJSON of all the locations is
+    # serialized at once
+    airports_columns = AirportModel.to_dicts(
+        [get_airport_model(airport_raw) for airport_raw in airports_raw])
+    return [
+        dict(zip(airports_columns.keys(), airport_values))
+        for airport_values in zip(*airports_columns.values())
+    ]
+
+
+class AirportsMemo:
+    # NOTE: nearest airport of every location already resolved, keyed by
+    # its rounded coordinates, plus the serialized dict of every airport.
+    # The locations are saved on disk under the hash of the airports file,
+    # so they are reused by the next runs until the airports change. The
+    # airport dicts returned are shared, they must not be modified
+    def __init__(self,
+                 airports_filepath: str = AIRPORTS_FILEPATH,
+                 max_size: int = AIRPORTS_MEMO_SIZE,
+                 persistent: bool = True):
+        self._airports_index = get_airports_index(airports_filepath)
+        self._max_size = max_size
+        self._memo_filepath = get_airports_memo_filepath(
+            airports_filepath) if persistent else None
+        self._locations = OrderedDict()
+        self._new_locations = {}
+        self._airport_dicts = {}
+        self._hits = 0
+        self._misses = 0
+        if self._memo_filepath is not None and \
+                os.path.exists(self._memo_filepath):
+            self.__load()
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    # Properties access
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def memo_filepath(self) -> str:
+        return self._memo_filepath
+
+    # Class particular methods
+    def query(self,
+              latitudes: np.ndarray,
+              longitudes: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Return the index of the nearest airport and its distance in km for
+        every (latitude, longitude) pair, only the locations not memoized
+        are looked up in the airports index.
+        """
+        keys = list(zip(
+            np.round(np.atleast_1d(latitudes), COORDINATES_DECIMALS).tolist(),
+            np.round(np.atleast_1d(longitudes), COORDINATES_DECIMALS).tolist()
+        ))
+        missing_keys = list(dict.fromkeys(
+            key for key in keys if key not in self._locations))
+        self._misses += len(missing_keys)
+        self._hits += len(keys) - len(missing_keys)
+
+        resolved_locations = {}
+        if len(missing_keys) > 0:
+            missing_latitudes, missing_longitudes = np.asarray(
+                missing_keys, dtype=np.float64).T
+            indexes, distances = self._airports_index.query(
+                missing_latitudes, missing_longitudes)
+            resolved_locations = dict(zip(
+                missing_keys, zip(indexes.tolist(), distances.tolist())))
+            self._new_locations.update(resolved_locations)
+
+        indexes = np.empty(len(keys), dtype=np.int64)
+        distances = np.empty(len(keys), dtype=np.float64)
+        for position, key in enumerate(keys):
+            location = resolved_locations.get(key)
+            if location is None:
+                location = self._locations[key]
+                self._locations.move_to_end(key)
+            indexes[position], distances[position] = location
+        for key, location in resolved_locations.items():
+            self.__set(key, location)
+        return indexes, distances
+
+    def get_airport_dict(self, airport_index: int) -> dict:
+        return self.get_airport_dicts([airport_index])[0]
+
+    def get_airport_dicts(self, airport_indexes: list[int]) -> list[dict]:
+        # The airports not serialized yet are serialized together
+        missing_indexes = [
+            airport_index for airport_index in dict.fromkeys(airport_indexes)
+            if airport_index not in self._airport_dicts
+        ]
+        if len(missing_indexes) > 0:
+            self._airport_dicts.update(zip(
+                missing_indexes, get_airport_dicts([
+                    self._airports_index.records[airport_index]
+                    for airport_index in missing_indexes
+                ])))
+        return [
+            self._airport_dicts[airport_index]
+            for airport_index in airport_indexes
+        ]
+
+    def nearest_airport_dicts(self,
+                              latitudes: np.ndarray,
+                              longitudes: np.ndarray) -> list[dict]:
+        indexes, _ = self.query(latitudes, longitudes)
+        return self.get_airport_dicts(indexes.tolist())
+
+    def pop_new_locations(self) -> dict:
+        # Locations resolved since the last call, e.g. to send them from a
+        # worker process to the memo saved by the main one
+        new_locations = self._new_locations
+        self._new_locations = {}
+        return new_locations
+
+    def update(self, locations: dict):
+        for key, value in locations.items():
+            self.__set(tuple(key), tuple(value))
+
+    def save(self):
+        if self._memo_filepath is None:
+            return
+        keys = list(self._locations.keys())
+        values = list(self._locations.values())
+        create_directory_structure(self._memo_filepath)
+        temporary_filepath = f"{self._memo_filepath}.{os.getpid()}.tmp.npz"
+        np.savez(temporary_filepath,
+                 keys=np.asarray(keys, dtype=np.float64).reshape(-1, 2),
+                 indexes=np.asarray([value[0] for value in values],
+                                    dtype=np.int64),
+                 distances=np.asarray([value[1] for value in values],
+                                      dtype=np.float64))
+        os.replace(temporary_filepath, self._memo_filepath)
+
+    def __set(self, key: tuple, value: tuple):
+        self._locations[key] = value
+        self._locations.move_to_end(key)
+        while len(self._locations) > self._max_size:
+            self._locations.popitem(last=False)
+
+    def __load(self):
+        with np.load(self._memo_filepath) as memo:
+            keys = memo["keys"].tolist()
+            indexes = memo["indexes"].tolist()
+            distances = memo["distances"].tolist()
+        for key, index, distance in zip(keys, indexes, distances):
+            self.__set(tuple(key), (index, distance))
+
+
+@lru_cache(maxsize=None)
+def get_airports_memo(
+        airports_filepath: str = AIRPORTS_FILEPATH) -> AirportsMemo:
+    return AirportsMemo(airports_filepath)
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
+import ipinfo
+# internal imports
+from src.utils.common_functions import (
+    json_file_to_dict,
+    check_ip
+)
+from src.utils.ip_metadata_store import IPMetadataStore
+from src.utils.constants import (
+    KEYS_FILEPATH
+)
+
+# Maximum number of IPs accepted by the ipinfo batch endpoint per request
+IPINFO_BATCH_SIZE = 1000
+DEFAULT_MAX_WORKERS = 8
+
+
+class PooledTransport:
+    # Transport for services without batch endpoint, classifies every IP of
+    # a batch with a bounded pool of workers
+    def __init__(self,
+                 classify_ip: Callable[[str], bool],
+                 max_workers: int = DEFAULT_MAX_WORKERS):
+        self._classify_ip = classify_ip
+        self._max_workers = max_workers
+
+    def classify_many(self, ip_addresses: list[str]) -> dict:
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            return dict(zip(
+                ip_addresses,
+                executor.map(self._classify_ip, ip_addresses)
+            ))
+
+
+class IPinfoTransport:
+    def __init__(self,
+                 access_token: str = None,
+                 use_batch_endpoint: bool = True,
+                 max_workers: int = DEFAULT_MAX_WORKERS):
+        if access_token is None:
+            access_token = json_file_to_dict(KEYS_FILEPATH)["ipinfo_token"]
+        # The handler is created once and shared by every request
+        self._handler = ipinfo.getHandler(access_token)
+        self._use_batch_endpoint = use_batch_endpoint
+        self._pooled_transport = PooledTransport(
+            self.classify, max_workers=max_workers)
+
+    def classify(self, ip_address: str) -> bool:
+        details = self._handler.getDetails(ip_address)
+        try:
+            return bool(details.anycast)
+        except AttributeError:
+            return False
+
+    def classify_many(self, ip_addresses: list[str]) -> dict:
+        if not self._use_batch_endpoint:
+            return self._pooled_transport.classify_many(ip_addresses)
+
+        details_by_ip = self._handler.getBatchDetails(
+            ip_addresses, batch_size=IPINFO_BATCH_SIZE)
+        return {
+            ip_address: bool(details_by_ip.get(ip_address, {}).get(
+                "anycast", False))
+            for ip_address in ip_addresses
+        }
+
+
+class AnycastClassifier:
+    def __init__(self,
+                 store: IPMetadataStore,
+                 transport=None,
+                 batch_size: int = IPINFO_BATCH_SIZE,
+                 checkpoint_filepath: str = None):
+        # transport is any object with classify_many(ips) -> {ip: bool}
+        self._store = store
+        self._transport = transport
+        self._batch_size = batch_size
+        self._checkpoint_filepath = checkpoint_filepath
+
+    @property
+    def transport(self):
+        # NOTE: the default transport is created on first use, so nothing
+        # is set up when every IP is already classified
+        if self._transport is None:
+            self._transport = IPinfoTransport()
+        return self._transport
+
+    # Class particular methods
+    def get_ips_to_classify(self, ip_addresses: list) -> list[str]:
+        ip_addresses = [
+            ip_address
+            for ip_address in dict.fromkeys(map(str, ip_addresses))
+            if check_ip(ip_address)
+        ]
+        return self._store.get_stale_ips(ip_addresses, field="anycast")
+
+    def classify(self, ip_addresses: list, verbose: bool = False) -> dict:
+        # Classify the valid IPs not classified yet, saving every batch in
+        # the store as soon as it is received
+        ip_addresses = list(dict.fromkeys(map(str, ip_addresses)))
+        ips_to_classify = self.get_ips_to_classify(ip_addresses)
+        if verbose:
+            print(f"IPs to classify: {len(ips_to_classify)}")
+
+        for start in range(0, len(ips_to_classify), self._batch_size):
+            batch = ips_to_classify[start:start + self._batch_size]
+            classification = self.transport.classify_many(batch)
+            self._store.upsert_many([
+                {"ip": ip_address, "anycast": is_anycast}
+                for ip_address, is_anycast in classification.items()
+            ])
+            # NOTE: the checkpoint keeps the IPs of the file and every IP
+            # classified in the store, not only the IPs of this run
+            if self._checkpoint_filepath is not None:
+                self._store.export_anycast_classification(
+                    self._checkpoint_filepath, merge=True)
+            if verbose:
+                print(f"Already classified "
+                      f"{start + len(batch)}/{len(ips_to_classify)} IPs")
+
+        return {
+            ip_address: record["anycast"]
+            for ip_address, record in self._store.get_many(
+                ip_addresses).items()
+            if record["anycast"] is not None
+        }
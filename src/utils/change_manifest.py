@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import hashlib
+# internal imports
+from src.utils.common_functions import (
+    get_file_sha256,
+    get_list_files_in_path
+)
+from src.utils.json_io import (
+    read_json_file,
+    write_json_file
+)
+from src.utils.constants import (
+    CHANGE_MANIFESTS_CACHE_DIR
+)
+
+
+def get_change_manifest_filepath(output_path: str) -> str:
+    # One manifest per output file or folder
+    output_path = os.path.abspath(output_path)
+    return (f"{CHANGE_MANIFESTS_CACHE_DIR}/"
+            f"{os.path.basename(output_path)}_"
+            f"{hashlib.sha256(output_path.encode()).hexdigest()[:16]}.json")
+
+
+def get_path_stat(path: str) -> list:
+    if not os.path.exists(path):
+        return None
+    path_stat = os.stat(path)
+    return [path_stat.st_size, path_stat.st_mtime_ns]
+
+
+class ChangeManifest:
+    # NOTE: size, modification time and content hash of every source file
+    # processed, with what was derived from it (e.g. its rows of the output
+    # table). Only the sources new or whose content changed since they were
+    # recorded are processed again. Every entry is dropped when the
+    # parameters of the processing change
+    def __init__(self, manifest_filepath: str, parameters: dict = None):
+        self._manifest_filepath = manifest_filepath
+        self._parameters = parameters or {}
+        self._sources = {}
+        self._output_stat = None
+        self._pending_stats = {}
+        self._stats_updated = False
+        try:
+            manifest = read_json_file(manifest_filepath)
+        except (FileNotFoundError, ValueError):
+            manifest = None
+        if manifest is not None and \
+                manifest.get("parameters") == self._parameters:
+            self._sources = manifest["sources"]
+            self._output_stat = manifest.get("output_stat")
+
+    def __len__(self) -> int:
+        return len(self._sources)
+
+    # Properties access
+    @property
+    def sources(self) -> dict:
+        return self._sources
+
+    @property
+    def output_stat(self) -> list:
+        return self._output_stat
+
+    @property
+    def stats_updated(self) -> bool:
+        # Stats of sources touched but not modified changed since loaded,
+        # the manifest must be saved to not hash them again on the next run
+        return self._stats_updated
+
+    # Class particular methods
+    def get_changes(self, source_folder: str) -> (list, list, list):
+        """
+        Return the source files of the folder new or changed, the ones
+        unchanged and the ones recorded that were deleted, in filename
+        order. The content hash is only computed when the size or the
+        modification time of a file changed.
+        """
+        filenames = sorted(get_list_files_in_path(source_folder))
+        changed = []
+        unchanged = []
+        for filename in filenames:
+            source_filepath = f"{source_folder}/{filename}"
+            source_stat = get_path_stat(source_filepath)
+            source = self._sources.get(filename)
+            if source is not None and source["stat"] == source_stat:
+                unchanged.append(filename)
+                continue
+
+            source_hash = get_file_sha256(source_filepath)
+            self._pending_stats[filename] = (source_stat, source_hash)
+            if source is not None and source["sha256"] == source_hash:
+                # Touched but not modified, only its stat is updated
+                source["stat"] = source_stat
+                self._stats_updated = True
+                unchanged.append(filename)
+            else:
+                changed.append(filename)
+
+        deleted = sorted(set(self._sources.keys()) - set(filenames))
+        return changed, unchanged, deleted
+
+    def is_output_unchanged(self, output_path: str) -> bool:
+        # The output was not modified since this manifest was saved
+        return (self._output_stat is not None and
+                get_path_stat(output_path) == self._output_stat)
+
+    def record(self, source_folder: str, filename: str, outputs: dict):
+        source_stat, source_hash = self._pending_stats.pop(filename, (
+            None, None))
+        if source_hash is None:
+            source_filepath = f"{source_folder}/{filename}"
+            source_stat = get_path_stat(source_filepath)
+            source_hash = get_file_sha256(source_filepath)
+        self._sources[filename] = {
+            "stat": source_stat,
+            "sha256": source_hash,
+            "outputs": outputs
+        }
+
+    def remove(self, filename: str):
+        self._sources.pop(filename, None)
+
+    def clear(self):
+        self._sources = {}
+        self._output_stat = None
+
+    def save(self, output_path: str = None):
+        # The stat of the output file is saved to detect it was modified
+        if output_path is not None:
+            self._output_stat = get_path_stat(output_path)
+        self._stats_updated = False
+        write_json_file({
+            "parameters": self._parameters,
+            "output_stat": self._output_stat,
+            "sources": self._sources
+        }, self._manifest_filepath, compact=True)
@@ -3,20 +3,24 @@
 
 # external imports
 import os
-import json
+import hashlib
 import socket
 import math
 from shapely import (
     Point
 )
-import requests
-import pandas as pd
 # internal imports
+from src.utils.airports_index import get_airports_index
+from src.utils.json_io import (
+    read_json_file,
+    write_json_file
+)
+from src.utils.geo_distance import paired_distances
+from src.utils.ip_cache_client import get_ip_cache_client
+from src.utils.ip_metadata_store import get_ip_metadata_store
 from src.utils.constants import (
     EARTH_RADIUS_KM,
-    AIRPORTS_FILEPATH,
-    ALL_COUNTRIES_FILEPATH,
-    IP_URL
+    ALL_COUNTRIES_FILEPATH
 )
 
 
@@ -31,34 +35,24 @@ def create_directory_structure(path: str) -> None:
         os.makedirs(path)
 
 
-def json_file_to_dict(file_path: str) -> dict:
-    create_directory_structure(file_path)
-    with open(file_path) as file:
-        raw_json = file.read()
-
-    return json.loads(raw_json)
-
+def json_file_to_dict(file_path: str, cached: bool = False) -> dict:
+    # NOTE: cached documents are shared by every read of the file
+    return read_json_file(file_path, cached=cached)
 
-def json_file_to_list(file_path: str) -> list:
-    create_directory_structure(file_path)
-    with open(file_path) as file:
-        raw_json = file.read()
 
-    return json.loads(raw_json)
+def json_file_to_list(file_path: str, cached: bool = False) -> list:
+    return read_json_file(file_path, cached=cached)
 
 
-def dict_to_json_file(dict: dict, file_path: str, sort_keys: bool = False):
-    create_directory_structure(file_path)
-    file = open(file_path, "w")
-    file.write(json.dumps(dict, indent=4, sort_keys=sort_keys))
-    file.close()
+def dict_to_json_file(dict: dict,
+                      file_path: str,
+                      sort_keys: bool = False,
+                      compact: bool = False):
+    write_json_file(dict, file_path, compact=compact, sort_keys=sort_keys)
 
 
-def list_to_json_file(dict: list, file_path: str):
-    create_directory_structure(file_path)
-    file = open(file_path, "w")
-    file.write(json.dumps(dict, indent=4))
-    file.close()
+def list_to_json_file(dict: list, file_path: str, compact: bool = False):
+    write_json_file(dict, file_path, compact=compact)
 
 
 def get_list_files_in_path(path: str) -> list:
@@ -67,6 +61,14 @@ def get_list_files_in_path(path: str) -> list:
     return files_in_path
 
 
+def get_file_sha256(file_path: str) -> str:
+    file_hash = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(1 << 20), b""):
+            file_hash.update(chunk)
+    return file_hash.hexdigest()
+
+
 def get_list_folders_in_path(path: str) -> list[str]:
     dirs_in_path = \
         [f for f in os.listdir(path) if os.path.isdir(os.path.join(path, f))]
@@ -87,41 +89,12 @@ def check_ip(ip: str):
 
 # Geo calculations
 def distance_dictionaries(a: dict, b: dict) -> float:
-    lat1 = a["latitude"]
-    lat2 = b["latitude"]
-    lon1 = a["longitude"]
-    lon2 = b["longitude"]
-
-    # Convert latitude and longitude to
-    # spherical coordinates in radians.
-    degrees_to_radians = math.pi / 180.0
-
-    # phi = 90 - latitude
-    phi1 = (90.0 - lat1) * degrees_to_radians
-    phi2 = (90.0 - lat2) * degrees_to_radians
-
-    # theta = longitude
-    theta1 = lon1 * degrees_to_radians
-    theta2 = lon2 * degrees_to_radians
-
-    # Compute spherical distance from spherical coordinates.
-
-    # For two locations in spherical coordinates
-    # (1, theta, phi) and (1, theta, phi)
-    # cosine( arc length ) =
-    #    sin phi sin phi' cos(theta-theta') + cos phi cos phi'
-    # distance = rho * arc length
-
-    cos = (math.sin(phi1) * math.sin(phi2) * math.cos(theta1 - theta2) +
-           math.cos(phi1) * math.cos(phi2))
-    if abs(cos - 1.0) < 0.000000000000001:
-        arc = 0.0
-    else:
-        arc = math.acos(cos)
-
-    # Remember to multiply arc by the radius of the earth
-    # in your favorite set of units to get length.
-    return arc * EARTH_RADIUS_KM
+    return float(paired_distances(
+        latitudes_a=a["latitude"],
+        longitudes_a=a["longitude"],
+        latitudes_b=b["latitude"],
+        longitudes_b=b["longitude"]
+    )[0])
 
 
 def convert_km_radius_to_degrees(km_radius: float) -> float:
@@ -130,46 +103,71 @@ def convert_km_radius_to_degrees(km_radius: float) -> float:
 
 
 def get_nearest_airport_to_point(point: Point) -> dict:
-    airports_df = pd.read_csv(AIRPORTS_FILEPATH, sep="\t")
-    airports_df.drop(["pop",
-                      "heuristic",
-                      "1", "2", "3"], axis=1, inplace=True)
-
-    airports_df["distance"] = airports_df["lat long"].apply(
-        lambda airport_location: distance_dictionaries(
-            a={
-                "latitude": point.y,
-                "longitude": point.x
-            },
-            b={
-                "latitude": float(airport_location.split(" ")[0]),
-                "longitude": float(airport_location.split(" ")[1])
-            }
-        )
-    )
+    return get_airports_index().nearest(point)
 
-    return airports_df[
-        airports_df["distance"] == airports_df["distance"].min()
-        ].to_dict("records")[0]
+
+def get_nearest_airports_to_points(points: list[Point]) -> list[dict]:
+    return get_airports_index().nearest_many(
+        latitudes=[point.y for point in points],
+        longitudes=[point.x for point in points]
+    )
 
 
 def get_country_name(country_code: str) -> str:
-    all_countries_list = json_file_to_dict(ALL_COUNTRIES_FILEPATH)
+    all_countries_list = json_file_to_dict(ALL_COUNTRIES_FILEPATH,
+                                           cached=True)
     for country in all_countries_list:
         if country["alpha-2"] == country_code:
             return country["name"]
 
 
 def get_ip_details_via_cache(ip_address: str) -> dict:
-    url = f"{IP_URL}/{ip_address}"
-    print(url)
-    details = json.loads(requests.get(url=url).json()["details"])
-    return details
+    return get_ip_cache_client().get(ip_address)
+
+
+def get_ips_details_via_cache(ip_addresses: list[str]) -> dict:
+    return get_ip_cache_client().get_many(ip_addresses)
+
+
+def get_ips_metadata_via_cache(ip_addresses: list[str]) -> dict:
+    # IPs metadata read through the local store, only the IPs not stored or
+    # expired are requested to the cache service
+    return get_ip_metadata_store().get_or_fetch_many(
+        ip_addresses, get_ip_cache_client())
+
+
+def get_ip_metadata_via_cache(ip_address: str) -> dict:
+    return get_ips_metadata_via_cache([ip_address]).get(ip_address)
+
+
+def get_ip_details_metadata_via_cache(ip_address: str) -> dict:
+    # NOTE: the metadata is None, or only has the anycast classification,
+    # when the lookup of the IP failed in the cache service
+    ip_metadata = get_ip_metadata_via_cache(ip_address)
+    if ip_metadata is None or ip_metadata["bogon"] is None:
+        raise LookupError(
+            f"Details of the IP {ip_address} not available in the IP cache")
+    return ip_metadata
+
+
+def get_ips_details_metadata_via_cache(ip_addresses: list[str]) -> dict:
+    # Metadata of every IP, raising for the IPs whose details lookup failed
+    ips_metadata = get_ips_metadata_via_cache(ip_addresses)
+    missing_ips = [
+        ip_address for ip_address in dict.fromkeys(ip_addresses)
+        if ips_metadata.get(ip_address) is None or
+        ips_metadata[ip_address]["bogon"] is None
+    ]
+    if len(missing_ips) > 0:
+        raise LookupError(
+            f"Details of the IPs {', '.join(missing_ips)} not available in "
+            f"the IP cache")
+    return ips_metadata
 
 
 def get_ip_country_via_cache(ip_address: str) -> str:
-    ip_details = get_ip_details_via_cache(ip_address)
-    if "bogon" in ip_details.keys():
+    ip_metadata = get_ip_details_metadata_via_cache(ip_address)
+    if ip_metadata["bogon"]:
         return "bogon"
     else:
-        return ip_details["country"]
+        return ip_metadata["country"]
@@ -29,6 +29,13 @@ ALL_COUNTRIES_FILEPATH = f"{__COUNTRIES_SETS_DIR}/all_countries.json"
 __PROBES_DISTRIBUTIONS_DIR = f"{__RESOURCES_DIR}/probes_distributions"
 EEE_MESH_3_FILEPATH = f"{__PROBES_DISTRIBUTIONS_DIR}/EEE_mesh_3.json"
 
+# cache paths
+__CACHE_DIR = f"{__BASE_DIR}/.cache"
+COUNTRY_BORDERS_CACHE_DIR = f"{__CACHE_DIR}/country_borders"
+PIPELINE_STATE_FILEPATH = f"{__CACHE_DIR}/pipeline_state.json"
+AIRPORTS_MEMO_CACHE_DIR = f"{__CACHE_DIR}/airports_memo"
+CHANGE_MANIFESTS_CACHE_DIR = f"{__CACHE_DIR}/change_manifests"
+
 # replication package paths
 REPLICATION_PACKAGE_DIR = (
     f"{__BASE_DIR}/replication_package_europe_anycast_experiment")
@@ -37,6 +44,7 @@ TRAFFIC_LOGS_IP_CLASSIFIED_FILEPATH = \
     f"{REPLICATION_PACKAGE_DIR}/Traffic_logs_10K_ip_classified.csv"
 ANYCAST_IP_CLASSIFICATION_FILEPATH = \
     f"{REPLICATION_PACKAGE_DIR}/anycast_ip_classification.json"
+IP_METADATA_STORE_FILEPATH = f"{REPLICATION_PACKAGE_DIR}/ip_metadata.sqlite"
 ANYCAST_PII_TRAFFIC_LOGS_FILEPATH = \
     f"{REPLICATION_PACKAGE_DIR}/Anycast_PII_traffic_logs.csv"
 APKS_METADATA_FILEPATH = f"{REPLICATION_PACKAGE_DIR}/apks_metadata.csv"
@@ -52,6 +60,13 @@ TPLS_POLICY_ANALYSIS = \
 
 PARTIAL_RESULTS_DIR = f"{REPLICATION_PACKAGE_DIR}/partial_results"
 
+EXPERIMENT_RESULTS_FIRST_IP_DIR = \
+    f"{REPLICATION_PACKAGE_DIR}/experiment_results_first_ip"
+EXPERIMENT_RESULTS_VOTING_DIR = \
+    f"{REPLICATION_PACKAGE_DIR}/experiment_results_voting"
+ANALYSIS_FIRST_IP_DIR = f"{REPLICATION_PACKAGE_DIR}/analysis_first_ip"
+ANALYSIS_VOTING_DIR = f"{REPLICATION_PACKAGE_DIR}/analysis_voting"
+
 # RIPE ATLAS API URLS
 __RIPE_ATLAS_API_BASE_URL = "https://atlas.ripe.net/api/v2/"
 RIPE_ATLAS_PROBES_BASE_URL = __RIPE_ATLAS_API_BASE_URL + "probes/"
@@ -61,4 +76,5 @@ IP_URL = str(os.getenv("CACHE_IP_URL")) or ""
 
 # OTHERS
 EARTH_RADIUS_KM = 6371
+SPEED_OF_LIGHT_KM_PER_MS = 299.792458
 RESULTS_MODES = ["first_ip", "voting"]
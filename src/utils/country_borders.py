@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+from functools import lru_cache
+import numpy as np
+from shapely import (
+    from_wkb,
+    to_wkb
+)
+from shapely.geometry import shape
+# internal imports
+from src.utils.common_functions import (
+    json_file_to_dict,
+    create_directory_structure,
+    get_file_sha256
+)
+from src.utils.constants import (
+    COUNTRY_BORDERS_GEOJSON_FILEPATH,
+    COUNTRY_BORDERS_CACHE_DIR
+)
+
+
+def get_country_borders_cache_filepath(geojson_filepath: str) -> str:
+    return (f"{COUNTRY_BORDERS_CACHE_DIR}/"
+            f"{get_file_sha256(geojson_filepath)}.npz")
+
+
+def __parse_country_borders_geojson(geojson_filepath: str) -> (
+        np.ndarray, np.ndarray):
+    features = json_file_to_dict(geojson_filepath)["features"]
+    country_names = np.asarray(
+        [feature["properties"]["CNTRY_NAME"] for feature in features],
+        dtype=str)
+    # NOTE: buffer(0) is a trick for fixing scenarios where polygons have
+    # overlapping coordinates
+    geometries = np.asarray(
+        [shape(feature["geometry"]).buffer(0) for feature in features],
+        dtype=object)
+    return country_names, geometries
+
+
+def __save_country_borders_cache(cache_filepath: str,
+                                 country_names: np.ndarray,
+                                 geometries: np.ndarray):
+    # Geometries are stored as one WKB buffer plus the offsets of each one
+    geometries_wkb = to_wkb(geometries)
+    offsets = np.cumsum([0] + [len(wkb) for wkb in geometries_wkb])
+    create_directory_structure(cache_filepath)
+    temporary_filepath = f"{cache_filepath}.{os.getpid()}.tmp.npz"
+    np.savez(temporary_filepath,
+             country_names=country_names,
+             wkb=np.frombuffer(b"".join(geometries_wkb), dtype=np.uint8),
+             offsets=offsets)
+    os.replace(temporary_filepath, cache_filepath)
+
+
+def __load_country_borders_cache(cache_filepath: str) -> (
+        np.ndarray, np.ndarray):
+    with np.load(cache_filepath) as cache:
+        country_names = cache["country_names"]
+        wkb = cache["wkb"].tobytes()
+        offsets = cache["offsets"].tolist()
+    geometries = from_wkb([
+        wkb[start:end] for start, end in zip(offsets[:-1], offsets[1:])
+    ])
+    return country_names, geometries
+
+
+@lru_cache(maxsize=None)
+def load_country_borders(
+        geojson_filepath: str = COUNTRY_BORDERS_GEOJSON_FILEPATH) -> (
+        np.ndarray, np.ndarray):
+    # Country name and repaired geometry of every feature of the borders
+    # file, cached on disk by the file content hash
+    cache_filepath = get_country_borders_cache_filepath(geojson_filepath)
+    if os.path.exists(cache_filepath):
+        return __load_country_borders_cache(cache_filepath)
+
+    country_names, geometries = __parse_country_borders_geojson(
+        geojson_filepath)
+    __save_country_borders_cache(cache_filepath, country_names, geometries)
+    return country_names, geometries
+
+
+@lru_cache(maxsize=None)
+def get_countries_borders(
+        country_names: tuple[str] = None,
+        geojson_filepath: str = COUNTRY_BORDERS_GEOJSON_FILEPATH) -> tuple:
+    # Borders of the countries given, all of them if no country is given
+    borders_names, borders_geometries = load_country_borders(
+        geojson_filepath)
+    if country_names is None:
+        return tuple(borders_geometries.tolist())
+    return tuple(borders_geometries[
+        np.isin(borders_names, list(country_names))].tolist())
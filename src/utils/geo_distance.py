@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import numpy as np
+# internal imports
+from src.utils.constants import (
+    EARTH_RADIUS_KM
+)
+
+# Same tolerance used by distance_dictionaries to consider two points equal
+IDENTICAL_POINTS_TOLERANCE = 0.000000000000001
+
+
+def latitudes_longitudes_to_unit_vectors(
+        latitudes: np.ndarray,
+        longitudes: np.ndarray) -> np.ndarray:
+    latitudes_radians = np.radians(np.asarray(latitudes, dtype=np.float64))
+    longitudes_radians = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_latitudes = np.cos(latitudes_radians)
+    return np.stack([
+        cos_latitudes * np.cos(longitudes_radians),
+        cos_latitudes * np.sin(longitudes_radians),
+        np.sin(latitudes_radians)
+    ], axis=-1)
+
+
+def unit_vectors_to_latitudes_longitudes(
+        vectors: np.ndarray) -> (np.ndarray, np.ndarray):
+    # Vectors not normalized are projected on the sphere, the zero vector
+    # has no location (nan)
+    vectors = np.asarray(vectors, dtype=np.float64)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vectors = vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return (np.degrees(np.arcsin(np.clip(vectors[..., 2], -1.0, 1.0))),
+            np.degrees(np.arctan2(vectors[..., 1], vectors[..., 0])))
+
+
+def cosines_to_distances(cosines: np.ndarray) -> np.ndarray:
+    # NOTE: rounding can push the cosine slightly outside [-1, 1] for
+    # identical or antipodal points, clip it before acos as the scalar
+    # version does with its tolerance check
+    cosines = np.atleast_1d(np.asarray(cosines, dtype=np.float64))
+    arcs = np.arccos(np.clip(cosines, -1.0, 1.0))
+    arcs[np.abs(cosines - 1.0) < IDENTICAL_POINTS_TOLERANCE] = 0.0
+    return arcs * EARTH_RADIUS_KM
+
+
+def distances_from_point(latitude: float,
+                         longitude: float,
+                         latitudes: np.ndarray,
+                         longitudes: np.ndarray) -> np.ndarray:
+    # One to many: distance in km from a point to each of the points given
+    origin = latitudes_longitudes_to_unit_vectors(latitude, longitude)
+    points = latitudes_longitudes_to_unit_vectors(
+        np.atleast_1d(latitudes), np.atleast_1d(longitudes))
+    return cosines_to_distances(points @ origin)
+
+
+def distances_matrix(latitudes_a: np.ndarray,
+                     longitudes_a: np.ndarray,
+                     latitudes_b: np.ndarray,
+                     longitudes_b: np.ndarray) -> np.ndarray:
+    # Many to many: matrix (len(a) x len(b)) with every pair distance in km
+    points_a = latitudes_longitudes_to_unit_vectors(
+        np.atleast_1d(latitudes_a), np.atleast_1d(longitudes_a))
+    points_b = latitudes_longitudes_to_unit_vectors(
+        np.atleast_1d(latitudes_b), np.atleast_1d(longitudes_b))
+    return cosines_to_distances(points_a @ points_b.T)
+
+
+def paired_distances(latitudes_a: np.ndarray,
+                     longitudes_a: np.ndarray,
+                     latitudes_b: np.ndarray,
+                     longitudes_b: np.ndarray) -> np.ndarray:
+    # Element-wise: distance in km between a[i] and b[i]
+    points_a = latitudes_longitudes_to_unit_vectors(
+        np.atleast_1d(latitudes_a), np.atleast_1d(longitudes_a))
+    points_b = latitudes_longitudes_to_unit_vectors(
+        np.atleast_1d(latitudes_b), np.atleast_1d(longitudes_b))
+    return cosines_to_distances(np.einsum("ij,ij->i", points_a, points_b))
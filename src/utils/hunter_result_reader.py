@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import re
+import json
+from typing import (
+    Callable,
+    Iterator,
+    TextIO
+)
+# internal imports
+
+# Characters read from the file every time the buffer runs out
+READ_CHUNK_SIZE = 1 << 20
+# Hunter results transformed at once by rewrite_hunter_results_in_batches
+HUNTER_RESULTS_BATCH_SIZE = 10000
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRUCTURAL = re.compile(r"[\[\]{}\"]")
+_STRING_REST = re.compile(r"[^\"\\]*(?:\\.[^\"\\]*)*\"", re.DOTALL)
+_SCALAR = re.compile(r"[^,\]}\s]*")
+
+# Paths inside a hunter result file
+TARGET_PATH = ("target",)
+ORIGINS_PATH = ("measurements", "origin")
+HUNTER_RESULTS_PATH = ("hunter_results",)
+TRACEROUTE_PATH = ("measurements", "ripe_measurement_results", "traceroute")
+PING_PATH = ("measurements", "ripe_measurement_results", "ping")
+
+
+class _JsonScanner:
+    # NOTE: pull scanner over a JSON text file. Values are located by
+    # scanning for structural characters with regular expressions, so the
+    # sections not requested are skipped without building any Python object
+    # and only the requested values are decoded
+    def __init__(self, file: TextIO, sink: TextIO = None):
+        self._file = file
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        # Start of a value being read, the buffer is kept from this position
+        self._mark = None
+        # Output where the consumed text is copied, if copying
+        self._sink = sink
+        self._sink_pos = None
+
+    # Buffer management
+    def _fill(self) -> bool:
+        if self._eof:
+            return False
+
+        if self._sink_pos is not None:
+            self._sink.write(self._buffer[self._sink_pos:self._pos])
+            self._sink_pos = self._pos
+
+        keep_from = self._pos if self._mark is None else self._mark
+        chunk = self._file.read(
+            max(READ_CHUNK_SIZE, len(self._buffer) - keep_from))
+        if chunk == "":
+            self._eof = True
+            return False
+
+        self._buffer = self._buffer[keep_from:] + chunk
+        self._pos -= keep_from
+        if self._mark is not None:
+            self._mark = 0
+        if self._sink_pos is not None:
+            self._sink_pos -= keep_from
+        return True
+
+    def _skip_whitespace(self):
+        while True:
+            self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer) or not self._fill():
+                return
+
+    def _peek(self) -> str:
+        self._skip_whitespace()
+        return self._buffer[self._pos:self._pos + 1]
+
+    def _next(self) -> str:
+        character = self._peek()
+        if character == "":
+            raise ValueError("Unexpected end of JSON file")
+        self._pos += 1
+        return character
+
+    def _expect(self, expected: str):
+        character = self._next()
+        if character != expected:
+            raise ValueError(
+                f"Expected '{expected}' but found '{character}' in JSON file")
+
+    # Values scanning
+    def _skip_string_rest(self):
+        while True:
+            match = _STRING_REST.match(self._buffer, self._pos)
+            if match is not None:
+                self._pos = match.end()
+                return
+            if not self._fill():
+                raise ValueError("Unterminated string in JSON file")
+
+    def skip_value(self):
+        character = self._peek()
+        if character == "\"":
+            self._pos += 1
+            self._skip_string_rest()
+        elif character in ("{", "["):
+            self._pos += 1
+            depth = 1
+            while depth > 0:
+                match = _STRUCTURAL.search(self._buffer, self._pos)
+                if match is None:
+                    self._pos = len(self._buffer)
+                    if not self._fill():
+                        raise ValueError("Unexpected end of JSON file")
+                    continue
+                self._pos = match.end()
+                character = match.group()
+                if character == "\"":
+                    self._skip_string_rest()
+                elif character in ("{", "["):
+                    depth += 1
+                else:
+                    depth -= 1
+        elif character == "":
+            raise ValueError("Unexpected end of JSON file")
+        else:
+            while True:
+                self._pos = _SCALAR.match(self._buffer, self._pos).end()
+                if self._pos < len(self._buffer) or not self._fill():
+                    return
+
+    def read_value(self):
+        self._skip_whitespace()
+        self._mark = self._pos
+        try:
+            self.skip_value()
+            return json.loads(self._buffer[self._mark:self._pos])
+        finally:
+            self._mark = None
+
+    def copy_value(self):
+        # Copy the next value to the sink as it is in the source
+        self._skip_whitespace()
+        self._sink_pos = self._pos
+        self.skip_value()
+        self._sink.write(self._buffer[self._sink_pos:self._pos])
+        self._sink_pos = None
+
+    # Containers iteration, the caller must consume every value yielded
+    def iter_object_keys(self) -> Iterator[str]:
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            character = self._next()
+            if character == "}":
+                return
+            if character != ",":
+                raise ValueError(
+                    f"Expected ',' or '}}' but found '{character}'")
+
+    def iter_array_values(self) -> Iterator:
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.read_value()
+            character = self._next()
+            if character == "]":
+                return
+            if character != ",":
+                raise ValueError(
+                    f"Expected ',' or ']' but found '{character}'")
+
+    def seek_path(self, path: tuple) -> bool:
+        # Move the scanner to the value of the path, skipping the rest
+        for path_key in path:
+            if self._peek() != "{":
+                return False
+            for key in self.iter_object_keys():
+                if key == path_key:
+                    break
+                self.skip_value()
+            else:
+                return False
+        return True
+
+
+class HunterResultReader:
+    def __init__(self, file_path: str):
+        self._file_path = file_path
+
+    @property
+    def file_path(self) -> str:
+        return self._file_path
+
+    # Class particular methods
+    def read(self, path: tuple, default=None):
+        with open(self._file_path) as file:
+            scanner = _JsonScanner(file)
+            if not scanner.seek_path(path):
+                return default
+            return scanner.read_value()
+
+    def iter_array(self, path: tuple) -> Iterator:
+        with open(self._file_path) as file:
+            scanner = _JsonScanner(file)
+            if not scanner.seek_path(path):
+                return
+            yield from scanner.iter_array_values()
+
+    def target(self) -> str:
+        return self.read(TARGET_PATH)
+
+    def iter_origins(self) -> Iterator[dict]:
+        return self.iter_array(ORIGINS_PATH)
+
+    def iter_hunter_results(self) -> Iterator[dict]:
+        return self.iter_array(HUNTER_RESULTS_PATH)
+
+    def iter_traceroutes(self) -> Iterator[dict]:
+        return self.iter_array(TRACEROUTE_PATH)
+
+    def iter_pings(self) -> Iterator[dict]:
+        return self.iter_array(PING_PATH)
+
+    def has_traceroutes(self) -> bool:
+        with open(self._file_path) as file:
+            return _JsonScanner(file).seek_path(TRACEROUTE_PATH)
+
+    def rewrite_hunter_results(self,
+                               output: TextIO,
+                               transform: Callable[[dict], None]):
+        # Write the file to output calling transform over every hunter
+        # result, the other sections are copied without being parsed. The
+        # output is laid out as json.dumps(indent=4) does
+        def transform_batch(hunter_results: list[dict]):
+            for hunter_result in hunter_results:
+                transform(hunter_result)
+
+        self.rewrite_hunter_results_in_batches(output, transform_batch, 1)
+
+    def rewrite_hunter_results_in_batches(
+            self,
+            output: TextIO,
+            transform_batch: Callable[[list[dict]], None],
+            batch_size: int = HUNTER_RESULTS_BATCH_SIZE):
+        # As rewrite_hunter_results, transform_batch is called over lists of
+        # up to batch_size hunter results before writing them
+        with open(self._file_path) as file:
+            scanner = _JsonScanner(file, sink=output)
+            output.write("{")
+            first_key = True
+            for key in scanner.iter_object_keys():
+                output.write("\n    " if first_key else ",\n    ")
+                output.write(f"{json.dumps(key)}: ")
+                first_key = False
+                if key != HUNTER_RESULTS_PATH[0]:
+                    scanner.copy_value()
+                    continue
+
+                first_result = True
+                batch = []
+                for hunter_result in scanner.iter_array_values():
+                    batch.append(hunter_result)
+                    if len(batch) < batch_size:
+                        continue
+                    first_result = self.__write_batch(
+                        output, batch, transform_batch, first_result)
+                    batch = []
+                if len(batch) > 0:
+                    first_result = self.__write_batch(
+                        output, batch, transform_batch, first_result)
+                output.write("[]" if first_result else "\n    ]")
+            output.write("\n}" if not first_key else "}")
+
+    @staticmethod
+    def __write_batch(output: TextIO,
+                      hunter_results: list[dict],
+                      transform_batch: Callable[[list[dict]], None],
+                      first_result: bool) -> bool:
+        transform_batch(hunter_results)
+        for hunter_result in hunter_results:
+            output.write("[\n        " if first_result
+                         else ",\n        ")
+            output.write(json.dumps(hunter_result, indent=4).
+                         replace("\n", "\n        "))
+            first_result = False
+        return first_result
+
+
+def get_result_file_discs(reader: HunterResultReader) -> dict:
+    # Minimum RTT from every origin to every IP that replied to its
+    # traceroutes or pings, {ip: [(latitude, longitude, rtt)]}
+    origins = {}
+    for origin in reader.iter_origins():
+        if origin.get("location"):
+            longitude, latitude = json.loads(
+                origin["location"])["coordinates"][:2]
+            origins[origin["probe_id"]] = (latitude, longitude)
+
+    rtts = {}
+
+    def add_rtt(ip: str, probe_id: int, rtt: float):
+        if ip is None or probe_id not in origins or \
+                not isinstance(rtt, (int, float)) or rtt < 0:
+            return
+        key = (ip, probe_id)
+        rtts[key] = min(rtt, rtts.get(key, rtt))
+
+    for traceroute in reader.iter_traceroutes():
+        for hop in traceroute.get("result", []):
+            for reply in hop.get("result", []):
+                add_rtt(reply.get("from"), traceroute.get("prb_id"),
+                        reply.get("rtt"))
+    for ping in reader.iter_pings():
+        for reply in ping.get("result", []):
+            add_rtt(ping.get("dst_addr"), ping.get("prb_id"),
+                    reply.get("rtt"))
+
+    discs = {}
+    for (ip, probe_id), rtt in rtts.items():
+        discs.setdefault(ip, []).append((*origins[probe_id], rtt))
+    return discs
+
+
+def get_result_file_rtts(reader: HunterResultReader) -> dict:
+    # Minimum RTT from any origin to every IP, {ip: rtt}
+    return {
+        ip: min(rtt for _, _, rtt in ip_discs)
+        for ip, ip_discs in get_result_file_discs(reader).items()
+    }
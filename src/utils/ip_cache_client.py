@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import json
+import time
+from threading import RLock
+from functools import lru_cache
+from concurrent.futures import (
+    Future,
+    ThreadPoolExecutor
+)
+import requests
+from requests.adapters import HTTPAdapter
+# internal imports
+from src.utils.constants import (
+    IP_URL
+)
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_SECONDS = 0.5
+DEFAULT_TIMEOUT_SECONDS = 10
+# Responses worth retrying, the rest of errors are raised at once
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class IPCacheClient:
+    def __init__(self,
+                 base_url: str = IP_URL,
+                 max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_seconds: float = DEFAULT_BACKOFF_SECONDS,
+                 timeout_seconds: float = DEFAULT_TIMEOUT_SECONDS):
+        self._base_url = base_url
+        self._max_retries = max_retries
+        self._backoff_seconds = backoff_seconds
+        self._timeout_seconds = timeout_seconds
+
+        # One pooled connection per worker to the cache service
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+        self._in_flight: dict[str, Future] = {}
+        self._in_flight_lock = RLock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self._session.close()
+
+    # Class particular methods
+    def submit(self, ip_address: str) -> Future:
+        # Lookups of an IP already being requested share the same future
+        with self._in_flight_lock:
+            future = self._in_flight.get(ip_address)
+            if future is None:
+                future = self._executor.submit(self._fetch, ip_address)
+                self._in_flight[ip_address] = future
+                future.add_done_callback(
+                    lambda _: self.__forget(ip_address))
+            return future
+
+    def get(self, ip_address: str) -> dict:
+        return self.submit(ip_address).result()
+
+    def get_many(self, ip_addresses: list[str]) -> dict:
+        # Details of every different IP, None for the IPs whose lookup
+        # failed after all the retries
+        futures = {
+            ip_address: self.submit(ip_address)
+            for ip_address in dict.fromkeys(ip_addresses)
+        }
+        details = {}
+        for ip_address, future in futures.items():
+            try:
+                details[ip_address] = future.result()
+            except (requests.RequestException, ValueError, KeyError):
+                details[ip_address] = None
+        return details
+
+    def _fetch(self, ip_address: str) -> dict:
+        url = f"{self._base_url}/{ip_address}"
+        attempt = 0
+        while True:
+            try:
+                response = self._session.get(
+                    url=url, timeout=self._timeout_seconds)
+                if (response.status_code not in RETRY_STATUS_CODES or
+                        attempt >= self._max_retries):
+                    response.raise_for_status()
+                    return json.loads(response.json()["details"])
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self._max_retries:
+                    raise
+            time.sleep(self._backoff_seconds * (2 ** attempt))
+            attempt += 1
+
+    def __forget(self, ip_address: str):
+        with self._in_flight_lock:
+            self._in_flight.pop(ip_address, None)
+
+
+@lru_cache(maxsize=None)
+def get_ip_cache_client(base_url: str = IP_URL) -> IPCacheClient:
+    return IPCacheClient(base_url)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import ipaddress
+from threading import Lock
+from functools import lru_cache
+import numpy as np
+import pandas as pd
+# internal imports
+
+# Version given to the texts that are not IP addresses
+INVALID_IP_VERSION = 0
+# Bytes of the packed addresses, IPv4 addresses are stored IPv4-mapped
+PACKED_IP_SIZE = 16
+IPV4_MAPPED_PREFIX = bytes(10) + b"\xff\xff"
+INITIAL_CAPACITY = 1024
+
+IP_ID_DTYPE = np.int32
+
+
+class IPInterningTable:
+    # NOTE: every different address gets a dense integer id, so the columns
+    # of addresses are integer arrays and the joins on addresses are integer
+    # joins. Every address is parsed once when it is interned, and the
+    # predicates over ids are lookups in arrays indexed by id. The ids are
+    # only valid for the table that gave them
+    def __init__(self):
+        self._ids = {}
+        self._lock = Lock()
+        self._addresses = np.empty(INITIAL_CAPACITY, dtype=object)
+        self._versions = np.zeros(INITIAL_CAPACITY, dtype=np.uint8)
+        self._packed = np.zeros((INITIAL_CAPACITY, PACKED_IP_SIZE),
+                                dtype=np.uint8)
+        self._private = np.zeros(INITIAL_CAPACITY, dtype=bool)
+        self._bogon = np.zeros(INITIAL_CAPACITY, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    # Properties access
+    @property
+    def packed(self) -> np.ndarray:
+        return self._packed[:len(self)]
+
+    # Class particular methods
+    def intern(self, address: str) -> int:
+        address_id = self._ids.get(address)
+        if address_id is None:
+            with self._lock:
+                address_id = self.__add(address)
+        return address_id
+
+    def intern_many(self, addresses) -> np.ndarray:
+        # Only the different addresses are looked up in the table
+        codes, unique_addresses = pd.factorize(
+            pd.Series(addresses, dtype=object).astype(str), sort=False)
+        with self._lock:
+            unique_ids = np.fromiter(
+                (self.__add(address) for address in unique_addresses),
+                dtype=IP_ID_DTYPE, count=len(unique_addresses))
+        return unique_ids[codes]
+
+    def addresses(self, address_ids) -> np.ndarray:
+        return self._addresses[np.asarray(address_ids, dtype=IP_ID_DTYPE)]
+
+    # Predicates over ids
+    def is_valid(self, address_ids) -> np.ndarray:
+        return self._versions[np.asarray(address_ids, dtype=IP_ID_DTYPE)] != \
+            INVALID_IP_VERSION
+
+    def is_private(self, address_ids) -> np.ndarray:
+        return self._private[np.asarray(address_ids, dtype=IP_ID_DTYPE)]
+
+    def is_bogon(self, address_ids) -> np.ndarray:
+        # Private, reserved, loopback, link local, multicast or unspecified
+        return self._bogon[np.asarray(address_ids, dtype=IP_ID_DTYPE)]
+
+    def is_in(self, address_ids, addresses) -> np.ndarray:
+        # Membership in a set of addresses, e.g. the anycast IPs
+        return np.isin(np.asarray(address_ids, dtype=IP_ID_DTYPE),
+                       self.intern_many(list(addresses)))
+
+    # Columns of dataframes
+    def intern_column(self, column: pd.Series) -> pd.Series:
+        return pd.Series(self.intern_many(column.tolist()),
+                         index=column.index, name=column.name)
+
+    def __add(self, address: str) -> int:
+        # NOTE: called with the lock held
+        address_id = self._ids.get(address)
+        if address_id is not None:
+            return address_id
+
+        address_id = len(self._ids)
+        if address_id == len(self._addresses):
+            self.__grow()
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            ip = None
+        if ip is not None:
+            self._versions[address_id] = ip.version
+            packed = ip.packed if ip.version == 6 else \
+                IPV4_MAPPED_PREFIX + ip.packed
+            self._packed[address_id] = np.frombuffer(packed, dtype=np.uint8)
+            self._private[address_id] = ip.is_private
+            self._bogon[address_id] = (
+                ip.is_private or ip.is_reserved or ip.is_loopback or
+                ip.is_link_local or ip.is_multicast or ip.is_unspecified)
+        self._addresses[address_id] = address
+        self._ids[address] = address_id
+        return address_id
+
+    def __grow(self):
+        size = len(self._ids)
+        capacity = 2 * len(self._addresses)
+        self._addresses = np.resize(self._addresses, capacity)
+        self._versions = np.resize(self._versions, capacity)
+        self._packed = np.resize(self._packed, (capacity, PACKED_IP_SIZE))
+        self._private = np.resize(self._private, capacity)
+        self._bogon = np.resize(self._bogon, capacity)
+        self._addresses[size:] = None
+        self._versions[size:] = INVALID_IP_VERSION
+        self._packed[size:] = 0
+        self._private[size:] = False
+        self._bogon[size:] = False
+
+
+@lru_cache(maxsize=None)
+def get_ip_interning_table() -> IPInterningTable:
+    return IPInterningTable()
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import json
+import time
+import sqlite3
+from threading import Lock
+from functools import lru_cache
+# internal imports
+from src.utils.json_io import write_json_file
+from src.utils.constants import (
+    IP_METADATA_STORE_FILEPATH
+)
+
+# Seconds a record is considered fresh before fetching it again
+DEFAULT_TTL_SECONDS = 30 * 24 * 60 * 60
+# Maximum number of IPs bound to a single SQL query
+QUERY_BATCH_SIZE = 500
+
+METADATA_FIELDS = [
+    "country", "anycast", "bogon", "latitude", "longitude", "fetched_at",
+    "anycast_fetched_at"
+]
+# NOTE: the anycast classification is stored by other sources than the IP
+# details (classification files, the anycast classifier), so it keeps its
+# own fetch time and the TTL of the details is not renewed by it
+DETAILS_FIELDS = ["country", "bogon", "latitude", "longitude"]
+FIELDS_FETCHED_AT = {"anycast": "anycast_fetched_at"}
+
+
+def details_to_metadata(ip_address: str, details: dict) -> dict:
+    # Record of the store from the details given by the IP cache service
+    if "bogon" in details.keys():
+        return {"ip": ip_address, "bogon": True, "anycast": False}
+    return {
+        "ip": ip_address,
+        "country": details.get("country"),
+        "anycast": details.get("anycast", False),
+        "bogon": False,
+        "latitude": details.get("latitude"),
+        "longitude": details.get("longitude")
+    }
+
+
+class IPMetadataStore:
+    # NOTE: SQLite in WAL mode keyed by IP, every upsert only writes the rows
+    # changed instead of rewriting a whole JSON file, and the fields not
+    # present in a record are kept as they were stored
+    def __init__(self,
+                 filepath: str = IP_METADATA_STORE_FILEPATH,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self._ttl_seconds = ttl_seconds
+        # NOTE: this module is used from common_functions, so it does not
+        # depend on its helpers
+        if os.path.dirname(filepath) != "":
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        self._connection = sqlite3.connect(filepath, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS ip_metadata ("
+                "ip TEXT PRIMARY KEY, "
+                "country TEXT, "
+                "anycast INTEGER, "
+                "bogon INTEGER, "
+                "latitude REAL, "
+                "longitude REAL, "
+                "fetched_at REAL, "
+                "anycast_fetched_at REAL)"
+            )
+            columns = [
+                row[1] for row in self._connection.execute(
+                    "PRAGMA table_info(ip_metadata)")
+            ]
+            if "anycast_fetched_at" not in columns:
+                # Stores created before the anycast fetch time was kept
+                self._connection.execute(
+                    "ALTER TABLE ip_metadata "
+                    "ADD COLUMN anycast_fetched_at REAL")
+                self._connection.execute(
+                    "UPDATE ip_metadata SET anycast_fetched_at = fetched_at "
+                    "WHERE anycast IS NOT NULL")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM ip_metadata").fetchone()[0]
+
+    # Class particular methods
+    def get_many(self, ip_addresses: list[str]) -> dict:
+        ip_addresses = list(dict.fromkeys(ip_addresses))
+        records = {}
+        with self._lock:
+            for start in range(0, len(ip_addresses), QUERY_BATCH_SIZE):
+                batch = ip_addresses[start:start + QUERY_BATCH_SIZE]
+                rows = self._connection.execute(
+                    f"SELECT ip, {', '.join(METADATA_FIELDS)} "
+                    f"FROM ip_metadata "
+                    f"WHERE ip IN ({', '.join('?' * len(batch))})",
+                    batch
+                )
+                for row in rows:
+                    records[row[0]] = self.__row_to_record(row)
+        return records
+
+    def get(self, ip_address: str) -> dict:
+        return self.get_many([ip_address]).get(ip_address)
+
+    def get_all(self) -> dict:
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT ip, {', '.join(METADATA_FIELDS)} FROM ip_metadata"
+            ).fetchall()
+        return {row[0]: self.__row_to_record(row) for row in rows}
+
+    def upsert_many(self, records: list[dict]):
+        # The fetch time of the details and of the anycast classification
+        # are only renewed by the records with them
+        now = time.time()
+        rows = [
+            (record["ip"],
+             record.get("country"),
+             self.__to_integer(record.get("anycast")),
+             self.__to_integer(record.get("bogon")),
+             record.get("latitude"),
+             record.get("longitude"),
+             record.get("fetched_at", now) if any(
+                 record.get(field) is not None for field in DETAILS_FIELDS)
+             else None,
+             record.get("anycast_fetched_at", now)
+             if record.get("anycast") is not None else None)
+            for record in records
+        ]
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "INSERT INTO ip_metadata "
+                "(ip, country, anycast, bogon, latitude, longitude, "
+                "fetched_at, anycast_fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(ip) DO UPDATE SET "
+                "country = COALESCE(excluded.country, country), "
+                "anycast = COALESCE(excluded.anycast, anycast), "
+                "bogon = COALESCE(excluded.bogon, bogon), "
+                "latitude = COALESCE(excluded.latitude, latitude), "
+                "longitude = COALESCE(excluded.longitude, longitude), "
+                "fetched_at = COALESCE(excluded.fetched_at, fetched_at), "
+                "anycast_fetched_at = "
+                "COALESCE(excluded.anycast_fetched_at, anycast_fetched_at)",
+                rows
+            )
+
+    def upsert(self, record: dict):
+        self.upsert_many([record])
+
+    def is_fresh(self, record: dict, field: str = None) -> bool:
+        if record is None:
+            return False
+        if field is not None and record.get(field) is None:
+            return False
+        fetched_at = record.get(FIELDS_FETCHED_AT.get(field, "fetched_at"))
+        if fetched_at is None:
+            return False
+        return (self._ttl_seconds is None or
+                time.time() - fetched_at <= self._ttl_seconds)
+
+    def get_stale_ips(self,
+                      ip_addresses: list[str],
+                      field: str = None) -> list[str]:
+        # IPs not stored, older than the TTL or without the field given
+        records = self.get_many(ip_addresses)
+        return [
+            ip_address for ip_address in dict.fromkeys(ip_addresses)
+            if not self.is_fresh(records.get(ip_address), field)
+        ]
+
+    def get_or_fetch_many(self, ip_addresses: list[str], client) -> dict:
+        # Read through the store, only the stale IPs are requested to the
+        # IP cache service client
+        ips_to_fetch = self.get_stale_ips(ip_addresses, field="bogon")
+        if len(ips_to_fetch) > 0:
+            fetched_details = client.get_many(ips_to_fetch)
+            self.upsert_many([
+                details_to_metadata(ip_address, details)
+                for ip_address, details in fetched_details.items()
+                if details is not None
+            ])
+        return self.get_many(ip_addresses)
+
+    # Compatibility with the JSON classification files {ip: is_anycast}
+    def import_anycast_classification(self, file_path: str) -> int:
+        with open(file_path) as file:
+            classification = json.load(file)
+        self.upsert_many([
+            {"ip": ip_address, "anycast": is_anycast}
+            for ip_address, is_anycast in classification.items()
+        ])
+        return len(classification)
+
+    def export_anycast_classification(self,
+                                      file_path: str,
+                                      ip_addresses: list[str] = None,
+                                      merge: bool = False):
+        # With merge, the IPs already in the file are kept and the ones
+        # exported replace their classification
+        classification = {}
+        if merge and os.path.exists(file_path):
+            with open(file_path) as file:
+                classification = json.load(file)
+        if ip_addresses is None:
+            records = self.get_all()
+        else:
+            records = self.get_many(ip_addresses)
+        classification.update({
+            ip_address: record["anycast"]
+            for ip_address, record in records.items()
+            if record["anycast"] is not None
+        })
+        # Written atomically, it is the checkpoint of the anycast classifier
+        write_json_file(classification, file_path)
+
+    @staticmethod
+    def __to_integer(value) -> int:
+        return None if value is None else int(bool(value))
+
+    @staticmethod
+    def __row_to_record(row: tuple) -> dict:
+        record = {"ip": row[0]}
+        for field, value in zip(METADATA_FIELDS, row[1:]):
+            if field in ("anycast", "bogon") and value is not None:
+                value = bool(value)
+            record[field] = value
+        return record
+
+
+@lru_cache(maxsize=None)
+def get_ip_metadata_store(
+        filepath: str = IP_METADATA_STORE_FILEPATH) -> IPMetadataStore:
+    return IPMetadataStore(filepath)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import ipaddress
+import numpy as np
+# internal imports
+from src.utils.ip_interning import (
+    get_ip_interning_table,
+    IPV4_MAPPED_PREFIX,
+    PACKED_IP_SIZE
+)
+
+# IPv4 prefixes are stored IPv4-mapped, as the packed addresses of the
+# interning table
+IPV4_MAPPED_OFFSET = int.from_bytes(IPV4_MAPPED_PREFIX, "big") << 32
+# Prefix list lines starting with it exclude the prefix from its parents
+EXCLUDED_PREFIX_MARK = "!"
+COMMENT_MARK = "#"
+
+PREFIX_KEY_DTYPE = f"S{PACKED_IP_SIZE}"
+
+
+def get_prefix_interval(prefix: str) -> (int, int):
+    # First and last address of the prefix in the IPv6 (IPv4-mapped) space,
+    # a single address is a /32 or /128 prefix
+    network = ipaddress.ip_network(prefix.strip(), strict=False)
+    start = int(network.network_address)
+    if network.version == 4:
+        start += IPV4_MAPPED_OFFSET
+    return start, start + network.num_addresses - 1
+
+
+class IPPrefixIndex:
+    # NOTE: longest prefix match over IPv4 and IPv6 as sorted interval
+    # arrays. CIDR prefixes are either nested or disjoint, so they are
+    # flattened once into disjoint intervals where every address keeps the
+    # value of its longest prefix, e.g. an address excluded inside an
+    # anycast /24. A lookup is a binary search of the packed addresses over
+    # the starts of the intervals included
+    def __init__(self, prefixes: list[str] = None):
+        self._prefixes = []
+        self._starts = None
+        self._ends = None
+        if prefixes is not None:
+            self.add_many(prefixes)
+
+    def __len__(self) -> int:
+        return len(self._prefixes)
+
+    # Properties access
+    @property
+    def intervals(self) -> int:
+        self.build()
+        return len(self._starts)
+
+    # Class particular methods
+    def add(self, prefix: str, included: bool = True):
+        self.add_many([prefix], included)
+
+    def add_many(self, prefixes, included: bool = True):
+        intervals = [
+            get_prefix_interval(prefix) + (included,) for prefix in prefixes
+        ]
+        self._prefixes.extend(intervals)
+        self._starts = None
+        self._ends = None
+
+    def add_anycast_classification(self, classification: dict) -> int:
+        # JSON classification files {ip: is_anycast}, only the anycast IPs
+        # are added
+        anycast_ips = [
+            ip_address for ip_address, is_anycast in classification.items()
+            if is_anycast
+        ]
+        self.add_many(anycast_ips)
+        return len(anycast_ips)
+
+    def add_ip_metadata_store(self, store) -> int:
+        return self.add_anycast_classification({
+            ip_address: record["anycast"]
+            for ip_address, record in store.get_all().items()
+        })
+
+    def add_prefix_list(self, file_path: str) -> int:
+        # One prefix per line, "!" excludes it and "#" starts a comment
+        included_prefixes = []
+        excluded_prefixes = []
+        with open(file_path) as file:
+            for line in file:
+                prefix = line.split(COMMENT_MARK, 1)[0].strip()
+                if prefix == "":
+                    continue
+                if prefix.startswith(EXCLUDED_PREFIX_MARK):
+                    excluded_prefixes.append(
+                        prefix[len(EXCLUDED_PREFIX_MARK):])
+                else:
+                    included_prefixes.append(prefix)
+        self.add_many(included_prefixes)
+        self.add_many(excluded_prefixes, included=False)
+        return len(included_prefixes) + len(excluded_prefixes)
+
+    def contains(self, ips) -> np.ndarray:
+        # NOTE: texts that are not IP addresses are never contained
+        return self.contains_ids(get_ip_interning_table().intern_many(ips))
+
+    def contains_ids(self, ip_ids) -> np.ndarray:
+        # Ids of the process IP interning table
+        self.build()
+        ip_table = get_ip_interning_table()
+        ip_ids = np.asarray(ip_ids, dtype=np.int64)
+        keys = np.ascontiguousarray(ip_table.packed[ip_ids]).view(
+            PREFIX_KEY_DTYPE).reshape(-1)
+
+        positions = np.searchsorted(self._starts, keys, side="right") - 1
+        found = positions >= 0
+        contained = np.zeros(len(keys), dtype=bool)
+        contained[found] = keys[found] <= self._ends[positions[found]]
+        return contained & ip_table.is_valid(ip_ids)
+
+    def build(self):
+        # Flattened lazily after the prefixes change
+        if self._starts is not None:
+            return
+        starts, ends = [], []
+        for start, end, included in self.__flatten():
+            if not included:
+                continue
+            # Adjacent intervals are merged
+            if len(ends) > 0 and ends[-1] + 1 == start:
+                ends[-1] = end
+            else:
+                starts.append(start)
+                ends.append(end)
+        self._ends = self.__to_keys(ends)
+        self._starts = self.__to_keys(starts)
+
+    def __flatten(self) -> list[tuple]:
+        # Parents are sorted before their children, the latest prefix added
+        # wins between equal prefixes
+        prefixes = sorted(
+            enumerate(self._prefixes),
+            key=lambda item: (item[1][0], -item[1][1], item[0]))
+        intervals = []
+        open_prefixes = []
+        cursor = 0
+        for _, (start, end, included) in prefixes:
+            while len(open_prefixes) > 0 and open_prefixes[-1][0] < start:
+                open_end, open_included = open_prefixes.pop()
+                if cursor <= open_end:
+                    intervals.append((cursor, open_end, open_included))
+                cursor = max(cursor, open_end + 1)
+            if len(open_prefixes) > 0 and cursor < start:
+                intervals.append((cursor, start - 1, open_prefixes[-1][1]))
+            open_prefixes.append((end, included))
+            cursor = start
+        while len(open_prefixes) > 0:
+            open_end, open_included = open_prefixes.pop()
+            if cursor <= open_end:
+                intervals.append((cursor, open_end, open_included))
+            cursor = max(cursor, open_end + 1)
+        return intervals
+
+    @staticmethod
+    def __to_keys(addresses: list[int]) -> np.ndarray:
+        return np.array(
+            [address.to_bytes(PACKED_IP_SIZE, "big") for address in addresses],
+            dtype=PREFIX_KEY_DTYPE)
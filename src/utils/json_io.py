@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import json
+import tempfile
+from threading import Lock
+from contextlib import contextmanager
+from typing import IO
+try:
+    import orjson
+except ImportError:
+    orjson = None
+# internal imports
+
+# Indentation of the JSON files read by people, e.g. the hunter results
+JSON_INDENT = 4
+
+# Parsed documents of the cached reads, by path with its size and mtime
+__documents_cache = {}
+__documents_cache_lock = Lock()
+
+# NOTE: the umask can only be read setting it, so it is read once here
+# instead of on every write, where it could race with other threads
+__umask = os.umask(0o022)
+os.umask(__umask)
+# Mode of the new files, as open() creates them
+NEW_FILE_MODE = 0o666 & ~__umask
+
+
+def is_orjson_available() -> bool:
+    return orjson is not None
+
+
+@contextmanager
+def atomic_output_file(file_path: str, mode: str = "w") -> IO:
+    # NOTE: the output is written to a temporary file of the same folder and
+    # then renamed, so an interrupted run never leaves a truncated result
+    if os.path.dirname(file_path) != "":
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        dir=os.path.dirname(file_path) or ".", suffix=".tmp")
+    try:
+        # mkstemp creates the file only readable by its owner, it gets the
+        # mode of the file replaced or the one of a new file instead
+        try:
+            file_mode = os.stat(file_path).st_mode & 0o7777
+        except FileNotFoundError:
+            file_mode = NEW_FILE_MODE
+        os.chmod(temporary_path, file_mode)
+        with os.fdopen(file_descriptor, mode) as file:
+            yield file
+        os.replace(temporary_path, file_path)
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+
+
+def loads_json(raw_json):
+    if orjson is not None:
+        return orjson.loads(raw_json)
+    return json.loads(raw_json)
+
+
+def dumps_json(data, compact: bool = False, sort_keys: bool = False) -> bytes:
+    # NOTE: orjson only indents with two spaces, so the indented output is
+    # written by the standard library to keep the layout of the files
+    if compact and orjson is not None:
+        return orjson.dumps(
+            data, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+    if compact:
+        return json.dumps(data, separators=(",", ":"),
+                          sort_keys=sort_keys).encode()
+    return json.dumps(data, indent=JSON_INDENT, sort_keys=sort_keys).encode()
+
+
+def read_json_file(file_path: str, cached: bool = False):
+    """
+    Parse a JSON file. Cached reads return the same document while the size
+    and modification time of the file do not change, it must not be
+    modified by the caller.
+    """
+    if not cached:
+        with open(file_path, "rb") as file:
+            return loads_json(file.read())
+
+    file_stat = os.stat(file_path)
+    file_key = (file_stat.st_size, file_stat.st_mtime_ns)
+    with __documents_cache_lock:
+        cached_document = __documents_cache.get(file_path)
+    if cached_document is not None and cached_document[0] == file_key:
+        return cached_document[1]
+
+    with open(file_path, "rb") as file:
+        document = loads_json(file.read())
+    with __documents_cache_lock:
+        __documents_cache[file_path] = (file_key, document)
+    return document
+
+
+def write_json_file(data,
+                    file_path: str,
+                    compact: bool = False,
+                    sort_keys: bool = False):
+    # Compact output for the files only read by programs
+    raw_json = dumps_json(data, compact=compact, sort_keys=sort_keys)
+    with atomic_output_file(file_path, "wb") as file:
+        file.write(raw_json)
+
+
+def clear_json_cache():
+    with __documents_cache_lock:
+        __documents_cache.clear()
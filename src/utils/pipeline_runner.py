@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import json
+import hashlib
+from threading import Lock
+from typing import Callable
+from concurrent.futures import (
+    ThreadPoolExecutor,
+    FIRST_COMPLETED,
+    wait
+)
+# internal imports
+from src.utils.common_functions import (
+    get_file_sha256
+)
+from src.utils.constants import (
+    PIPELINE_STATE_FILEPATH
+)
+
+MISSING_PATH_HASH = "missing"
+
+STAGE_RAN = "ran"
+STAGE_SKIPPED = "skipped"
+STAGE_FAILED = "failed"
+STAGE_BLOCKED = "blocked"
+
+
+class PipelineStage:
+    # The function is called with the parameters as keyword arguments, the
+    # inputs and outputs are the files or folders it reads and writes
+    def __init__(self,
+                 name: str,
+                 function: Callable,
+                 inputs: list[str],
+                 outputs: list[str],
+                 parameters: dict = None):
+        self._name = name
+        self._function = function
+        self._inputs = list(inputs)
+        self._outputs = list(outputs)
+        self._parameters = parameters or {}
+
+    # Properties access
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def function(self) -> Callable:
+        return self._function
+
+    @property
+    def inputs(self) -> list[str]:
+        return self._inputs
+
+    @property
+    def outputs(self) -> list[str]:
+        return self._outputs
+
+    @property
+    def parameters(self) -> dict:
+        return self._parameters
+
+    # Class particular methods
+    def depends_on(self, stage) -> bool:
+        # A stage depends on another one when it reads any of its outputs
+        return any(
+            os.path.normpath(input_path) == os.path.normpath(output_path) or
+            os.path.normpath(input_path).startswith(
+                os.path.normpath(output_path) + os.sep)
+            for input_path in self._inputs
+            for output_path in stage.outputs
+        )
+
+    def run(self):
+        return self._function(**self._parameters)
+
+
+class PipelineRunner:
+    # NOTE: a stage is run again only when the content of its inputs or its
+    # parameters changed since its last successful run, or when any of its
+    # outputs is missing. The independent stages are run at the same time
+    def __init__(self,
+                 stages: list[PipelineStage],
+                 state_filepath: str = PIPELINE_STATE_FILEPATH,
+                 max_workers: int = None):
+        self._stages = {stage.name: stage for stage in stages}
+        if len(self._stages) != len(stages):
+            raise ValueError("Pipeline stages names must be unique")
+        self._dependencies = {
+            stage.name: [
+                other_stage.name for other_stage in stages
+                if other_stage is not stage and stage.depends_on(other_stage)
+            ]
+            for stage in stages
+        }
+        self._state_filepath = state_filepath
+        self._max_workers = max_workers
+        self._state_lock = Lock()
+        self._state = self.__load_state()
+
+    # Properties access
+    @property
+    def stages(self) -> list[PipelineStage]:
+        return list(self._stages.values())
+
+    @property
+    def dependencies(self) -> dict:
+        return self._dependencies
+
+    # Class particular methods
+    def get_stage_fingerprint(self, stage: PipelineStage) -> str:
+        fingerprint = hashlib.sha256()
+        fingerprint.update(
+            f"{stage.function.__module__}.{stage.function.__qualname__}"
+            .encode())
+        fingerprint.update(json.dumps(
+            stage.parameters, sort_keys=True, default=str).encode())
+        for input_path in stage.inputs:
+            fingerprint.update(input_path.encode())
+            fingerprint.update(self.get_path_hash(input_path).encode())
+        return fingerprint.hexdigest()
+
+    def get_path_hash(self, path: str) -> str:
+        # Hash of a file, or of the names and hashes of the files of a folder
+        if os.path.isfile(path):
+            return self.__get_file_hash(path)
+        if not os.path.isdir(path):
+            return MISSING_PATH_HASH
+        folder_hash = hashlib.sha256()
+        for folder, folders, filenames in os.walk(path):
+            folders.sort()
+            for filename in sorted(filenames):
+                file_path = os.path.join(folder, filename)
+                folder_hash.update(os.path.relpath(file_path, path).encode())
+                folder_hash.update(self.__get_file_hash(file_path).encode())
+        return folder_hash.hexdigest()
+
+    def is_stage_up_to_date(self,
+                            stage: PipelineStage,
+                            fingerprint: str) -> bool:
+        return (self._state["stages"].get(stage.name) == fingerprint and
+                all(os.path.exists(output) for output in stage.outputs))
+
+    def get_stages_to_run(self, targets: list[str] = None) -> list[str]:
+        # Targets and every stage they depend on, in declaration order
+        if targets is None:
+            return list(self._stages.keys())
+        stages_to_run = set()
+        pending = list(targets)
+        while len(pending) > 0:
+            stage_name = pending.pop()
+            if stage_name not in self._stages:
+                raise KeyError(f"Unknown pipeline stage: {stage_name}")
+            if stage_name not in stages_to_run:
+                stages_to_run.add(stage_name)
+                pending.extend(self._dependencies[stage_name])
+        return [
+            stage_name for stage_name in self._stages.keys()
+            if stage_name in stages_to_run
+        ]
+
+    def run(self,
+            targets: list[str] = None,
+            force: bool = False,
+            verbose: bool = False) -> dict:
+        # Status of every stage: ran, skipped, failed or blocked by the
+        # failure of a stage it depends on
+        stages_to_run = self.get_stages_to_run(targets)
+        summary = {"stages": {}, "errors": {}}
+        pending = set(stages_to_run)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self._max_workers) as executor:
+            while len(pending) > 0 or len(running) > 0:
+                for stage_name in list(pending):
+                    dependencies = [
+                        dependency
+                        for dependency in self._dependencies[stage_name]
+                        if dependency in stages_to_run
+                    ]
+                    if any(summary["stages"].get(dependency) in
+                           (STAGE_FAILED, STAGE_BLOCKED)
+                           for dependency in dependencies):
+                        summary["stages"][stage_name] = STAGE_BLOCKED
+                        pending.remove(stage_name)
+                    elif all(dependency in summary["stages"]
+                             for dependency in dependencies):
+                        running[executor.submit(
+                            self.__run_stage, self._stages[stage_name],
+                            force, verbose)] = stage_name
+                        pending.remove(stage_name)
+
+                if len(running) == 0:
+                    if len(pending) > 0:
+                        raise ValueError(
+                            f"Pipeline stages with circular dependencies: "
+                            f"{sorted(pending)}")
+                    continue
+                finished, _ = wait(running.keys(),
+                                   return_when=FIRST_COMPLETED)
+                for future in finished:
+                    stage_name = running.pop(future)
+                    try:
+                        summary["stages"][stage_name] = future.result()
+                    except Exception as exception:
+                        summary["stages"][stage_name] = STAGE_FAILED
+                        summary["errors"][stage_name] = repr(exception)
+                    if verbose:
+                        print(f"{stage_name}: "
+                              f"{summary['stages'][stage_name]}")
+
+        return summary
+
+    def __run_stage(self,
+                    stage: PipelineStage,
+                    force: bool,
+                    verbose: bool) -> str:
+        fingerprint = self.get_stage_fingerprint(stage)
+        if not force and self.is_stage_up_to_date(stage, fingerprint):
+            return STAGE_SKIPPED
+
+        if verbose:
+            print(f"{stage.name}: running")
+        stage.run()
+
+        with self._state_lock:
+            self._state["stages"][stage.name] = fingerprint
+            self.__save_state()
+        return STAGE_RAN
+
+    def __get_file_hash(self, file_path: str) -> str:
+        # The hashes are reused while the size and modification time of the
+        # files do not change
+        file_stat = os.stat(file_path)
+        file_key = [file_stat.st_size, file_stat.st_mtime_ns]
+        with self._state_lock:
+            cached_hash = self._state["files"].get(file_path)
+        if cached_hash is not None and cached_hash[:2] == file_key:
+            return cached_hash[2]
+
+        file_hash = get_file_sha256(file_path)
+        with self._state_lock:
+            self._state["files"][file_path] = file_key + [file_hash]
+        return file_hash
+
+    def __load_state(self) -> dict:
+        if not os.path.exists(self._state_filepath):
+            return {"stages": {}, "files": {}}
+        with open(self._state_filepath) as file:
+            return json.load(file)
+
+    def __save_state(self):
+        # NOTE: the state is written to a temporary file and then renamed,
+        # so an interrupted run never leaves it truncated
+        if os.path.dirname(self._state_filepath) != "":
+            os.makedirs(os.path.dirname(self._state_filepath), exist_ok=True)
+        temporary_filepath = f"{self._state_filepath}.tmp"
+        with open(temporary_filepath, "w") as file:
+            file.write(json.dumps(self._state, indent=4))
+        os.replace(temporary_filepath, self._state_filepath)
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import json
+import numpy as np
+import pandas as pd
+from shapely import (
+    from_geojson
+)
+# internal imports
+from src.utils.common_functions import (
+    create_directory_structure,
+    get_list_files_in_path
+)
+from src.utils.hunter_result_reader import HunterResultReader
+
+MANIFEST_FILENAME = "manifest.json"
+STRINGS_FILENAME = "strings.json"
+
+# Columns stored as ids of the strings table
+STRING_COLUMNS = [
+    "target", "origin_country", "result_country", "result_city",
+    "result_filename"
+]
+FLOAT_COLUMNS = [
+    "origin_latitude", "origin_longitude",
+    "result_latitude", "result_longitude"
+]
+INTEGER_COLUMNS = ["origin_id"]
+DATAFRAME_COLUMNS = [
+    "target", "origin_id", "origin_country",
+    "origin_latitude", "origin_longitude",
+    "result_country", "result_city", "result_latitude", "result_longitude",
+    "result_filename", "ips_previous_to_target"
+]
+
+
+def get_default_store_dir(results_folder: str) -> str:
+    return f"{results_folder.rstrip('/')}_columnar"
+
+
+def get_results_folder_manifest(results_folder: str) -> dict:
+    manifest = {}
+    for filename in sorted(get_list_files_in_path(results_folder)):
+        file_stat = os.stat(f"{results_folder}/{filename}")
+        manifest[filename] = [file_stat.st_size, file_stat.st_mtime_ns]
+    return manifest
+
+
+def is_results_store_up_to_date(results_folder: str, store_dir: str) -> bool:
+    try:
+        with open(f"{store_dir}/{MANIFEST_FILENAME}") as file:
+            stored_manifest = json.load(file)
+    except (FileNotFoundError, ValueError):
+        return False
+    return stored_manifest == get_results_folder_manifest(results_folder)
+
+
+class _StringsTable:
+    def __init__(self):
+        self._ids = {}
+        self._strings = []
+
+    @property
+    def strings(self) -> list[str]:
+        return self._strings
+
+    def intern(self, string: str) -> int:
+        string_id = self._ids.get(string)
+        if string_id is None:
+            string_id = len(self._strings)
+            self._ids[string] = string_id
+            self._strings.append(string)
+        return string_id
+
+
+def build_results_store(results_folder: str, store_dir: str = None) -> str:
+    if store_dir is None:
+        store_dir = get_default_store_dir(results_folder)
+    manifest = get_results_folder_manifest(results_folder)
+
+    strings_table = _StringsTable()
+    columns = {
+        column: []
+        for column in STRING_COLUMNS + FLOAT_COLUMNS + INTEGER_COLUMNS
+    }
+    ips_offsets = [0]
+    ips_values = []
+
+    for filename in manifest.keys():
+        reader = HunterResultReader(f"{results_folder}/{filename}")
+        target_id = strings_table.intern(str(reader.target()))
+        filename_id = strings_table.intern(filename)
+        # NOTE: the first origin of every probe, as in the routes results
+        origins_locations = {}
+        for origin in reader.iter_origins():
+            if origin["probe_id"] in origins_locations:
+                continue
+            location = from_geojson(origin["location"])
+            origins_locations[origin["probe_id"]] = (location.y, location.x)
+
+        for hunter_result in reader.iter_hunter_results():
+            location_result = hunter_result["location_result"]
+            origin_latitude, origin_longitude = origins_locations.get(
+                hunter_result["origin_id"], (0, 0))
+            if len(location_result["airports_intersection"]) == 1:
+                result_location = from_geojson(
+                    location_result["airports_intersection"][0]["location"])
+                result_latitude = result_location.y
+                result_longitude = result_location.x
+            else:
+                result_latitude = 0
+                result_longitude = 0
+
+            columns["target"].append(target_id)
+            columns["result_filename"].append(filename_id)
+            columns["origin_id"].append(hunter_result["origin_id"])
+            columns["origin_country"].append(strings_table.intern(
+                hunter_result["origin_country_code"]))
+            columns["result_country"].append(strings_table.intern(
+                location_result["country"]))
+            columns["result_city"].append(strings_table.intern(
+                location_result["city"]))
+            columns["origin_latitude"].append(origin_latitude)
+            columns["origin_longitude"].append(origin_longitude)
+            columns["result_latitude"].append(result_latitude)
+            columns["result_longitude"].append(result_longitude)
+
+            ips_values.extend(
+                strings_table.intern(ip["ip"])
+                for ip in hunter_result["ips_previous_to_target"]
+            )
+            ips_offsets.append(len(ips_values))
+
+    create_directory_structure(f"{store_dir}/")
+    # The manifest is removed first and written last, so a store left half
+    # written by an interrupted build is always considered out of date
+    if os.path.exists(f"{store_dir}/{MANIFEST_FILENAME}"):
+        os.remove(f"{store_dir}/{MANIFEST_FILENAME}")
+    for column in STRING_COLUMNS:
+        np.save(f"{store_dir}/{column}.npy",
+                np.asarray(columns[column], dtype=np.int32))
+    for column in FLOAT_COLUMNS:
+        np.save(f"{store_dir}/{column}.npy",
+                np.asarray(columns[column], dtype=np.float64))
+    for column in INTEGER_COLUMNS:
+        np.save(f"{store_dir}/{column}.npy",
+                np.asarray(columns[column], dtype=np.int64))
+    np.save(f"{store_dir}/ips_offsets.npy",
+            np.asarray(ips_offsets, dtype=np.int64))
+    np.save(f"{store_dir}/ips_values.npy",
+            np.asarray(ips_values, dtype=np.int32))
+    with open(f"{store_dir}/{STRINGS_FILENAME}", "w") as file:
+        json.dump(strings_table.strings, file)
+    with open(f"{store_dir}/{MANIFEST_FILENAME}", "w") as file:
+        json.dump(manifest, file)
+
+    return store_dir
+
+
+def load_results_dataframe(results_folder: str,
+                           store_dir: str = None,
+                           with_ips_previous_to_target: bool = True
+                           ) -> pd.DataFrame:
+    if store_dir is None:
+        store_dir = get_default_store_dir(results_folder)
+    if not is_results_store_up_to_date(results_folder, store_dir):
+        build_results_store(results_folder, store_dir)
+
+    with open(f"{store_dir}/{STRINGS_FILENAME}") as file:
+        strings = np.asarray(json.load(file), dtype=object)
+
+    columns = {}
+    for column in STRING_COLUMNS:
+        columns[column] = strings[
+            np.load(f"{store_dir}/{column}.npy", mmap_mode="r")]
+    for column in FLOAT_COLUMNS + INTEGER_COLUMNS:
+        columns[column] = np.load(f"{store_dir}/{column}.npy", mmap_mode="r")
+
+    if with_ips_previous_to_target:
+        ips_offsets = np.load(f"{store_dir}/ips_offsets.npy")
+        ips_values = strings[np.load(f"{store_dir}/ips_values.npy")].tolist()
+        columns["ips_previous_to_target"] = [
+            ips_values[start:end]
+            for start, end in zip(ips_offsets[:-1].tolist(),
+                                  ips_offsets[1:].tolist())
+        ]
+
+    return pd.DataFrame(columns)[[
+        column for column in DATAFRAME_COLUMNS if column in columns
+    ]]
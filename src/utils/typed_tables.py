@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import io
+import os
+import json
+import tempfile
+from ast import literal_eval
+from typing import Iterator
+import numpy as np
+import pandas as pd
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+# Extensions of the formats able to store list columns
+PARQUET_EXTENSION = ".parquet"
+JSONL_EXTENSION = ".jsonl"
+CSV_EXTENSION = ".csv"
+
+
+def is_parquet_available() -> bool:
+    return pyarrow is not None
+
+
+def get_typed_table_filepath(filepath_without_extension: str) -> str:
+    # Parquet when pyarrow is installed, JSON Lines otherwise
+    if is_parquet_available():
+        return f"{filepath_without_extension}{PARQUET_EXTENSION}"
+    return f"{filepath_without_extension}{JSONL_EXTENSION}"
+
+
+def to_python_list(values) -> list:
+    # Nested lists are read from parquet as numpy arrays
+    return [
+        to_python_list(value) if isinstance(value, np.ndarray) else value
+        for value in values
+    ]
+
+
+def parse_list_string(value) -> list:
+    # Parse a list stored as text, JSON or the repr of a Python list
+    if isinstance(value, (list, tuple, set, frozenset, np.ndarray)):
+        return to_python_list(value)
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return []
+    try:
+        return json.loads(value)
+    except ValueError:
+        pass
+    # NOTE: the repr of a list of plain strings is valid JSON once the quotes
+    # are swapped, strings with quotes inside are left to literal_eval
+    if '"' not in value and "\\" not in value:
+        try:
+            return json.loads(value.replace("'", '"'))
+        except ValueError:
+            pass
+    return list(literal_eval(value))
+
+
+def parse_list_column(column: pd.Series, as_set: bool = False) -> pd.Series:
+    # Every different text is parsed only once
+    # NOTE: the rows with the same text share the same parsed object
+    if as_set:
+        parse = lambda value: set(parse_list_string(value))
+    else:
+        parse = parse_list_string
+    parsed_values = {}
+    parsed_column = []
+    for value in column.tolist():
+        if isinstance(value, str):
+            if value not in parsed_values:
+                parsed_values[value] = parse(value)
+            parsed_column.append(parsed_values[value])
+        else:
+            parsed_column.append(parse(value))
+    return pd.Series(parsed_column, index=column.index, name=column.name,
+                     dtype=object)
+
+
+def prepare_list_columns(dataframe: pd.DataFrame,
+                         list_columns: list[str]) -> pd.DataFrame:
+    # Copy of the dataframe with the list and set columns as lists
+    dataframe = dataframe.copy()
+    for column in list_columns:
+        dataframe[column] = [
+            sorted(value) if isinstance(value, (set, frozenset)) else
+            list(value)
+            for value in parse_list_column(dataframe[column])
+        ]
+    return dataframe
+
+
+def dataframe_to_jsonl(dataframe: pd.DataFrame) -> str:
+    if len(dataframe.index) == 0:
+        return ""
+    records = dataframe.to_json(orient="records", lines=True,
+                                force_ascii=False)
+    return records if records.endswith("\n") else f"{records}\n"
+
+
+def dataframe_to_csv(dataframe: pd.DataFrame,
+                     list_columns: list[str],
+                     header: bool = True) -> str:
+    dataframe = dataframe.copy()
+    for column in list_columns:
+        dataframe[column] = dataframe[column].map(json.dumps)
+    return dataframe.to_csv(sep=",", index=False, header=header)
+
+
+def write_typed_table(dataframe: pd.DataFrame,
+                      filepath: str,
+                      list_columns: list[str] = None):
+    # Format given by the extension, list and set columns are stored as lists
+    list_columns = list_columns or []
+    dataframe = prepare_list_columns(dataframe, list_columns)
+
+    if os.path.dirname(filepath) != "":
+        os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    extension = os.path.splitext(filepath)[1]
+    if extension == PARQUET_EXTENSION:
+        if not is_parquet_available():
+            raise ImportError("pyarrow is required to write parquet files")
+        dataframe.to_parquet(filepath, index=False)
+    elif extension == JSONL_EXTENSION:
+        # NOTE: the first line holds the columns, so the tables without rows
+        # keep them too
+        with open(filepath, "w") as file:
+            file.write(json.dumps({"columns": dataframe.columns.tolist()}))
+            file.write("\n")
+            file.write(dataframe_to_jsonl(dataframe))
+    elif extension == CSV_EXTENSION:
+        with open(filepath, "w") as file:
+            file.write(dataframe_to_csv(dataframe, list_columns))
+    else:
+        raise ValueError(f"Unsupported table format: {filepath}")
+
+
+class TypedTableWriter:
+    # Writes a JSON Lines or CSV table in chunks, so the rows do not need to
+    # be in memory at the same time. The table is only visible in its path
+    # once it is closed without errors
+    def __init__(self,
+                 filepath: str,
+                 columns: list[str],
+                 list_columns: list[str] = None):
+        extension = os.path.splitext(filepath)[1]
+        if extension not in (JSONL_EXTENSION, CSV_EXTENSION):
+            raise ValueError(
+                f"Only JSON Lines and CSV tables are written in chunks: "
+                f"{filepath}")
+        self._filepath = filepath
+        self._extension = extension
+        self._columns = list(columns)
+        self._list_columns = list_columns or []
+        self._rows = 0
+
+        if os.path.dirname(filepath) != "":
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+        file_descriptor, self._temporary_filepath = tempfile.mkstemp(
+            dir=os.path.dirname(filepath) or ".", suffix=".tmp")
+        self._file = os.fdopen(file_descriptor, "w")
+        if extension == JSONL_EXTENSION:
+            self._file.write(json.dumps({"columns": self._columns}))
+            self._file.write("\n")
+        else:
+            self._file.write(dataframe_to_csv(
+                pd.DataFrame(columns=self._columns), []))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    # Properties access
+    @property
+    def rows(self) -> int:
+        return self._rows
+
+    # Class particular methods
+    def write(self, dataframe: pd.DataFrame):
+        dataframe = prepare_list_columns(
+            dataframe.reindex(columns=self._columns), self._list_columns)
+        if self._extension == JSONL_EXTENSION:
+            self._file.write(dataframe_to_jsonl(dataframe))
+        else:
+            self._file.write(dataframe_to_csv(
+                dataframe, self._list_columns, header=False))
+        self._rows += len(dataframe.index)
+
+    def write_serialized_rows(self, rows: list[str]):
+        # Rows already serialized in the format of the table, e.g. copied
+        # from a previous version of it by iter_serialized_rows
+        self._file.writelines(rows)
+        self._rows += len(rows)
+
+    def close(self):
+        self._file.close()
+        os.replace(self._temporary_filepath, self._filepath)
+
+    def discard(self):
+        self._file.close()
+        os.remove(self._temporary_filepath)
+
+
+def iter_serialized_rows(filepath: str) -> Iterator[str]:
+    # Lines of the rows of a JSON Lines or CSV table written by
+    # TypedTableWriter, without its header line
+    with open(filepath) as file:
+        file.readline()
+        yield from file
+
+
+def read_typed_table(filepath: str,
+                     list_columns: list[str] = None,
+                     set_columns: list[str] = None) -> pd.DataFrame:
+    # The list columns are returned as Python lists and the set columns as
+    # sets, whatever the format they were stored with
+    list_columns = list_columns or []
+    set_columns = set_columns or []
+
+    extension = os.path.splitext(filepath)[1]
+    if extension == PARQUET_EXTENSION:
+        if not is_parquet_available():
+            raise ImportError("pyarrow is required to read parquet files")
+        dataframe = pd.read_parquet(filepath)
+    elif extension == JSONL_EXTENSION:
+        with open(filepath) as file:
+            columns = json.loads(file.readline())["columns"]
+            records = file.read()
+        if records.strip() == "":
+            dataframe = pd.DataFrame(columns=columns)
+        else:
+            dataframe = pd.read_json(
+                io.StringIO(records), orient="records", lines=True,
+                dtype=False, convert_dates=False).reindex(columns=columns)
+    elif extension == CSV_EXTENSION:
+        dataframe = pd.read_csv(filepath, sep=",")
+    else:
+        raise ValueError(f"Unsupported table format: {filepath}")
+
+    for column in list_columns:
+        dataframe[column] = parse_list_column(dataframe[column])
+    for column in set_columns:
+        dataframe[column] = parse_list_column(dataframe[column], as_set=True)
+    return dataframe
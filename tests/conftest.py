@@ -0,0 +1,12 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import sys
+# internal imports
+
+# The modules are imported from the root of the repository as src.*
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES_DIR = f"{os.path.dirname(os.path.abspath(__file__))}/fixtures"
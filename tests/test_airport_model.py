@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+from shapely import Point
+# internal imports
+from src.models.airport_model import AirportModel
+from src.utils.airports_memo import (
+    get_airport_dict,
+    get_airport_dicts
+)
+
+AIRPORTS_RAW = [
+    {"#IATA": "MAD", "size": "L", "name": "Barajas", "country_code": "ES",
+     "city": "Madrid", "lat long": "40.47193 -3.56264"},
+    {"#IATA": "BCN", "size": "L", "name": "El Prat", "country_code": "ES",
+     "city": "Barcelona", "lat long": "41.29694 2.07833"}
+]
+
+
+def test_to_dicts_same_as_to_dict():
+    airports = [
+        AirportModel("MAD", "L", "Barajas", longitude=-3.56264,
+                     latitude=40.47193, country_code="ES",
+                     city_name="Madrid"),
+        AirportModel("BCN", "L", "El Prat", location=Point(2.07833, 41.29694),
+                     country_code="ES", city_name="Barcelona")
+    ]
+    airports_dicts = [airport.to_dict() for airport in airports]
+    airports_columns = AirportModel.to_dicts(airports)
+    assert list(airports_columns.keys()) == list(airports_dicts[0].keys())
+    for column, values in airports_columns.items():
+        assert values == [
+            airport_dict[column] for airport_dict in airports_dicts
+        ]
+
+
+def test_get_airport_dicts_same_as_get_airport_dict():
+    assert get_airport_dicts(AIRPORTS_RAW) == [
+        get_airport_dict(airport_raw) for airport_raw in AIRPORTS_RAW
+    ]
+    assert get_airport_dicts([]) == []
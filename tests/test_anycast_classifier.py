@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import json
+import pytest
+# internal imports
+from src.utils.anycast_classifier import (
+    AnycastClassifier,
+    PooledTransport
+)
+from src.utils.ip_metadata_store import IPMetadataStore
+
+ANYCAST_IPS = {"1.1.1.1", "8.8.8.8"}
+
+
+class FakeTransport:
+    def __init__(self):
+        self.batches = []
+
+    def classify_many(self, ip_addresses: list[str]) -> dict:
+        self.batches.append(list(ip_addresses))
+        return {
+            ip_address: ip_address in ANYCAST_IPS
+            for ip_address in ip_addresses
+        }
+
+
+@pytest.fixture
+def store(tmp_path):
+    with IPMetadataStore(str(tmp_path / "store.db")) as store:
+        yield store
+
+
+def test_classify_skips_invalid_and_classified_ips(store):
+    store.upsert({"ip": "9.9.9.9", "anycast": True})
+    transport = FakeTransport()
+    classifier = AnycastClassifier(store, transport=transport)
+    classification = classifier.classify(
+        ["1.1.1.1", "not an ip", "9.9.9.9", "5.5.5.5", "1.1.1.1", ""])
+    assert transport.batches == [["1.1.1.1", "5.5.5.5"]]
+    assert classification == {
+        "1.1.1.1": True, "9.9.9.9": True, "5.5.5.5": False}
+
+    # Nothing is sent when every IP is already classified
+    assert classifier.classify(["1.1.1.1", "5.5.5.5"]) == {
+        "1.1.1.1": True, "5.5.5.5": False}
+    assert len(transport.batches) == 1
+
+
+def test_classify_batches(store):
+    transport = FakeTransport()
+    ip_addresses = [f"10.0.0.{index}" for index in range(7)]
+    AnycastClassifier(store, transport=transport, batch_size=3).classify(
+        ip_addresses)
+    assert transport.batches == [
+        ip_addresses[:3], ip_addresses[3:6], ip_addresses[6:]]
+
+
+def test_classify_checkpoint(store, tmp_path):
+    checkpoint_filepath = str(tmp_path / "classification.json")
+    with open(checkpoint_filepath, "w") as file:
+        json.dump({"2.2.2.2": True, "5.5.5.5": True}, file)
+    # Classified by a previous run, e.g. imported from another file
+    store.upsert({"ip": "3.3.3.3", "anycast": False})
+
+    checkpoints = []
+
+    class CheckpointTransport(FakeTransport):
+        def classify_many(self, ip_addresses: list[str]) -> dict:
+            with open(checkpoint_filepath) as file:
+                checkpoints.append(json.load(file))
+            return super().classify_many(ip_addresses)
+
+    AnycastClassifier(store, transport=CheckpointTransport(), batch_size=1,
+                      checkpoint_filepath=checkpoint_filepath).classify(
+        ["8.8.8.8", "5.5.5.5"])
+
+    # The first batch is saved before the second one is sent
+    assert checkpoints[1] == {
+        "2.2.2.2": True, "5.5.5.5": True, "3.3.3.3": False, "8.8.8.8": True}
+    with open(checkpoint_filepath) as file:
+        assert json.load(file) == {
+            "2.2.2.2": True, "5.5.5.5": False, "3.3.3.3": False,
+            "8.8.8.8": True}
+
+
+def test_pooled_transport():
+    transport = PooledTransport(lambda ip_address: ip_address in ANYCAST_IPS,
+                                max_workers=2)
+    assert transport.classify_many(["1.1.1.1", "5.5.5.5"]) == {
+        "1.1.1.1": True, "5.5.5.5": False}
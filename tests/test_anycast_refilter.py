@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import json
+# internal imports
+from src.engines import anycast_refilter
+from src.engines.anycast_refilter import refilter_result_file
+from src.utils.airports_memo import AirportsMemo
+from src.utils.ip_prefix_index import IPPrefixIndex
+
+MADRID_LOCATION = '{"type": "Point", "coordinates": [-3.70256, 40.4165]}'
+LONDON_LOCATION = '{"type": "Point", "coordinates": [-0.1275, 51.50722]}'
+
+
+def get_hunter_result(ips_previous_to_target: list[tuple]) -> dict:
+    return {
+        "origin_id": 0,
+        "ips_previous_to_target": [
+            {"ip": ip, "location": location}
+            for ip, location in ips_previous_to_target
+        ],
+        "location_result": {"country": "DE", "city": "Berlin"}
+    }
+
+
+def test_refilter_result_file_memo_locations(tmp_path, monkeypatch):
+    airports_memo = AirportsMemo(persistent=False)
+    monkeypatch.setattr(anycast_refilter, "get_airports_memo",
+                        lambda: airports_memo)
+    source_filepath = str(tmp_path / "source.json")
+    output_filepath = str(tmp_path / "output.json")
+    with open(source_filepath, "w") as file:
+        json.dump({"target": "8.8.8.8", "hunter_results": [
+            get_hunter_result([("1.1.1.1", LONDON_LOCATION),
+                               ("2.2.2.2", MADRID_LOCATION)]),
+            get_hunter_result([("3.3.3.3", MADRID_LOCATION)])
+        ]}, file)
+
+    prefix_index = IPPrefixIndex(["1.1.1.1"])
+    prefix_index.build()
+    file_summary = refilter_result_file(
+        source_filepath, output_filepath, prefix_index)
+
+    assert file_summary["results"] == 2
+    assert file_summary["results_updated"] == 1
+    assert file_summary["airports_memo_hits"] == 0
+    assert file_summary["airports_memo_misses"] == 1
+    assert len(file_summary["airports_memo_locations"]) == 1
+    # The locations sent back are not sent again
+    assert airports_memo.pop_new_locations() == {}
+    with open(output_filepath) as file:
+        location_result = json.load(file)["hunter_results"][0][
+            "location_result"]
+    assert location_result["country"] == "ES"
+    assert location_result["nearest_airport"] is True
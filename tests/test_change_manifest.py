@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+# internal imports
+from src.utils import change_manifest
+from src.utils.change_manifest import ChangeManifest
+
+
+def count_hashes(monkeypatch) -> list:
+    hashed = []
+    original_get_file_sha256 = change_manifest.get_file_sha256
+
+    def get_file_sha256(file_path: str) -> str:
+        hashed.append(os.path.basename(file_path))
+        return original_get_file_sha256(file_path)
+
+    monkeypatch.setattr(change_manifest, "get_file_sha256", get_file_sha256)
+    return hashed
+
+
+def test_touched_source_hashed_once(tmp_path, monkeypatch):
+    source_folder = tmp_path / "sources"
+    source_folder.mkdir()
+    (source_folder / "a.json").write_text("{}")
+    manifest_filepath = str(tmp_path / "manifest.json")
+
+    manifest = ChangeManifest(manifest_filepath)
+    assert manifest.get_changes(str(source_folder)) == (["a.json"], [], [])
+    manifest.record(str(source_folder), "a.json", {})
+    manifest.save()
+
+    # Modification time changed, content not
+    source_stat = os.stat(source_folder / "a.json")
+    os.utime(source_folder / "a.json",
+             ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns + 10 ** 9))
+    hashed = count_hashes(monkeypatch)
+    manifest = ChangeManifest(manifest_filepath)
+    assert manifest.get_changes(str(source_folder)) == ([], ["a.json"], [])
+    assert hashed == ["a.json"]
+    assert manifest.stats_updated
+    manifest.save()
+    assert not manifest.stats_updated
+
+    manifest = ChangeManifest(manifest_filepath)
+    assert manifest.get_changes(str(source_folder)) == ([], ["a.json"], [])
+    assert hashed == ["a.json"]
+    assert not manifest.stats_updated
+
+
+def test_parameters_changed(tmp_path):
+    source_folder = tmp_path / "sources"
+    source_folder.mkdir()
+    (source_folder / "a.json").write_text("{}")
+    manifest_filepath = str(tmp_path / "manifest.json")
+
+    manifest = ChangeManifest(manifest_filepath, {"airports": "1"})
+    manifest.get_changes(str(source_folder))
+    manifest.record(str(source_folder), "a.json", {})
+    manifest.save()
+
+    assert len(ChangeManifest(manifest_filepath, {"airports": "1"})) == 1
+    assert len(ChangeManifest(manifest_filepath, {"airports": "2"})) == 0
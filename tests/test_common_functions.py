@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import pytest
+# internal imports
+from src.utils import common_functions
+from src.utils.common_functions import (
+    get_ip_country_via_cache,
+    get_ips_details_metadata_via_cache
+)
+
+IPS_METADATA = {
+    "1.1.1.1": {"ip": "1.1.1.1", "country": "AU", "bogon": False,
+                "anycast": True},
+    "10.0.0.1": {"ip": "10.0.0.1", "country": None, "bogon": True,
+                 "anycast": False},
+    # Only classified as anycast, its details could not be fetched
+    "2.2.2.2": {"ip": "2.2.2.2", "country": None, "bogon": None,
+                "anycast": True}
+}
+
+
+@pytest.fixture(autouse=True)
+def ips_metadata(monkeypatch):
+    monkeypatch.setattr(
+        common_functions, "get_ips_metadata_via_cache",
+        lambda ip_addresses: {
+            ip_address: IPS_METADATA[ip_address]
+            for ip_address in ip_addresses if ip_address in IPS_METADATA
+        })
+
+
+def test_get_ip_country_via_cache():
+    assert get_ip_country_via_cache("1.1.1.1") == "AU"
+    assert get_ip_country_via_cache("10.0.0.1") == "bogon"
+
+
+@pytest.mark.parametrize("ip_address", ["3.3.3.3", "2.2.2.2"])
+def test_get_ip_country_via_cache_failed_lookup(ip_address):
+    with pytest.raises(LookupError, match=ip_address):
+        get_ip_country_via_cache(ip_address)
+
+
+def test_get_ips_details_metadata_via_cache():
+    ips_metadata = get_ips_details_metadata_via_cache(
+        ["1.1.1.1", "10.0.0.1", "1.1.1.1"])
+    assert ips_metadata["1.1.1.1"]["country"] == "AU"
+    assert ips_metadata["10.0.0.1"]["bogon"] is True
+    with pytest.raises(LookupError, match="2.2.2.2, 3.3.3.3"):
+        get_ips_details_metadata_via_cache(["1.1.1.1", "2.2.2.2", "3.3.3.3"])
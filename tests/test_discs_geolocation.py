@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import json
+import numpy as np
+import pytest
+# internal imports
+from src.engines.discs_geolocation import (
+    DISCS_CHUNK_SIZE,
+    NO_AIRPORT,
+    DiscsGeolocation,
+    get_rtts_distances,
+    locate_hunter_results,
+    locate_result_file
+)
+from src.engines.location_consensus import (
+    INDETERMINATE,
+    get_location_coordinates
+)
+from src.utils.geo_distance import (
+    distances_from_point,
+    distances_matrix
+)
+from src.utils.hunter_result_reader import (
+    HunterResultReader,
+    get_result_file_discs
+)
+
+HUNTER_RESULTS_FILEPATH = \
+    f"{os.path.dirname(os.path.abspath(__file__))}/fixtures/hunter_results/" \
+    f"8.8.8.8.json"
+MADRID = (40.4165, -3.70256)
+BARCELONA = (41.38879, 2.15899)
+SYDNEY = (-33.86785, 151.20732)
+# Airports nearer to the border of a disc than this are not compared
+BORDER_TOLERANCE_KM = 1e-3
+
+
+@pytest.fixture(scope="module")
+def geolocation() -> DiscsGeolocation:
+    return DiscsGeolocation()
+
+
+def get_rtts(distances_km) -> np.ndarray:
+    # RTT of the discs with the distances given as radius
+    return np.asarray(distances_km) / get_rtts_distances(1.0)
+
+
+def get_result(ips: list[str]) -> dict:
+    return {
+        "ips_previous_to_target": [
+            {"ip": ip, "location": '{"type": "Point", "coordinates": [0, 0]}'}
+            for ip in ips
+        ],
+        "location_result": {}
+    }
+
+
+def test_locate_airports_brute_force(geolocation):
+    airports_index = geolocation.airports_index
+    rng = np.random.default_rng(0)
+    groups_count = 300
+    groups, latitudes, longitudes, distances = [], [], [], []
+    for group in range(groups_count):
+        discs_count = int(rng.integers(1, 8))
+        airport = int(rng.integers(len(airports_index)))
+        discs_latitudes = np.clip(airports_index.latitudes[airport] +
+                                  rng.normal(0, 5, discs_count), -89, 89)
+        discs_longitudes = airports_index.longitudes[airport] + \
+            rng.normal(0, 5, discs_count)
+        discs_distances = distances_from_point(
+            airports_index.latitudes[airport],
+            airports_index.longitudes[airport],
+            discs_latitudes, discs_longitudes) * \
+            rng.uniform(0.5, 1.5, discs_count)
+        groups += [group] * discs_count
+        latitudes += discs_latitudes.tolist()
+        longitudes += discs_longitudes.tolist()
+        distances += discs_distances.tolist()
+    groups = np.asarray(groups)
+    distances = np.asarray(distances)
+
+    _, _, _, airport_groups, airport_indexes, _ = geolocation.locate(
+        groups, latitudes, longitudes, get_rtts(distances), groups_count)
+    assert np.all(np.diff(airport_groups) >= 0)
+
+    airports_distances = distances_matrix(
+        latitudes, longitudes,
+        airports_index.latitudes, airports_index.longitudes) - \
+        distances[:, None]
+    located_pairs = set(zip(airport_groups.tolist(),
+                            airport_indexes.tolist()))
+    for group in range(groups_count):
+        group_distances = airports_distances[groups == group]
+        inside = np.all(group_distances <= 0, axis=0)
+        compared = np.all(np.abs(group_distances) > BORDER_TOLERANCE_KM,
+                          axis=0)
+        located = np.zeros(len(airports_index), dtype=bool)
+        located[[airport for located_group, airport in located_pairs
+                 if located_group == group]] = True
+        np.testing.assert_array_equal(located[compared], inside[compared])
+
+
+def test_locate_discs_not_intersecting(geolocation):
+    discs = {"5.5.5.5": [(*MADRID, get_rtts(100)),
+                         (*SYDNEY, get_rtts(100))]}
+    results = [get_result(["5.5.5.5"])]
+    assert locate_hunter_results(results, discs, geolocation) == 1
+    location_result = results[0]["location_result"]
+    assert location_result["country"] == INDETERMINATE
+    assert location_result["city"] == INDETERMINATE
+    assert location_result["discs_intersect"] is False
+    # The location of the IP is kept
+    assert results[0]["ips_previous_to_target"][0]["location"] == \
+        get_result([""])["ips_previous_to_target"][0]["location"]
+
+
+def test_locate_nearest_airport(geolocation):
+    # Small disc in the middle of the Atlantic ocean
+    groups = np.zeros(1, dtype=np.int64)
+    discs_intersect, latitudes, longitudes, airport_groups, _, \
+        nearest_indexes = geolocation.locate(
+            groups, [0.0], [-30.0], get_rtts([50]), 1)
+    assert discs_intersect.tolist() == [True]
+    assert (latitudes[0], longitudes[0]) == pytest.approx((0, -30), abs=1e-6)
+    assert len(airport_groups) == 0
+    assert nearest_indexes[0] != NO_AIRPORT
+
+    results = [get_result(["5.5.5.5"])]
+    locate_hunter_results(
+        results, {"5.5.5.5": [(0.0, -30.0, get_rtts(50))]}, geolocation)
+    location_result = results[0]["location_result"]
+    assert location_result["nearest_airport"] is True
+    assert location_result["discs_intersect"] is True
+    assert len(location_result["airports_intersection"]) == 1
+    assert location_result["country"] == \
+        location_result["airports_countries"][0]
+
+
+def test_locate_group_larger_than_chunk(geolocation):
+    discs_latitudes = [MADRID[0], BARCELONA[0], 40.0]
+    discs_longitudes = [MADRID[1], BARCELONA[1], 0.0]
+    discs_rtts = get_rtts([400, 350, 300])
+    expected = geolocation.locate(
+        np.zeros(3, dtype=np.int64), discs_latitudes, discs_longitudes,
+        discs_rtts, 1)
+
+    # Group 1 has more discs than a chunk, between two small groups
+    repeats = DISCS_CHUNK_SIZE // 3 + 1
+    groups = np.r_[[0] * 3, [1] * (3 * repeats), [2] * 3]
+    located = geolocation.locate(
+        groups, discs_latitudes * (repeats + 2),
+        discs_longitudes * (repeats + 2),
+        np.tile(discs_rtts, repeats + 2), 3)
+
+    discs_intersect, latitudes, longitudes, airport_groups, \
+        airport_indexes, nearest_indexes = located
+    assert discs_intersect.tolist() == [True] * 3
+    np.testing.assert_allclose(latitudes, expected[1][0])
+    np.testing.assert_allclose(longitudes, expected[2][0])
+    for group in range(3):
+        np.testing.assert_array_equal(
+            airport_indexes[airport_groups == group], expected[4])
+    assert nearest_indexes.tolist() == [NO_AIRPORT] * 3
+
+
+def test_get_result_file_discs():
+    # Minimum RTT of every (IP, origin), without origins lacking location
+    # or RTTs that are not numbers
+    discs = get_result_file_discs(HunterResultReader(HUNTER_RESULTS_FILEPATH))
+    assert discs == {
+        "192.168.1.1": [(*MADRID, 0.5)],
+        "5.5.5.5": [(*MADRID, 3.1), (*BARCELONA, 5.0)],
+        "6.6.6.6": [(*MADRID, 7.5)],
+        "8.8.8.8": [(*MADRID, 8.25), (*BARCELONA, 6.0)]
+    }
+
+
+def test_locate_result_file(tmp_path):
+    output_filepath = str(tmp_path / "located.json")
+    file_summary = locate_result_file(HUNTER_RESULTS_FILEPATH,
+                                      output_filepath)
+    assert file_summary["results"] == 2
+    assert file_summary["results_located"] == 1
+
+    with open(output_filepath) as file:
+        results = json.load(file)["hunter_results"]
+    # Every IP is located alone with its own discs, the location result is
+    # the one of the first IP
+    first_ip, second_ip = results[0]["ips_previous_to_target"]
+    location_result = results[0]["location_result"]
+    assert location_result["discs_intersect"] is True
+    assert location_result["centroid"] == first_ip["location"]
+    assert location_result["country"] == "ES"
+    longitude, latitude = get_location_coordinates(second_ip["location"])
+    assert (latitude, longitude) == pytest.approx(MADRID, abs=1e-6)
+    assert results[1]["location_result"]["country"] == INDETERMINATE
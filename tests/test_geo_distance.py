@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import numpy as np
+import pytest
+# internal imports
+from src.utils.geo_distance import (
+    cosines_to_distances,
+    distances_from_point,
+    distances_matrix,
+    paired_distances
+)
+
+MADRID = (40.4165, -3.70256)
+BARCELONA = (41.38879, 2.15899)
+MADRID_BARCELONA_KM = 505
+
+
+def test_distances_from_point_scalars():
+    distances = distances_from_point(*MADRID, *BARCELONA)
+    assert distances.shape == (1,)
+    assert distances[0] == pytest.approx(MADRID_BARCELONA_KM, abs=1)
+
+
+def test_distances_from_point_arrays():
+    distances = distances_from_point(
+        *MADRID, [MADRID[0], BARCELONA[0]], [MADRID[1], BARCELONA[1]])
+    assert distances[0] == 0
+    np.testing.assert_allclose(
+        distances, distances_matrix(*MADRID, [MADRID[0], BARCELONA[0]],
+                                    [MADRID[1], BARCELONA[1]])[0])
+    np.testing.assert_allclose(
+        distances, paired_distances([MADRID[0]] * 2, [MADRID[1]] * 2,
+                                    [MADRID[0], BARCELONA[0]],
+                                    [MADRID[1], BARCELONA[1]]))
+
+
+def test_cosines_to_distances_scalar():
+    assert cosines_to_distances(1.0).tolist() == [0.0]
+    assert cosines_to_distances(-1.0)[0] == pytest.approx(np.pi * 6371)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import json
+import time
+from collections import Counter
+from http.server import (
+    BaseHTTPRequestHandler,
+    ThreadingHTTPServer
+)
+from threading import (
+    Lock,
+    Thread
+)
+import pytest
+# internal imports
+from src.utils.ip_cache_client import IPCacheClient
+
+SLOW_SECONDS = 0.3
+TIMEOUT_SECONDS = 0.5
+HANGING_SECONDS = 2
+BACKOFF_SECONDS = 0.05
+
+
+class StubIPCacheServer(ThreadingHTTPServer):
+    # NOTE: answers as the IP cache service, {"details": "<JSON text>"},
+    # with the behaviour of every IP given by its responses: a list of
+    # status codes returned in order (the last one repeated), or "slow" and
+    # "hang" to answer 200 after a delay
+    daemon_threads = True
+
+    def __init__(self, responses: dict):
+        super().__init__(("127.0.0.1", 0), StubIPCacheHandler)
+        self.responses = responses
+        self.requests = Counter()
+        self.requests_lock = Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubIPCacheHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        ip_address = self.path.strip("/")
+        with self.server.requests_lock:
+            self.server.requests[ip_address] += 1
+            attempt = self.server.requests[ip_address]
+        response = self.server.responses.get(ip_address, [404])
+        status_code = 200
+        if response == "slow":
+            time.sleep(SLOW_SECONDS)
+        elif response == "hang":
+            time.sleep(HANGING_SECONDS)
+        else:
+            status_code = response[min(attempt, len(response)) - 1]
+
+        body = json.dumps({
+            "details": json.dumps({"ip": ip_address, "country": "ES"})
+        }).encode()
+        try:
+            self.send_response(status_code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def log_message(self, *arguments):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(responses: dict) -> StubIPCacheServer:
+        server = StubIPCacheServer(responses)
+        Thread(target=server.serve_forever, args=(0.05,),
+               daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def get_client(server: StubIPCacheServer,
+               max_retries: int = 3) -> IPCacheClient:
+    return IPCacheClient(server.base_url, max_workers=8,
+                         max_retries=max_retries,
+                         backoff_seconds=BACKOFF_SECONDS,
+                         timeout_seconds=TIMEOUT_SECONDS)
+
+
+def test_get(stub_server):
+    server = stub_server({"1.1.1.1": [200]})
+    with get_client(server) as client:
+        assert client.get("1.1.1.1") == {"ip": "1.1.1.1", "country": "ES"}
+
+
+def test_concurrent_lookups_deduplicated(stub_server):
+    server = stub_server({"1.1.1.1": "slow", "2.2.2.2": [200]})
+    with get_client(server) as client:
+        futures = [client.submit("1.1.1.1") for _ in range(10)]
+        details = client.get_many(["1.1.1.1", "2.2.2.2", "1.1.1.1"])
+        assert len({id(future) for future in futures}) == 1
+        assert [future.result() for future in futures] == \
+            [details["1.1.1.1"]] * 10
+    assert list(details.keys()) == ["1.1.1.1", "2.2.2.2"]
+    assert server.requests == {"1.1.1.1": 1, "2.2.2.2": 1}
+
+
+def test_retries_with_backoff(stub_server):
+    server = stub_server({"1.1.1.1": [429, 503, 200]})
+    with get_client(server) as client:
+        start = time.monotonic()
+        details = client.get("1.1.1.1")
+        elapsed = time.monotonic() - start
+    assert details["ip"] == "1.1.1.1"
+    assert server.requests["1.1.1.1"] == 3
+    # Backoff of the two retries, doubled on every attempt
+    assert elapsed >= BACKOFF_SECONDS + 2 * BACKOFF_SECONDS
+
+
+def test_failed_after_retries(stub_server):
+    server = stub_server({"1.1.1.1": [500], "2.2.2.2": [200]})
+    with get_client(server, max_retries=2) as client:
+        details = client.get_many(["1.1.1.1", "2.2.2.2"])
+    assert details["1.1.1.1"] is None
+    assert details["2.2.2.2"]["ip"] == "2.2.2.2"
+    assert server.requests["1.1.1.1"] == 3
+
+
+def test_client_errors_not_retried(stub_server):
+    server = stub_server({"1.1.1.1": [404]})
+    with get_client(server) as client:
+        assert client.get_many(["1.1.1.1"]) == {"1.1.1.1": None}
+    assert server.requests["1.1.1.1"] == 1
+
+
+def test_timeout(stub_server):
+    server = stub_server({"1.1.1.1": "hang"})
+    with get_client(server, max_retries=1) as client:
+        start = time.monotonic()
+        details = client.get_many(["1.1.1.1"])
+        elapsed = time.monotonic() - start
+    assert details == {"1.1.1.1": None}
+    assert server.requests["1.1.1.1"] == 2
+    assert elapsed < 2 * HANGING_SECONDS
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import pytest
+# internal imports
+from src.utils.ip_interning import (
+    INITIAL_CAPACITY,
+    IPInterningTable
+)
+
+BOGON_ADDRESSES = [
+    "10.1.2.3",      # private
+    "240.0.0.1",     # reserved
+    "127.0.0.1",     # loopback
+    "::1",
+    "169.254.1.1",   # link local
+    "fe80::1",
+    "224.0.0.1",     # multicast
+    "ff02::1",
+    "0.0.0.0",       # unspecified
+    "::"
+]
+PUBLIC_ADDRESSES = ["8.8.8.8", "1.1.1.1", "2001:4860:4860::8888"]
+
+
+def test_is_bogon():
+    ip_table = IPInterningTable()
+    bogon_ids = ip_table.intern_many(BOGON_ADDRESSES)
+    public_ids = ip_table.intern_many(PUBLIC_ADDRESSES)
+    invalid_id = ip_table.intern("not an ip")
+    assert ip_table.is_bogon(bogon_ids).all()
+    assert not ip_table.is_bogon(public_ids).any()
+    assert not ip_table.is_bogon([invalid_id])[0]
+    # Multicast addresses are bogons but not private ones
+    assert not ip_table.is_private(ip_table.intern_many(
+        ["224.0.0.1", "ff02::1"])).any()
+
+
+def test_is_in():
+    ip_table = IPInterningTable()
+    address_ids = ip_table.intern_many(
+        ["8.8.8.8", "1.1.1.1", "8.8.8.8", "9.9.9.9"])
+    assert ip_table.is_in(address_ids, {"8.8.8.8", "9.9.9.9"}).tolist() == \
+        [True, False, True, True]
+    assert not ip_table.is_in(address_ids, []).any()
+
+
+@pytest.mark.parametrize("address", ["10.0.0.1", "8.8.8.8"])
+def test_predicates_after_grow(address):
+    ip_table = IPInterningTable()
+    ip_table.intern_many([f"2001:db8::{index:x}"
+                          for index in range(INITIAL_CAPACITY)])
+    address_id = ip_table.intern(address)
+    assert address_id == INITIAL_CAPACITY
+    assert ip_table.addresses([address_id]).tolist() == [address]
+    assert ip_table.is_bogon([address_id])[0] == (address == "10.0.0.1")
+    assert ip_table.is_in([address_id], [address])[0]
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import json
+import os
+import sqlite3
+import time
+# internal imports
+from src.utils.ip_metadata_store import IPMetadataStore
+
+OLD_FETCHED_AT = time.time() - 365 * 24 * 60 * 60
+
+
+def test_anycast_upsert_keeps_details_stale(tmp_path):
+    with IPMetadataStore(str(tmp_path / "store.db")) as store:
+        store.upsert({"ip": "1.1.1.1", "country": "AU", "bogon": False,
+                      "anycast": False, "latitude": -33.9,
+                      "longitude": 151.2, "fetched_at": OLD_FETCHED_AT})
+        assert store.get_stale_ips(["1.1.1.1"], field="bogon") == \
+            ["1.1.1.1"]
+
+        store.upsert({"ip": "1.1.1.1", "anycast": True})
+        assert store.get_stale_ips(["1.1.1.1"], field="bogon") == \
+            ["1.1.1.1"]
+        assert store.get_stale_ips(["1.1.1.1"], field="anycast") == []
+        record = store.get("1.1.1.1")
+        assert record["fetched_at"] == OLD_FETCHED_AT
+        assert record["country"] == "AU" and record["anycast"] is True
+
+
+def test_details_upsert_renews_details(tmp_path):
+    with IPMetadataStore(str(tmp_path / "store.db")) as store:
+        store.upsert({"ip": "8.8.8.8", "anycast": True})
+        # Only the anycast classification is known
+        assert store.get_stale_ips(["8.8.8.8"]) == ["8.8.8.8"]
+        assert store.get_stale_ips(["8.8.8.8"], field="bogon") == \
+            ["8.8.8.8"]
+
+        store.upsert({"ip": "8.8.8.8", "country": "US", "bogon": False})
+        assert store.get_stale_ips(["8.8.8.8"], field="bogon") == []
+        assert store.get("8.8.8.8")["anycast"] is True
+
+
+def test_store_without_anycast_fetched_at(tmp_path):
+    filepath = str(tmp_path / "store.db")
+    connection = sqlite3.connect(filepath)
+    with connection:
+        connection.execute(
+            "CREATE TABLE ip_metadata (ip TEXT PRIMARY KEY, country TEXT, "
+            "anycast INTEGER, bogon INTEGER, latitude REAL, "
+            "longitude REAL, fetched_at REAL)")
+        connection.execute(
+            "INSERT INTO ip_metadata VALUES "
+            "('9.9.9.9', 'CH', 1, 0, NULL, NULL, ?)", (time.time(),))
+    connection.close()
+
+    with IPMetadataStore(filepath) as store:
+        record = store.get("9.9.9.9")
+        assert record["anycast_fetched_at"] == record["fetched_at"]
+        assert store.get_stale_ips(["9.9.9.9"], field="anycast") == []
+
+
+def test_export_anycast_classification(tmp_path):
+    classification_filepath = str(tmp_path / "classification.json")
+    with IPMetadataStore(str(tmp_path / "store.db")) as store:
+        store.upsert_many([{"ip": "1.1.1.1", "anycast": True},
+                           {"ip": "8.8.4.4", "anycast": False},
+                           {"ip": "9.9.9.9", "country": "CH"}])
+        store.export_anycast_classification(classification_filepath)
+        with open(classification_filepath) as file:
+            assert json.load(file) == {"1.1.1.1": True, "8.8.4.4": False}
+        assert not any(filename.endswith(".tmp")
+                       for filename in os.listdir(tmp_path))
+
+    with IPMetadataStore(str(tmp_path / "imported.db")) as store:
+        assert store.import_anycast_classification(
+            classification_filepath) == 2
+        assert store.get("1.1.1.1")["anycast"] is True
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+# internal imports
+from src.utils.json_io import (
+    NEW_FILE_MODE,
+    read_json_file,
+    write_json_file
+)
+
+
+def test_write_json_file_new_file_mode(tmp_path):
+    file_path = str(tmp_path / "new.json")
+    write_json_file({"a": 1}, file_path)
+    assert os.stat(file_path).st_mode & 0o7777 == NEW_FILE_MODE
+    assert read_json_file(file_path) == {"a": 1}
+
+
+def test_write_json_file_keeps_mode(tmp_path):
+    file_path = str(tmp_path / "existing.json")
+    write_json_file({"a": 1}, file_path)
+    os.chmod(file_path, 0o640)
+    write_json_file({"a": 2}, file_path, compact=True)
+    assert os.stat(file_path).st_mode & 0o7777 == 0o640
+    assert read_json_file(file_path) == {"a": 2}
+    assert os.listdir(tmp_path) == ["existing.json"]
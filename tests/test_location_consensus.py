@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import numpy as np
+# internal imports
+from src.engines.location_consensus import (
+    INDETERMINATE,
+    MAJORITY_RULE,
+    PLURALITY_RULE,
+    RTT_WEIGHTING,
+    UNIFORM_WEIGHTING,
+    LocationVotes,
+    get_file_consensus
+)
+from src.utils.airports_memo import AirportsMemo
+from src.utils.hunter_result_reader import (
+    HunterResultReader,
+    get_result_file_rtts
+)
+
+HUNTER_RESULTS_FILEPATH = \
+    f"{os.path.dirname(os.path.abspath(__file__))}/fixtures/hunter_results/" \
+    f"8.8.8.8.json"
+# Barcelona and Madrid airports
+BARCELONA_LOCATION = '{"type": "Point", "coordinates": [2.07833, 41.29694]}'
+MADRID_LOCATION = '{"type": "Point", "coordinates": [-3.56264, 40.47193]}'
+
+
+def get_result(ips: list[tuple]) -> dict:
+    return {
+        "ips_previous_to_target": [
+            {"ip": ip, "location": location} for ip, location in ips
+        ],
+        "location_result": {}
+    }
+
+
+def test_get_result_file_rtts():
+    assert get_result_file_rtts(
+        HunterResultReader(HUNTER_RESULTS_FILEPATH)) == {
+        "192.168.1.1": 0.5, "5.5.5.5": 3.1, "6.6.6.6": 7.5, "8.8.8.8": 6.0}
+
+
+def test_rtt_weighting():
+    results = [
+        get_result([("5.5.5.5", BARCELONA_LOCATION),
+                    ("6.6.6.6", MADRID_LOCATION)]),
+        # An IP without RTT, the result is voted with uniform weights
+        get_result([("5.5.5.5", BARCELONA_LOCATION),
+                    ("7.7.7.7", MADRID_LOCATION)])
+    ]
+    votes = LocationVotes(results, airports_memo=AirportsMemo(
+        persistent=False), ips_rtts={"5.5.5.5": 3.1, "6.6.6.6": 7.5})
+    np.testing.assert_allclose(votes.get_weights(RTT_WEIGHTING),
+                               [1 / 4.1, 1 / 8.5, 1, 1])
+
+    countries, cities = votes.get_consensus(MAJORITY_RULE, RTT_WEIGHTING)
+    assert countries == ["ES", "ES"]
+    assert cities == ["Barcelona", INDETERMINATE]
+    assert votes.get_consensus(MAJORITY_RULE, UNIFORM_WEIGHTING)[1] == \
+        [INDETERMINATE, INDETERMINATE]
+
+
+def test_get_file_consensus_rtt_weighting():
+    consensus_df = get_file_consensus(
+        HUNTER_RESULTS_FILEPATH,
+        [(PLURALITY_RULE, UNIFORM_WEIGHTING), (PLURALITY_RULE, RTT_WEIGHTING)])
+    assert consensus_df["origin_id"].tolist() == [1]
+    assert consensus_df["city_plurality_uniform"].tolist() == [INDETERMINATE]
+    assert consensus_df["city_plurality_rtt"].tolist() == ["Barcelona"]
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import json
+import os
+import numpy as np
+import pytest
+from shapely import box
+# internal imports
+from src.engines import probes_assignment
+from src.engines.probes_assignment import (
+    ASSIGNMENT_POLICIES,
+    CLOSEST_TO_CENTROID_POLICY,
+    MOST_STABLE_POLICY,
+    NO_CELL,
+    RANDOM_POLICY,
+    ProbesAssignment,
+    load_probes
+)
+from src.models import mesh_model
+
+PROBES_FIXTURES_DIR = \
+    f"{os.path.dirname(os.path.abspath(__file__))}/fixtures/probes"
+PROBES_JSON_FILEPATH = f"{PROBES_FIXTURES_DIR}/ripe_atlas_probes.json"
+PROBES_CSV_FILEPATH = f"{PROBES_FIXTURES_DIR}/ripe_atlas_probes.csv"
+
+# Connected probes of the fixtures with location
+CONNECTED_PROBES_IDS = [1001, 1002, 1003, 1005, 1006, 1007, 1008, 1009, 1010]
+
+
+@pytest.fixture
+def mesh(tmp_path, monkeypatch) -> mesh_model.MeshModel:
+    # Grid of 1 degree cells over [0, 4] x [40, 43], the borders keep the
+    # 3 x 3 cells of its south west corner
+    monkeypatch.setattr(mesh_model, "get_countries_borders",
+                        lambda *arguments: [box(0.2, 40.2, 2.5, 42.5)])
+    mesh_filepath = tmp_path / "mesh.json"
+    mesh_filepath.write_text(json.dumps({
+        "probes_per_section": 2,
+        "spacing": 1,
+        "limit_area": {
+            "longitude_min": 0,
+            "latitude_min": 40,
+            "longitude_max": 4,
+            "latitude_max": 43
+        }
+    }))
+    return mesh_model.MeshModel(str(mesh_filepath))
+
+
+def get_cell_bounds(mesh: mesh_model.MeshModel, cell: int) -> tuple:
+    return mesh.cells[cell].bounds
+
+
+def test_load_probes_json():
+    probes = load_probes(PROBES_JSON_FILEPATH)
+    assert probes["id"].tolist() == CONNECTED_PROBES_IDS
+    assert probes.loc[0, ["longitude", "latitude"]].tolist() == [0.5, 40.5]
+    assert probes.loc[0, "total_uptime"] == 100
+
+    all_probes = load_probes(PROBES_JSON_FILEPATH, connected_only=False)
+    assert 1004 in all_probes["id"].tolist()
+    # The probe without geometry is always dropped
+    assert 1011 not in all_probes["id"].tolist()
+
+
+def test_load_probes_csv_same_as_json():
+    json_probes = load_probes(PROBES_JSON_FILEPATH)
+    csv_probes = load_probes(PROBES_CSV_FILEPATH)
+    assert csv_probes["id"].tolist() == json_probes["id"].tolist()
+    np.testing.assert_allclose(
+        csv_probes[["longitude", "latitude", "total_uptime"]].to_numpy(),
+        json_probes[["longitude", "latitude", "total_uptime"]].to_numpy())
+
+
+def test_load_probes_csv_without_status(tmp_path):
+    probes_filepath = tmp_path / "probes.csv"
+    probes_filepath.write_text("id,longitude,latitude\n1,2.0,41.0\n"
+                               "2,-3.7,40.4\n")
+    assert load_probes(str(probes_filepath))["id"].tolist() == [1, 2]
+
+
+def test_mesh_grid(mesh):
+    assert mesh.x_grid.tolist() == [0, 1, 2, 3, 4]
+    assert mesh.y_grid.tolist() == [40, 41, 42, 43]
+    assert len(mesh.cells) == 9
+    assert mesh.cells_grid_indexes.tolist() == sorted(
+        mesh.cells_grid_indexes.tolist())
+
+
+def test_get_cells_inside(mesh):
+    assignment = ProbesAssignment(mesh)
+    longitudes = np.asarray([0.5, 1.5, 2.2])
+    latitudes = np.asarray([40.5, 41.5, 42.9])
+    cells = assignment.get_cells(longitudes, latitudes)
+    for cell, longitude, latitude in zip(cells, longitudes, latitudes):
+        xmin, ymin, xmax, ymax = get_cell_bounds(mesh, cell)
+        assert xmin <= longitude < xmax and ymin <= latitude < ymax
+
+
+def test_get_cells_out_of_mesh(mesh):
+    assignment = ProbesAssignment(mesh)
+    # Out of the grid, and in the grid but in a cell out of the borders
+    cells = assignment.get_cells([10.0, -0.5, 3.5], [10.0, 40.5, 40.5])
+    assert cells.tolist() == [NO_CELL] * 3
+
+
+def test_get_cells_border(mesh):
+    assignment = ProbesAssignment(mesh)
+    # Shared border between two cells and north east corner of the mesh
+    cells = assignment.get_cells([1.0, 3.0], [41.2, 43.0])
+    assert NO_CELL not in cells.tolist()
+    for cell, longitude, latitude in zip(cells, [1.0, 3.0], [41.2, 43.0]):
+        xmin, ymin, xmax, ymax = get_cell_bounds(mesh, cell)
+        assert xmin <= longitude <= xmax and ymin <= latitude <= ymax
+
+
+def test_get_cells_strtree_fallback(mesh, monkeypatch):
+    assignment = ProbesAssignment(mesh)
+    queried = []
+    original_strtree = probes_assignment.STRtree
+
+    def strtree(geometries):
+        queried.append(len(geometries))
+        return original_strtree(geometries)
+
+    monkeypatch.setattr(probes_assignment, "STRtree", strtree)
+    # Only the locations out of the cell found by the division are queried
+    assignment.get_cells([0.5], [40.5])
+    assert queried == []
+    cells = assignment.get_cells([3.0], [42.5])
+    assert queried == [len(mesh.cells)]
+    xmin, ymin, xmax, ymax = get_cell_bounds(mesh, cells[0])
+    assert xmax == 3.0 and ymin <= 42.5 <= ymax
+
+
+@pytest.mark.parametrize("policy", ASSIGNMENT_POLICIES)
+@pytest.mark.parametrize("probes_per_section", [1, 2, 3])
+def test_assign_per_cell_cap(mesh, policy, probes_per_section):
+    probes = load_probes(PROBES_JSON_FILEPATH)
+    assignment = ProbesAssignment(mesh)
+    cells = assignment.get_cells(probes["longitude"], probes["latitude"])
+    assigned = assignment.assign(probes, policy=policy,
+                                 probes_per_section=probes_per_section,
+                                 seed=0)
+
+    assert assigned["id"].is_unique
+    assert NO_CELL not in assigned["cell"].tolist()
+    probes_by_cell = np.bincount(cells[cells != NO_CELL])
+    assigned_by_cell = np.bincount(assigned["cell"],
+                                   minlength=len(probes_by_cell))
+    np.testing.assert_array_equal(
+        assigned_by_cell, np.minimum(probes_by_cell, probes_per_section))
+
+
+def test_assign_default_cap(mesh):
+    probes = load_probes(PROBES_JSON_FILEPATH)
+    assigned = ProbesAssignment(mesh).assign(probes, seed=0)
+    assert assigned["cell"].value_counts().max() == mesh.probes_per_section
+
+
+def test_assign_most_stable(mesh):
+    probes = load_probes(PROBES_JSON_FILEPATH)
+    assigned = ProbesAssignment(mesh).assign(
+        probes, policy=MOST_STABLE_POLICY, probes_per_section=1)
+    # 1001, 1002 and 1003 share a cell, 1002 has the longest uptime
+    assert 1002 in assigned["id"].tolist()
+    assert 1001 not in assigned["id"].tolist()
+    assert 1003 not in assigned["id"].tolist()
+
+
+def test_assign_closest_to_centroid(mesh):
+    probes = load_probes(PROBES_JSON_FILEPATH)
+    assigned = ProbesAssignment(mesh).assign(
+        probes, policy=CLOSEST_TO_CENTROID_POLICY, probes_per_section=1)
+    # 1001 is on the centroid of the cell of 1001, 1002 and 1003
+    assert 1001 in assigned["id"].tolist()
+    assert 1002 not in assigned["id"].tolist()
+
+
+def test_assign_random_seed(mesh):
+    probes = load_probes(PROBES_JSON_FILEPATH)
+    assignment = ProbesAssignment(mesh)
+    first = assignment.assign(probes, policy=RANDOM_POLICY,
+                              probes_per_section=1, seed=7)
+    second = assignment.assign(probes, policy=RANDOM_POLICY,
+                               probes_per_section=1, seed=7)
+    assert first["id"].tolist() == second["id"].tolist()
+
+
+def test_assign_unknown_policy(mesh):
+    with pytest.raises(ValueError):
+        ProbesAssignment(mesh).assign(load_probes(PROBES_JSON_FILEPATH),
+                                      policy="unknown")
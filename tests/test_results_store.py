@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import os
+import json
+import pandas as pd
+import pytest
+# internal imports
+from src.utils import results_store
+from src.utils.results_store import (
+    DATAFRAME_COLUMNS,
+    is_results_store_up_to_date,
+    load_results_dataframe
+)
+from src.engines.analysis_pipeline import get_analysis_stages
+from src.utils.pipeline_runner import PipelineRunner
+from src.utils.constants import RESULTS_MODES
+
+BARCELONA_AIRPORT = {
+    "iata_code": "BCN", "country_code": "ES", "city_name": "Barcelona",
+    "location": '{"type": "Point", "coordinates": [2.07833, 41.29694]}'
+}
+
+
+def get_location(longitude: float, latitude: float) -> str:
+    return json.dumps({"type": "Point", "coordinates": [longitude, latitude]})
+
+
+def get_hunter_result(origin_id: int,
+                      ips: list[str],
+                      country: str,
+                      city: str,
+                      airports: list[dict]) -> dict:
+    return {
+        "origin_id": origin_id,
+        "origin_country_code": "ES",
+        "ips_previous_to_target": [
+            {"ip": ip, "location": get_location(0, 0)} for ip in ips
+        ],
+        "location_result": {
+            "country": country,
+            "city": city,
+            "airports_intersection": airports
+        }
+    }
+
+
+def write_results_file(filepath: str, target: str, hunter_results: list):
+    with open(filepath, "w") as file:
+        json.dump({
+            "target": target,
+            "measurements": {"origin": [
+                {"probe_id": 1, "location": get_location(-3.7, 40.4)},
+                {"probe_id": 2, "location": get_location(2.1, 41.3)},
+                # Only the first origin of every probe is used
+                {"probe_id": 1, "location": get_location(10, 10)}
+            ]},
+            "hunter_results": hunter_results
+        }, file, indent=4)
+
+
+@pytest.fixture
+def results_folder(tmp_path) -> str:
+    results_folder = tmp_path / "results"
+    results_folder.mkdir()
+    write_results_file(f"{results_folder}/1.1.1.1.json", "1.1.1.1", [
+        get_hunter_result(1, ["5.5.5.5", "6.6.6.6"], "ES", "Barcelona",
+                          [BARCELONA_AIRPORT]),
+        get_hunter_result(2, [], "Indeterminate", "Indeterminate", [])
+    ])
+    write_results_file(f"{results_folder}/8.8.8.8.json", "8.8.8.8", [
+        get_hunter_result(3, ["5.5.5.5"], "ES", "Indeterminate",
+                          [BARCELONA_AIRPORT, BARCELONA_AIRPORT])
+    ])
+    return str(results_folder)
+
+
+def get_expected_dataframe() -> pd.DataFrame:
+    return pd.DataFrame([
+        ["1.1.1.1", 1, "ES", 40.4, -3.7, "ES", "Barcelona",
+         41.29694, 2.07833, "1.1.1.1.json", ["5.5.5.5", "6.6.6.6"]],
+        ["1.1.1.1", 2, "ES", 41.3, 2.1, "Indeterminate", "Indeterminate",
+         0.0, 0.0, "1.1.1.1.json", []],
+        ["8.8.8.8", 3, "ES", 0.0, 0.0, "ES", "Indeterminate",
+         0.0, 0.0, "8.8.8.8.json", ["5.5.5.5"]]
+    ], columns=DATAFRAME_COLUMNS)
+
+
+def test_load_results_dataframe(results_folder, tmp_path):
+    store_dir = str(tmp_path / "store")
+    results_df = load_results_dataframe(results_folder, store_dir)
+    assert is_results_store_up_to_date(results_folder, store_dir)
+    pd.testing.assert_frame_equal(results_df, get_expected_dataframe(),
+                                  check_dtype=False)
+
+    # Loaded again from the store, without ips_previous_to_target
+    results_df = load_results_dataframe(
+        results_folder, store_dir, with_ips_previous_to_target=False)
+    pd.testing.assert_frame_equal(
+        results_df,
+        get_expected_dataframe().drop(columns="ips_previous_to_target"),
+        check_dtype=False)
+
+
+def test_results_store_rebuilt_on_changes(results_folder, tmp_path,
+                                          monkeypatch):
+    store_dir = str(tmp_path / "store")
+    builds = []
+    build_results_store = results_store.build_results_store
+    monkeypatch.setattr(
+        results_store, "build_results_store",
+        lambda *arguments: builds.append(arguments) or
+        build_results_store(*arguments))
+
+    load_results_dataframe(results_folder, store_dir)
+    load_results_dataframe(results_folder, store_dir)
+    assert len(builds) == 1
+
+    # Same size, different modification time
+    filepath = f"{results_folder}/8.8.8.8.json"
+    file_stat = os.stat(filepath)
+    os.utime(filepath, ns=(file_stat.st_atime_ns,
+                           file_stat.st_mtime_ns + 10 ** 9))
+    assert not is_results_store_up_to_date(results_folder, store_dir)
+    load_results_dataframe(results_folder, store_dir)
+    assert len(builds) == 2
+
+    # Different size
+    write_results_file(filepath, "8.8.8.8", [
+        get_hunter_result(3, ["5.5.5.5"], "FR", "Paris", [])
+    ])
+    results_df = load_results_dataframe(results_folder, store_dir)
+    assert len(builds) == 3
+    assert results_df["result_country"].tolist() == [
+        "ES", "Indeterminate", "FR"]
+
+
+def test_results_store_stage(tmp_path):
+    results_mode = RESULTS_MODES[0]
+    runner = PipelineRunner(get_analysis_stages(results_mode),
+                            state_filepath=str(tmp_path / "state.json"))
+    # Built on its own, at the same time as the routes stages
+    assert runner.dependencies[f"results_store_{results_mode}"] == []
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import numpy as np
+import pytest
+from shapely import box
+# internal imports
+from src.engines import reverse_geocoder
+from src.engines.reverse_geocoder import (
+    COUNTRY_BORDERS_NAMES_ALIASES,
+    ReverseGeocoder,
+    get_border_country_codes
+)
+from src.utils.common_functions import json_file_to_dict
+from src.utils.constants import ALL_COUNTRIES_FILEPATH
+
+
+def test_aliases_in_countries_file():
+    countries_names = {
+        country["name"]
+        for country in json_file_to_dict(ALL_COUNTRIES_FILEPATH, cached=True)
+    }
+    assert set(COUNTRY_BORDERS_NAMES_ALIASES.values()) <= countries_names
+
+
+def test_get_border_country_codes():
+    with pytest.warns(UserWarning, match="Atlantis"):
+        country_codes = get_border_country_codes(
+            np.asarray(["Spain", "Russia", "United States", "Atlantis"]))
+    assert country_codes.tolist() == ["ES", "RU", "US", ""]
+
+
+def test_reverse_geocoder(monkeypatch, recwarn):
+    monkeypatch.setattr(
+        reverse_geocoder, "load_country_borders",
+        lambda geojson_filepath: (
+            np.asarray(["Spain", "United Kingdom"]),
+            np.asarray([box(-10, 36, 3, 44), box(-8, 50, 2, 59)])))
+    geocoder = ReverseGeocoder("borders.geojson", max_offshore_km=0)
+    assert len(recwarn) == 0
+    assert geocoder.country_codes(
+        [-3.70256, -0.1275, 20.0], [40.4165, 51.50722, 0.0]).tolist() == \
+        ["ES", "GB", ""]
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# external imports
+import pandas as pd
+import pytest
+# internal imports
+from src.utils import common_functions
+from src.engines.routes_extraction import (
+    UNKNOWN_PROBE_IP,
+    add_probe_id_ip_country_location,
+    mark_suspicious_routes_results
+)
+
+IPS_METADATA = {
+    "1.1.1.1": {"ip": "1.1.1.1", "country": "AU", "bogon": False,
+                "anycast": True},
+    "5.5.5.5": {"ip": "5.5.5.5", "country": "ES", "bogon": False,
+                "anycast": False},
+    "100.64.0.1": {"ip": "100.64.0.1", "country": None, "bogon": True,
+                   "anycast": False},
+    # Only classified as anycast, its details could not be fetched
+    "2.2.2.2": {"ip": "2.2.2.2", "country": None, "bogon": None,
+                "anycast": True}
+}
+
+
+@pytest.fixture(autouse=True)
+def ips_metadata(monkeypatch):
+    monkeypatch.setattr(
+        common_functions, "get_ips_metadata_via_cache",
+        lambda ip_addresses: {
+            ip_address: IPS_METADATA[ip_address]
+            for ip_address in ip_addresses if ip_address in IPS_METADATA
+        })
+
+
+def get_routes_results_df(probe_ips: list[str]) -> pd.DataFrame:
+    return pd.DataFrame({
+        "target": ["8.8.8.8"] * len(probe_ips),
+        "probe_id": list(range(len(probe_ips))),
+        "route": [[[probe_ip], ["9.9.9.9"]] if probe_ip else []
+                  for probe_ip in probe_ips],
+        "origin_country": ["ES"] * len(probe_ips),
+        "result_country": ["ES"] * len(probe_ips)
+    })
+
+
+def test_add_probe_id_ip_country_location():
+    routes_results_df = add_probe_id_ip_country_location(
+        get_routes_results_df(
+            ["1.1.1.1", "5.5.5.5", "100.64.0.1", "192.168.1.1", None]))
+    assert routes_results_df["probe_ip"].tolist() == [
+        "1.1.1.1", "5.5.5.5", "100.64.0.1", "192.168.1.1", UNKNOWN_PROBE_IP]
+    assert routes_results_df["probe_country_with_ip"].tolist() == [
+        "AU", "ES", "bogon", "bogon", "bogon"]
+
+    routes_results_df = mark_suspicious_routes_results(routes_results_df)
+    assert routes_results_df["suspicious"].tolist() == [
+        True, False, False, False, False]
+
+
+@pytest.mark.parametrize("probe_ip", ["3.3.3.3", "2.2.2.2"])
+def test_add_probe_id_ip_country_location_failed_lookup(probe_ip):
+    with pytest.raises(LookupError, match=probe_ip):
+        add_probe_id_ip_country_location(
+            get_routes_results_df(["5.5.5.5", probe_ip]))